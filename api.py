@@ -0,0 +1,385 @@
+"""
+Versioned JSON API for programmatic analysis, mounted under /api/v1.
+
+Example:
+    curl -F file=@resume.pdf -F model="Mistral Medium" -F api_key=$MISTRAL_API_KEY \
+        http://localhost:7860/api/v1/analyze
+
+Every endpoint takes a multipart form with either a PDF `file` or the resume
+as plain `text`, and returns the validated models from utils.data_models as
+JSON; no HTML is rendered. Requests share the UI's admission control, so a
+saturated server answers 503 with Retry-After instead of timing out.
+"""
+
+import asyncio
+import json
+import os
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, Field, ValidationError
+from starlette.concurrency import run_in_threadpool
+
+from main import analyzer, build_suggestions
+from utils.admission import ServerBusy, admission
+from utils.chunking import needs_chunking
+from utils.data_models import FinalResult, MarkdownResult, RankedJobComparisionResult
+from utils.jd_ranking import (
+    posting_title,
+    rank_job_descriptions,
+    split_job_descriptions,
+)
+from utils.llm_models import build_model_config
+from utils.pipeline import Stage, StageError, run_stages_async
+from utils.sections import split_sections
+from utils.tracing import span
+
+# Resumes per /batch request, and how many of them are analyzed at once.
+API_BATCH_MAX_FILES = int(os.getenv("API_BATCH_MAX_FILES", "50"))
+API_BATCH_CONCURRENCY = int(os.getenv("API_BATCH_CONCURRENCY", "4"))
+# Sent with 503 responses so clients back off instead of retrying at once.
+BUSY_RETRY_AFTER_SECONDS = 30
+
+router = APIRouter(prefix="/api/v1", tags=["analysis"])
+
+
+class PipelineResult(BaseModel):
+    analysis: FinalResult
+    report: MarkdownResult
+    comparisons: List[RankedJobComparisionResult] = Field(
+        default_factory=list,
+        description="Job descriptions ranked by chance of selection, best first.",
+    )
+
+
+class BatchRecord(BaseModel):
+    file: str
+    status: str = Field(description='"ok" or "error".')
+    analysis: Optional[FinalResult] = None
+    comparisons: List[RankedJobComparisionResult] = Field(default_factory=list)
+    error: str = ""
+
+
+def _model_config(model: str, custom_model_name: str):
+    try:
+        return build_model_config(model, custom_model_name.strip())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+async def _read_resume(file: Optional[UploadFile], text: str) -> Dict[str, str]:
+    """Sections of the uploaded PDF, or of the plain-text resume."""
+    if file is not None:
+        data = await file.read()
+        try:
+            return await run_in_threadpool(analyzer.extract_pdf_bytes, data)
+        except Exception as e:
+            raise HTTPException(status_code=422, detail=f"Could not read the PDF: {e}")
+    if text.strip():
+        return split_sections(text.strip())
+    raise HTTPException(status_code=422, detail="Provide a PDF file or resume text")
+
+
+async def _admitted(run: Callable[[], Awaitable]):
+    """Await `run()` under an admission slot, mapping failures to HTTP errors."""
+    try:
+        async with admission.admitted():
+            return await run()
+    except ServerBusy as e:
+        raise HTTPException(
+            status_code=503,
+            detail=str(e),
+            headers={"Retry-After": str(BUSY_RETRY_AFTER_SECONDS)},
+        )
+    except (ValueError, RuntimeError) as e:
+        error = e.error if isinstance(e, StageError) else e
+        if isinstance(error, ValueError):
+            raise HTTPException(status_code=400, detail=str(error))
+        # The provider failed or kept returning unusable output.
+        raise HTTPException(status_code=502, detail=str(error))
+
+
+def _compare(model_config, api_key, sections, postings: List[str]) -> List[Dict]:
+    if not postings:
+        return []
+    return analyzer.rank_job_descriptions(model_config, api_key, sections, postings)
+
+
+def _rank_single(sections, posting: str, comparison: Dict) -> List[Dict]:
+    """Give the comparison from a combined call the shape of a ranking."""
+    resume_text = "\n".join(str(value) for value in sections.values())
+    ((_, similarity),) = rank_job_descriptions(resume_text, [posting])
+    ranked = {
+        **comparison,
+        "rank": 1,
+        "title": posting_title(posting),
+        "similarity": round(similarity, 4),
+    }
+    return [RankedJobComparisionResult.model_validate(ranked).model_dump()]
+
+
+def build_pipeline_stages(
+    model_config,
+    api_key: str,
+    sections: Dict[str, str],
+    instructions: str,
+    job_description: str,
+    combined: bool = False,
+) -> List[Stage]:
+    """
+    The UI pipeline minus rendering and saved artifacts. As in the UI, combined
+    mode folds a single job description into its one call, while several
+    postings are ranked separately.
+    """
+    postings = split_job_descriptions(job_description.strip())
+    single = combined and len(postings) == 1
+    stages = [Stage("sections", lambda: sections)]
+    if combined:
+        stages += [
+            Stage(
+                "combined",
+                lambda sections: analyzer.combined_analysis(
+                    model_config,
+                    api_key,
+                    sections,
+                    instructions,
+                    job_description if single else "",
+                ),
+                deps=["sections"],
+            ),
+            Stage("analysis", lambda combined: combined["analysis"], deps=["combined"]),
+            Stage("report", lambda combined: combined["report"], deps=["combined"]),
+        ]
+    else:
+        stages += [
+            # Long resumes: one map-reduce pass yields analysis and report.
+            Stage(
+                "chunked",
+                lambda sections: (
+                    analyzer.chunked_analysis(model_config, api_key, sections, "")
+                    if needs_chunking(sections)
+                    else None
+                ),
+                deps=["sections"],
+            ),
+            Stage(
+                "analysis",
+                lambda sections, chunked: (
+                    chunked["analysis"]
+                    if chunked
+                    else analyzer.analyze_resume(sections, model_config, api_key)
+                ),
+                deps=["sections", "chunked"],
+            ),
+            Stage(
+                "report",
+                lambda sections, analysis, chunked: (
+                    analyzer.chunked_report(
+                        model_config, api_key, chunked, instructions, sections
+                    )
+                    if chunked
+                    else analyzer.markdown_report(
+                        model_config,
+                        api_key,
+                        build_suggestions(analysis),
+                        instructions,
+                        sections,
+                    )
+                ),
+                deps=["sections", "analysis", "chunked"],
+            ),
+        ]
+    if single:
+        stages.append(
+            Stage(
+                "comparisons",
+                lambda sections, combined: _rank_single(
+                    sections, postings[0], combined["job_comparision"]
+                ),
+                deps=["sections", "combined"],
+            )
+        )
+    else:
+        stages.append(
+            Stage(
+                "comparisons",
+                lambda sections: _compare(model_config, api_key, sections, postings),
+                deps=["sections"],
+            )
+        )
+    return stages
+
+
+@router.post("/analyze", response_model=FinalResult)
+async def analyze(
+    file: Optional[UploadFile] = File(None),
+    text: str = Form(""),
+    model: str = Form("Mistral Medium"),
+    custom_model_name: str = Form(""),
+    api_key: str = Form(""),
+    fast: bool = Form(False),
+):
+    """ATS score and recommendations; `fast` scores locally without an LLM."""
+    sections = await _read_resume(file, text)
+    if fast:
+        return analyzer.analyze_resume_fast(sections)
+    model_config = _model_config(model, custom_model_name)
+    return await _admitted(
+        lambda: run_in_threadpool(
+            analyzer.analyze_resume, sections, model_config, api_key
+        )
+    )
+
+
+@router.post("/optimize", response_model=MarkdownResult)
+async def optimize(
+    file: Optional[UploadFile] = File(None),
+    text: str = Form(""),
+    model: str = Form("Mistral Medium"),
+    custom_model_name: str = Form(""),
+    api_key: str = Form(""),
+    instructions: str = Form(""),
+    analysis: str = Form(
+        "", description="FinalResult JSON from /analyze; analyzed first if empty."
+    ),
+):
+    """The optimized resume as Markdown, with the changes made."""
+    sections = await _read_resume(file, text)
+    model_config = _model_config(model, custom_model_name)
+    result = None
+    if analysis.strip():
+        try:
+            result = FinalResult.model_validate(json.loads(analysis)).model_dump()
+        except (ValueError, ValidationError) as e:
+            raise HTTPException(status_code=422, detail=f"Invalid analysis: {e}")
+
+    def run():
+        if needs_chunking(sections) and result is None:
+            # Parts are scored and rewritten in the same pass.
+            chunked = analyzer.chunked_analysis(model_config, api_key, sections, "")
+            return analyzer.chunked_report(
+                model_config, api_key, chunked, instructions, sections
+            )
+        scored = result or analyzer.analyze_resume(sections, model_config, api_key)
+        return analyzer.markdown_report(
+            model_config,
+            api_key,
+            build_suggestions(scored),
+            instructions,
+            sections,
+        )
+
+    return await _admitted(lambda: run_in_threadpool(run))
+
+
+@router.post("/compare", response_model=List[RankedJobComparisionResult])
+async def compare(
+    file: Optional[UploadFile] = File(None),
+    text: str = Form(""),
+    model: str = Form("Mistral Medium"),
+    custom_model_name: str = Form(""),
+    api_key: str = Form(""),
+    job_description: str = Form(...),
+):
+    """
+    Chance of selection for each pasted job description, best first. Several
+    postings are shortlisted locally and only the top JD_TOP_K compared.
+    """
+    sections = await _read_resume(file, text)
+    model_config = _model_config(model, custom_model_name)
+    postings = split_job_descriptions(job_description.strip())
+    return await _admitted(
+        lambda: run_in_threadpool(_compare, model_config, api_key, sections, postings)
+    )
+
+
+@router.post("/pipeline", response_model=PipelineResult)
+async def pipeline(
+    file: Optional[UploadFile] = File(None),
+    text: str = Form(""),
+    model: str = Form("Mistral Medium"),
+    custom_model_name: str = Form(""),
+    api_key: str = Form(""),
+    instructions: str = Form(""),
+    job_description: str = Form(""),
+    combined: bool = Form(False),
+):
+    """Analysis, optimized resume and job comparisons in one request."""
+    sections = await _read_resume(file, text)
+    model_config = _model_config(model, custom_model_name)
+    stages = build_pipeline_stages(
+        model_config, api_key, sections, instructions, job_description, combined
+    )
+
+    async def run():
+        with span("pipeline", mode="combined" if combined else "standard", api=True):
+            return await run_stages_async(stages)
+
+    results = await _admitted(run)
+    return {name: results[name] for name in ("analysis", "report", "comparisons")}
+
+
+@router.post("/batch")
+async def batch(
+    files: List[UploadFile] = File(...),
+    model: str = Form("Mistral Medium"),
+    custom_model_name: str = Form(""),
+    api_key: str = Form(""),
+    job_description: str = Form(""),
+    fast: bool = Form(False),
+):
+    """
+    Analyze several resumes, streaming one BatchRecord per line (NDJSON) in
+    completion order. A failed resume is reported in its record and does not
+    stop the others.
+    """
+    if len(files) > API_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {API_BATCH_MAX_FILES} files per request",
+        )
+    model_config = None if fast else _model_config(model, custom_model_name)
+    postings = split_job_descriptions(job_description.strip())
+    # Read the uploads up front: they are closed once this handler returns.
+    uploads = [(upload.filename or "", await upload.read()) for upload in files]
+    limiter = asyncio.Semaphore(max(1, API_BATCH_CONCURRENCY))
+
+    async def analyze_one(name: str, data: bytes) -> str:
+        record = {"file": name}
+        try:
+            async with limiter:
+                sections = await run_in_threadpool(analyzer.extract_pdf_bytes, data)
+                if fast:
+                    record["analysis"] = analyzer.analyze_resume_fast(sections)
+                else:
+                    async with admission.admitted():
+                        record["analysis"], record["comparisons"] = (
+                            await asyncio.gather(
+                                run_in_threadpool(
+                                    analyzer.analyze_resume,
+                                    sections,
+                                    model_config,
+                                    api_key,
+                                ),
+                                run_in_threadpool(
+                                    _compare, model_config, api_key, sections, postings
+                                ),
+                            )
+                        )
+            record["status"] = "ok"
+        except Exception as e:
+            record.update(status="error", analysis=None, comparisons=[], error=str(e))
+        return BatchRecord.model_validate(record).model_dump_json() + "\n"
+
+    async def stream():
+        tasks = [asyncio.ensure_future(analyze_one(*upload)) for upload in uploads]
+        try:
+            for next_done in asyncio.as_completed(tasks):
+                yield await next_done
+        finally:
+            # The client went away; don't keep calling the provider for it.
+            for task in tasks:
+                task.cancel()
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
@@ -1,5 +1,63 @@
+import os
+import time
+
+import gradio as gr
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+
+from api import router as api_router
 from main import create_interface
+from utils import metrics
+from utils.admission import admission
+from utils.llm_models import preload_providers
+
+# Provider SDKs load on first use; list the ones this deployment uses, e.g.
+# LLM_PRELOAD_PROVIDERS="Mistral,OpenAI", to import them at startup instead.
+preload_providers(
+    [name.strip() for name in os.getenv("LLM_PRELOAD_PROVIDERS", "").split(",")]
+    if os.getenv("LLM_PRELOAD_PROVIDERS")
+    else []
+)
+
+app = FastAPI()
+STARTED = time.time()
+
+
+@app.get("/healthz")
+def healthz():
+    """Liveness: the worker is up and serving requests."""
+    return {
+        "status": "ok",
+        "pid": os.getpid(),
+        "uptime_seconds": round(time.time() - STARTED, 1),
+    }
+
+
+@app.get("/readyz")
+def readyz():
+    """Readiness: 503 while this worker's analysis queue is full."""
+    body = {
+        "status": "busy" if admission.saturated() else "ok",
+        "pid": os.getpid(),
+        "active": admission.active,
+        "queued": admission.queued,
+    }
+    return JSONResponse(body, status_code=503 if admission.saturated() else 200)
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def prometheus_metrics():
+    """Counters and latency histograms in the Prometheus text format."""
+    return PlainTextResponse(
+        metrics.render_prometheus(), media_type="text/plain; version=0.0.4"
+    )
+
+
+app.include_router(api_router)
+
+# Gradio is mounted last so the routes above take precedence over its own.
+app = gr.mount_gradio_app(app, create_interface(), path="/")
 
 if __name__ == "__main__":
-    demo = create_interface()
-    demo.launch(server_name="0.0.0.0", server_port=7860)
+    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", "7860")))
@@ -0,0 +1,282 @@
+"""
+Headless batch analysis of many resumes against one role.
+
+Example:
+    python batch.py resumes/ --model "Mistral Medium" --api-key $MISTRAL_API_KEY \
+        --job-description role.txt --output results.jsonl
+
+Results are appended to the output file as each resume finishes, so an
+interrupted run can be restarted with the same command and will skip
+resumes that are already recorded. This module never imports gradio.
+"""
+
+import argparse
+import csv
+import glob
+import json
+import logging
+import os
+import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Dict, Iterable, List, Set
+
+from utils.llm_models import SUPPORTED_MODELS, build_model_config
+from utils.resume_analyzer import ResumeAnalyzer
+
+logger = logging.getLogger(__name__)
+
+CSV_FIELDS = [
+    "file",
+    "status",
+    "overall_score",
+    "keyword_optimization",
+    "structural_formatting",
+    "content_quality",
+    "professional_narrative",
+    "additional_factors",
+    "percentage_of_chances",
+    "error",
+]
+
+
+def find_resumes(inputs: Iterable[str]) -> List[str]:
+    """Expand directories and glob patterns into a sorted list of PDF paths."""
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            pattern = os.path.join(item, "**", "*.pdf")
+            paths.update(glob.glob(pattern, recursive=True))
+        else:
+            paths.update(
+                path
+                for path in glob.glob(item, recursive=True)
+                if path.lower().endswith(".pdf")
+            )
+    return sorted(os.path.abspath(path) for path in paths)
+
+
+def load_completed(output: str) -> Set[str]:
+    """Return the files already recorded in an existing output file."""
+    if not os.path.exists(output):
+        return set()
+
+    completed = set()
+    with open(output, newline="") as f:
+        if output.endswith(".csv"):
+            for row in csv.DictReader(f):
+                if row.get("status") == "ok":
+                    completed.add(row["file"])
+        else:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    # A half-written last line from an interrupted run.
+                    continue
+                if record.get("status") == "ok":
+                    completed.add(record["file"])
+    return completed
+
+
+class ResultWriter:
+    """Thread-safe, append-only JSONL or CSV writer that flushes every row."""
+
+    def __init__(self, output: str):
+        self.is_csv = output.endswith(".csv")
+        write_header = self.is_csv and (
+            not os.path.exists(output) or os.path.getsize(output) == 0
+        )
+        self._file = open(output, "a", newline="")
+        self._lock = threading.Lock()
+        if self.is_csv:
+            self._csv = csv.DictWriter(
+                self._file, fieldnames=CSV_FIELDS, extrasaction="ignore"
+            )
+            if write_header:
+                self._csv.writeheader()
+
+    def write(self, record: Dict):
+        with self._lock:
+            if self.is_csv:
+                self._csv.writerow(flatten_record(record))
+            else:
+                self._file.write(json.dumps(record) + "\n")
+            self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def flatten_record(record: Dict) -> Dict:
+    ats_score = (record.get("analysis") or {}).get("ats_score", {})
+    comparison = record.get("comparison") or {}
+    if isinstance(comparison, list):
+        # Several postings were ranked; report the best match.
+        comparison = comparison[0] if comparison else {}
+    row = {
+        "file": record["file"],
+        "status": record["status"],
+        "overall_score": ats_score.get("overall_score"),
+        "percentage_of_chances": comparison.get("percentage_of_chances"),
+        "error": record.get("error", ""),
+    }
+    row.update(ats_score.get("category_breakdowns", {}))
+    return row
+
+
+def analyze_one(
+    analyzer: ResumeAnalyzer,
+    path: str,
+    model_config,
+    api_key: str,
+    job_description: str,
+    fast: bool = False,
+) -> Dict:
+    record = {"file": path}
+    try:
+        sections = analyzer.extract_pdf_content(path)
+        if fast:
+            record["analysis"] = analyzer.analyze_resume_fast(sections)
+            record["status"] = "ok"
+            return record
+        record["analysis"] = analyzer.analyze_resume(sections, model_config, api_key)
+        if job_description:
+            record["comparison"] = analyzer.compare_with_job_descriptions(
+                model_config, api_key, sections, job_description
+            )
+        record["status"] = "ok"
+    except Exception as e:
+        logger.error(f"Failed to analyze {path}: {str(e)}")
+        record["status"] = "error"
+        record["error"] = str(e)
+    return record
+
+
+def run_batch(
+    paths: List[str],
+    output: str,
+    model_config,
+    api_key: str,
+    job_description: str = "",
+    concurrency: int = 4,
+    fast: bool = False,
+) -> Dict[str, int]:
+    """Analyze `paths`, streaming each result to `output` as it completes."""
+    completed = load_completed(output)
+    todo = [path for path in paths if path not in completed]
+    logger.info(
+        f"{len(paths)} resumes found, {len(completed)} already done, "
+        f"{len(todo)} to analyze"
+    )
+
+    # The pool bounds resumes in flight; calls to each provider are capped
+    # by LLM_CONCURRENCY inside the LLM client.
+    analyzer = ResumeAnalyzer()
+    writer = ResultWriter(output)
+    counts = {"ok": 0, "error": 0, "skipped": len(paths) - len(todo)}
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(
+                    analyze_one,
+                    analyzer,
+                    path,
+                    model_config,
+                    api_key,
+                    job_description,
+                    fast,
+                )
+                for path in todo
+            ]
+            for done, future in enumerate(as_completed(futures), start=1):
+                record = future.result()
+                writer.write(record)
+                counts[record["status"]] += 1
+                logger.info(
+                    f"[{done}/{len(todo)}] {record['status']}: {record['file']}"
+                )
+    finally:
+        writer.close()
+    return counts
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "inputs", nargs="+", help="Directories or glob patterns of resume PDFs"
+    )
+    parser.add_argument(
+        "--model",
+        default="Mistral Medium",
+        choices=list(SUPPORTED_MODELS.keys()),
+        help="Model to use (default: Mistral Medium)",
+    )
+    parser.add_argument(
+        "--custom-model-name",
+        default="",
+        help="Provider model name for HuggingFace, Ollama and Groq models, "
+        "or the quality tier for Auto",
+    )
+    parser.add_argument(
+        "--api-key",
+        default=os.getenv("RESUME_ANALYZER_API_KEY", ""),
+        help="API key (or Ollama host); defaults to $RESUME_ANALYZER_API_KEY",
+    )
+    parser.add_argument(
+        "--job-description",
+        default="",
+        help="Job description text, or a path to a file containing it",
+    )
+    parser.add_argument(
+        "--output",
+        default="results.jsonl",
+        help="Output file; .csv writes CSV, anything else JSONL",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Resumes analyzed at once (default: 4); calls per provider are "
+        "further capped by LLM_CONCURRENCY",
+    )
+    parser.add_argument(
+        "--fast",
+        action="store_true",
+        help="Score locally without calling an LLM (no API key needed)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+
+    job_description = args.job_description
+    if job_description and os.path.isfile(job_description):
+        with open(job_description) as f:
+            job_description = f.read()
+
+    paths = find_resumes(args.inputs)
+    if not paths:
+        logger.error("No PDF files found")
+        return 1
+
+    counts = run_batch(
+        paths,
+        args.output,
+        build_model_config(args.model, args.custom_model_name),
+        args.api_key,
+        job_description.strip(),
+        max(1, args.concurrency),
+        args.fast,
+    )
+    logger.info(
+        f"Done: {counts['ok']} ok, {counts['error']} failed, "
+        f"{counts['skipped']} skipped"
+    )
+    return 0 if counts["error"] == 0 else 2
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+import json
+import random
+import threading
+import time
+from typing import Dict, Iterator, Optional
+
+from utils.llm_models import register_provider
+
+FAKE_MODEL = "Fake LLM"
+
+ANALYSIS_RESPONSE = {
+    "ats_score": {
+        "overall_score": 72,
+        "category_breakdowns": {
+            "keyword_optimization": 18,
+            "structural_formatting": 20,
+            "content_quality": 21,
+            "professional_narrative": 9,
+            "additional_factors": 4,
+        },
+    },
+    "detailed_recommendations": [
+        "Quantify the impact of each role with metrics.",
+        "Add a skills section that mirrors common job posting keywords.",
+        "Move certifications above education.",
+    ],
+    "improvement_strategies": [
+        "Lead each bullet with a strong action verb.",
+        "Keep the resume to two pages.",
+    ],
+}
+
+REPORT_RESPONSE = {
+    "content": "# Jane Doe\n\n## Experience\n"
+    + "\n".join(
+        f"- Led project {i}, cutting latency by {10 + i}% for 2M users"
+        for i in range(40)
+    ),
+    "changes": ["Quantified achievements", "Reordered sections"],
+    "additional": "",
+}
+
+COMPARISON_RESPONSE = {
+    "analysis": "Strong overlap on Python, SQL and cloud infrastructure.",
+    "percentage_of_chances": 64,
+    "suggestions": "Highlight Kubernetes experience and on-call ownership.",
+}
+
+COMBINED_RESPONSE = {
+    "analysis": ANALYSIS_RESPONSE,
+    "report": REPORT_RESPONSE,
+    "job_comparision": COMPARISON_RESPONSE,
+}
+
+
+class FakeProviderError(RuntimeError):
+    """A transient provider failure, classified like an HTTP 503."""
+
+    status_code = 503
+
+
+class FakeProvider:
+    """
+    An offline LLM provider with configurable latency, jitter and error rate.
+
+    Responses are canned JSON chosen by the schema in the prompt; pass
+    `responses` to override them by kind ("analysis", "report",
+    "comparison", "combined").
+    """
+
+    def __init__(
+        self,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        responses: Optional[Dict[str, dict]] = None,
+        chunk_size: int = 64,
+        seed: int = 0,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.chunk_size = chunk_size
+        self.responses = {
+            "analysis": ANALYSIS_RESPONSE,
+            "report": REPORT_RESPONSE,
+            "comparison": COMPARISON_RESPONSE,
+            "combined": COMBINED_RESPONSE,
+            **(responses or {}),
+        }
+        self.calls = 0
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def kind(self, prompt: str) -> str:
+        if '"job_comparision"' in prompt:
+            return "combined"
+        if '"percentage_of_chances"' in prompt:
+            return "comparison"
+        if '"overall_score"' in prompt:
+            return "analysis"
+        return "report"
+
+    def _delay(self) -> float:
+        with self._lock:
+            self.calls += 1
+            failed = self._random.random() < self.error_rate
+            delay = max(0.0, self.latency + self._random.uniform(-1, 1) * self.jitter)
+        if failed:
+            time.sleep(delay / 2)
+            raise FakeProviderError("Fake provider unavailable")
+        return delay
+
+    def complete(self, model, api_key, prompt) -> str:
+        time.sleep(self._delay())
+        return json.dumps(self.responses[self.kind(prompt)])
+
+    def stream(self, model, api_key, prompt) -> Iterator[str]:
+        delay = self._delay()
+        text = json.dumps(self.responses[self.kind(prompt)])
+        chunks = [
+            text[i : i + self.chunk_size] for i in range(0, len(text), self.chunk_size)
+        ]
+        for chunk in chunks:
+            time.sleep(delay / len(chunks))
+            yield chunk
+
+    def register(self, name: str = FAKE_MODEL) -> str:
+        """Make this provider selectable as model `name`; returns the name."""
+        register_provider(name, self.complete, self.stream, {name: "fake-model"})
+        return name
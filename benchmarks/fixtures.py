@@ -0,0 +1,103 @@
+import os
+import random
+from typing import List
+
+PAGE_COUNTS = (1, 2, 8, 32)
+LINES_PER_PAGE = 48
+
+_SKILLS = (
+    "Python, SQL, AWS, Kubernetes, Docker, Terraform, React, TypeScript, "
+    "PostgreSQL, Kafka, Spark, Airflow, CI/CD, Agile, REST APIs"
+)
+_VERBS = ("Led", "Built", "Designed", "Reduced", "Migrated", "Automated", "Scaled")
+_OBJECTS = (
+    "a data pipeline processing 4TB per day",
+    "the billing service used by 2M customers",
+    "a Kubernetes platform for 60 engineers",
+    "an ML feature store with sub-10ms reads",
+    "the CI/CD system, cutting build time by 45%",
+    "a React dashboard for operations teams",
+)
+
+JOB_DESCRIPTION = """Senior Backend Engineer
+We are looking for a backend engineer with 5+ years of Python experience,
+strong SQL and PostgreSQL skills, and hands-on Kubernetes and AWS knowledge.
+You will design REST APIs, own services in production and mentor engineers.
+Experience with Kafka, Terraform and CI/CD pipelines is a plus."""
+
+
+def resume_pages(pages: int, seed: int = 0) -> List[List[str]]:
+    """Synthetic resume text: a header page, then experience bullets."""
+    rng = random.Random(seed)
+    lines = [
+        "Jane Doe",
+        "Senior Software Engineer | jane.doe@example.com | +1 555 0100",
+        "",
+        "SUMMARY",
+        "Engineer with 9 years of experience building distributed systems.",
+        "",
+        "SKILLS",
+        _SKILLS,
+        "",
+        "EDUCATION",
+        "B.Sc. Computer Science, State University, 2015",
+        "",
+        "EXPERIENCE",
+    ]
+    while len(lines) < pages * LINES_PER_PAGE:
+        lines.append(f"Software Engineer, Company {rng.randint(1, 999)} (2016 - 2020)")
+        for _ in range(rng.randint(3, 6)):
+            lines.append(f"- {rng.choice(_VERBS)} {rng.choice(_OBJECTS)}")
+        lines.append("")
+    lines = lines[: pages * LINES_PER_PAGE]
+    return [lines[i : i + LINES_PER_PAGE] for i in range(0, len(lines), LINES_PER_PAGE)]
+
+
+def make_pdf(pages: List[List[str]]) -> bytes:
+    """A minimal, valid PDF with one Helvetica text line per entry."""
+    count = len(pages)
+    font = 3 + 2 * count
+    objects = [
+        "<< /Type /Catalog /Pages 2 0 R >>",
+        "<< /Type /Pages /Kids [%s] /Count %d >>"
+        % (" ".join(f"{3 + 2 * i} 0 R" for i in range(count)), count),
+    ]
+    for i, lines in enumerate(pages):
+        objects.append(
+            "<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 {font} 0 R >> >> /Contents {4 + 2 * i} 0 R >>"
+        )
+        text = " ".join(f"({_escape(line)}) Tj T*" for line in lines)
+        stream = f"BT /F1 10 Tf 15 TL 50 760 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+    objects.append("<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1")
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    out += b"".join(f"{offset:010d} 00000 n \n".encode() for offset in offsets)
+    out += (
+        f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\n"
+        f"startxref\n{xref}\n%%EOF\n"
+    ).encode()
+    return bytes(out)
+
+
+def _escape(line: str) -> str:
+    return line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+
+def build_corpus(directory: str, page_counts=PAGE_COUNTS) -> dict:
+    """Write resume_<n>p.pdf for each page count; returns {pages: path}."""
+    os.makedirs(directory, exist_ok=True)
+    corpus = {}
+    for pages in page_counts:
+        path = os.path.join(directory, f"resume_{pages}p.pdf")
+        with open(path, "wb") as f:
+            f.write(make_pdf(resume_pages(pages, seed=pages)))
+        corpus[pages] = path
+    return corpus
@@ -0,0 +1,351 @@
+"""
+Offline benchmarks for the resume analyzer.
+
+    python -m benchmarks.run                          # run and print a table
+    python -m benchmarks.run --save baseline.json     # record a baseline
+    python -m benchmarks.run --baseline baseline.json # fail on regressions
+
+LLM calls go to a fake provider, so no API keys or network are needed.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import logging
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List
+
+# Keep benchmark runs away from the user's on-disk caches. Must be set before
+# the utils modules are imported.
+_WORKDIR = tempfile.mkdtemp(prefix="resume-bench-")
+os.environ.setdefault("RESUME_ANALYZER_CACHE_DIR", os.path.join(_WORKDIR, "cache"))
+os.environ.setdefault("LLM_CACHE_DISK", "0")
+os.environ.setdefault("RESUME_ARTIFACTS_DIR", os.path.join(_WORKDIR, "artifacts"))
+
+from benchmarks.fake_provider import (  # noqa: E402
+    ANALYSIS_RESPONSE,
+    COMPARISON_RESPONSE,
+    REPORT_RESPONSE,
+    FakeProvider,
+)
+from benchmarks.fixtures import JOB_DESCRIPTION, build_corpus  # noqa: E402
+from utils import ui_components  # noqa: E402
+from utils.artifacts import artifact_store  # noqa: E402
+from utils.data_models import FinalResult  # noqa: E402
+from utils.llm_models import parse_llm_response, response_cache  # noqa: E402
+from utils.prompts import (  # noqa: E402
+    get_combined_analysis_prompt,
+    get_comparision_with_job_description_prompt,
+    get_markdown_report_prompt,
+    get_resume_analyzer_prompt,
+)
+from utils.resume_analyzer import ResumeAnalyzer, pdf_cache  # noqa: E402
+
+
+def measure(fn: Callable[[], object], iterations: int, warmup: int = 1) -> Dict:
+    """
+    Time `fn` with the garbage collector paused, like timeit; peak memory
+    comes from one extra run under tracemalloc.
+    """
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(warmup):
+            fn()
+        timings = []
+        gc.collect()
+        gc.disable()
+        try:
+            for _ in range(iterations):
+                start = time.perf_counter()
+                fn()
+                timings.append(time.perf_counter() - start)
+        finally:
+            gc.enable()
+
+        tracemalloc.start()
+        try:
+            fn()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+    timings.sort()
+    return {
+        "p50_ms": _percentile(timings, 50) * 1000,
+        "p95_ms": _percentile(timings, 95) * 1000,
+        "peak_kib": peak / 1024,
+        "iterations": iterations,
+    }
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    index = (len(sorted_values) - 1) * percent / 100
+    low = int(index)
+    high = min(low + 1, len(sorted_values) - 1)
+    return sorted_values[low] + (sorted_values[high] - sorted_values[low]) * (
+        index - low
+    )
+
+
+def _cold(fn: Callable[[], object]) -> Callable[[], object]:
+    """Run `fn` with empty PDF and LLM response caches."""
+
+    def run():
+        pdf_cache.clear()
+        response_cache.clear()
+        return fn()
+
+    return run
+
+
+def build_benchmarks(corpus: Dict[int, str], model: str) -> Dict[str, Callable]:
+    # Imported here: main configures logging on import; gradio is only
+    # imported once the UI is built.
+    import main
+
+    logging.getLogger().setLevel(logging.WARNING)
+    analyzer = ResumeAnalyzer()
+    sections = analyzer.extract_pdf_content(corpus[2])
+    fenced = "```json\n" + json.dumps(ANALYSIS_RESPONSE) + "\n```\nLet me know!"
+    broken = json.dumps(ANALYSIS_RESPONSE, indent=2)[:-2].replace('"', "'") + ",}"
+    rankings = [
+        {**COMPARISON_RESPONSE, "rank": i, "title": f"Job {i}", "similarity": 0.5}
+        for i in range(1, 4)
+    ]
+    report = {**REPORT_RESPONSE, "content": "Saved."}
+
+    benchmarks = {}
+    for pages, path in corpus.items():
+        benchmarks[f"extract_pdf_content[{pages}p]"] = _cold(
+            lambda path=path: analyzer.extract_pdf_content(path)
+        )
+    benchmarks.update(
+        {
+            "prompt.analysis": lambda: get_resume_analyzer_prompt(sections),
+            "prompt.report": lambda: get_markdown_report_prompt(
+                ANALYSIS_RESPONSE, sections, "Emphasize leadership."
+            ),
+            "prompt.comparison": lambda: get_comparision_with_job_description_prompt(
+                sections, JOB_DESCRIPTION
+            ),
+            "prompt.combined": lambda: get_combined_analysis_prompt(
+                sections, "Emphasize leadership.", JOB_DESCRIPTION
+            ),
+            "parse.clean": lambda: parse_llm_response(json.dumps(ANALYSIS_RESPONSE)),
+            "parse.fenced": lambda: parse_llm_response(fenced),
+            "parse.repaired": lambda: parse_llm_response(broken),
+            "parse.validated": lambda: parse_llm_response(fenced, FinalResult),
+            "render.ats_score": lambda: ui_components.format_ats_score(
+                ANALYSIS_RESPONSE["ats_score"]
+            ),
+            "render.recommendations": lambda: ui_components.format_recommendations(
+                ANALYSIS_RESPONSE["detailed_recommendations"]
+            ),
+            "render.strategies": lambda: ui_components.format_strategies(
+                ANALYSIS_RESPONSE["improvement_strategies"]
+            ),
+            "render.detailed_report": lambda: ui_components.format_detailed_report(
+                report
+            ),
+            "render.job_comparison": lambda: ui_components.format_job_comparison(
+                COMPARISON_RESPONSE
+            ),
+            "render.job_rankings": lambda: ui_components.format_job_rankings(rankings),
+        }
+    )
+
+    args = (corpus[2], model, "", "", "", "fake-key", "", JOB_DESCRIPTION)
+    benchmarks["process_resume"] = _cold(lambda: main.process_resume(*args))
+    benchmarks["process_resume[combined]"] = _cold(
+        lambda: main.process_resume(*args, combined_mode=True)
+    )
+    return benchmarks
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# Entry points whose cold import time and memory are reported.
+IMPORT_TARGETS = ("utils.llm_models", "batch", "main", "app")
+
+
+def import_report(module: str, runs: int):
+    """
+    Cold-import `module` in fresh interpreters under `-X importtime`.
+
+    Returns a result like `measure` (peak_kib is the process max RSS) and the
+    heaviest direct imports of `module` from the last run, in ms.
+    """
+    # VmHWM rather than ru_maxrss, which Linux carries over from the parent
+    # across fork/exec.
+    code = (
+        f"import {module}, re; "
+        "print(re.search(r'VmHWM:\\s+(\\d+)', open('/proc/self/status').read())[1])"
+    )
+    timings, rss = [], []
+    for _ in range(runs):
+        proc = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", code],
+            capture_output=True,
+            text=True,
+            check=True,
+            cwd=ROOT,
+        )
+        total, heaviest = _parse_importtime(proc.stderr, module)
+        timings.append(total)
+        rss.append(int(proc.stdout.split()[-1]))
+
+    timings.sort()
+    result = {
+        "p50_ms": _percentile(timings, 50),
+        "p95_ms": _percentile(timings, 95),
+        "peak_kib": sorted(rss)[len(rss) // 2],
+        "iterations": runs,
+    }
+    return result, heaviest
+
+
+def _parse_importtime(report: str, module: str):
+    total, children, heaviest = 0.0, [], []
+    for line in report.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if depth == 1:
+            children.append((int(cumulative) / 1000, name.strip()))
+        elif depth == 0:
+            if name.strip() == module:
+                total = int(cumulative) / 1000
+                heaviest = sorted(children, reverse=True)[:5]
+            children = []
+    return total, heaviest
+
+
+def compare(results: Dict, baseline: Dict, tolerance: float, min_delta_ms: float):
+    """Return a description of each benchmark that regressed past `tolerance`."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        # p95 is reported but too noisy on shared machines to gate on.
+        if (
+            result["p50_ms"] > base["p50_ms"] * (1 + tolerance)
+            and result["p50_ms"] - base["p50_ms"] > min_delta_ms
+        ):
+            regressions.append(
+                f"{name}: p50_ms {base['p50_ms']:.3f} -> {result['p50_ms']:.3f}"
+            )
+        if (
+            result["peak_kib"] > base["peak_kib"] * (1 + tolerance)
+            and result["peak_kib"] - base["peak_kib"] > 64
+        ):
+            regressions.append(
+                f"{name}: peak_kib {base['peak_kib']:.0f} -> {result['peak_kib']:.0f}"
+            )
+    return regressions
+
+
+def print_table(results: Dict, baseline: Dict = None):
+    print(f"{'benchmark':<32} {'p50 ms':>10} {'p95 ms':>10} {'peak KiB':>10}")
+    for name, result in results.items():
+        line = (
+            f"{name:<32} {result['p50_ms']:>10.3f} {result['p95_ms']:>10.3f} "
+            f"{result['peak_kib']:>10.0f}"
+        )
+        base = (baseline or {}).get(name)
+        if base and base["p50_ms"]:
+            line += f"   {result['p50_ms'] / base['p50_ms'] - 1:+.0%} p50"
+        print(line)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument(
+        "--filter", default="", help="Only run benchmarks containing this text."
+    )
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Fake LLM latency in seconds."
+    )
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument(
+        "--import-runs",
+        type=int,
+        default=3,
+        help="Fresh interpreters per import-time measurement; 0 to skip.",
+    )
+    parser.add_argument("--save", help="Write results as JSON to this path.")
+    parser.add_argument("--baseline", help="Compare against a saved JSON baseline.")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.3,
+        help="Allowed relative p50 slowdown before a benchmark counts as a regression.",
+    )
+    parser.add_argument(
+        "--min-delta-ms",
+        type=float,
+        default=0.1,
+        help="Ignore slowdowns smaller than this, to keep micro-benchmarks quiet.",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    try:
+        model = FakeProvider(args.latency, args.jitter, args.error_rate).register()
+        corpus = build_corpus(os.path.join(_WORKDIR, "pdfs"))
+        benchmarks = build_benchmarks(corpus, model)
+        results = {}
+        for name, fn in benchmarks.items():
+            if args.filter in name:
+                results[name] = measure(fn, args.iterations)
+
+        heaviest_imports = {}
+        for module in IMPORT_TARGETS if args.import_runs > 0 else ():
+            name = f"import[{module}]"
+            if args.filter in name:
+                results[name], heaviest_imports[module] = import_report(
+                    module, args.import_runs
+                )
+    finally:
+        artifact_store.flush()
+        shutil.rmtree(_WORKDIR, ignore_errors=True)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    print_table(results, baseline)
+    for module, heaviest in heaviest_imports.items():
+        print(
+            f"\nHeaviest imports of {module}:",
+            ", ".join(f"{name} {ms:.0f}ms" for ms, name in heaviest) or "none",
+        )
+
+    if args.save:
+        with open(args.save, "w") as f:
+            json.dump(results, f, indent=2)
+
+    if baseline is not None:
+        regressions = compare(results, baseline, args.tolerance, args.min_delta_ms)
+        if regressions:
+            print("\nRegressions:", *regressions, sep="\n  ")
+            return 1
+        print("\nNo regressions against baseline.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
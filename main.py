@@ -1,15 +1,50 @@
-import gradio as gr
 from utils.resume_analyzer import ResumeAnalyzer
+from utils.jd_ranking import split_job_descriptions
+from utils.cache import content_hash
+from utils import metrics
+from utils.admission import (
+    MAX_QUEUE_WAIT_SECONDS,
+    ServerBusy,
+    admission,
+)
+from utils.routing import AUTO_MODEL
+from utils.pipeline import (
+    Stage,
+    StageError,
+    memoize_stages,
+    run_stages,
+    run_stages_async,
+)
+from utils.tracing import span
+from utils.artifacts import ARTIFACTS_ENABLED, artifact_store
+from utils.chunking import needs_chunking
 from utils.ui_components import (
-    load_markdown_content,
     format_ats_score,
     format_detailed_report,
     format_job_comparison,
     format_recommendations,
     format_strategies,
 )
-from typing import Dict, Tuple
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Tuple,
+)
+import asyncio
 import logging
+import os
+import queue
+import threading
+import time
+import uuid
+
+if TYPE_CHECKING:
+    import gradio as gr
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -18,6 +53,10 @@ logger = logging.getLogger(__name__)
 # Initialize the ResumeAnalyzer instance
 analyzer = ResumeAnalyzer()
 
+# "Auto" spends the server's own API keys, so the public UI only offers it
+# when the operator opts in; batch and API callers can always select it.
+UI_AUTO_MODEL = os.getenv("UI_AUTO_MODEL", "0") == "1"
+
 
 def process_resume(
     pdf_file: str,
@@ -28,6 +67,9 @@ def process_resume(
     api_key: str,
     additional_instructions: str,
     job_descriptions: str,
+    fast_mode: bool = False,
+    combined_mode: bool = False,
+    session_memo: Dict = None,
 ) -> Tuple[str, str, str, str]:
     """Process the resume and generate analysis reports."""
     try:
@@ -35,51 +77,572 @@ def process_resume(
         if not pdf_file:
             raise ValueError("Please upload a PDF file")
 
-        # Extract content
-        sections = analyzer.extract_pdf_content(pdf_file)
+        if fast_mode:
+            return process_resume_fast(pdf_file)
 
         # Prepare model configuration
         model_config = prepare_model_config(
             model, huggingface_model_name, ollama_model_name, groq_model_name
         )
 
-        # Analyze resume
-        result = analyzer.analyze_resume(sections, model_config, api_key)
+        if combined_mode:
+            stages = build_combined_stages(
+                pdf_file,
+                model_config,
+                api_key,
+                additional_instructions,
+                job_descriptions,
+            )
+        else:
+            stages = build_stages(
+                pdf_file,
+                model_config,
+                api_key,
+                additional_instructions,
+                job_descriptions,
+                generate_report,
+            )
+        stages.append(artifact_stage(pdf_file, session_memo))
+        if session_memo is not None:
+            stages = memoize_stages(
+                stages,
+                session_memo,
+                stage_keys(
+                    pdf_file,
+                    model_config,
+                    additional_instructions,
+                    job_descriptions,
+                    combined_mode,
+                ),
+            )
+        with span("pipeline", mode="combined" if combined_mode else "standard"):
+            results = run_stages(stages)
+
+            # Format outputs
+            return format_outputs(
+                results["result"],
+                results["report"],
+                results["comparison_of_jd"],
+                results["markdown_content"],
+                results["artifact"],
+            )
+
+    except StageError as e:
+        logger.error(f"Error processing resume: {str(e)}", exc_info=True)
+        return create_error_message(e.error), "", "", ""
+    except Exception as e:
+        logger.error(f"Error processing resume: {str(e)}", exc_info=True)
+        return create_error_message(e), "", "", ""
+
+
+def process_resume_stream(
+    pdf_file: str,
+    model: str,
+    huggingface_model_name: str,
+    ollama_model_name: str,
+    groq_model_name: str,
+    api_key: str,
+    additional_instructions: str,
+    job_descriptions: str,
+    fast_mode: bool = False,
+    combined_mode: bool = False,
+    session_memo: Dict = None,
+) -> Iterator[Tuple[str, str, str, str]]:
+    """
+    Process the resume, yielding outputs as they become available: the ATS
+    score once the analysis finishes, the job match once the comparison
+    finishes, and the optimized resume while it is being generated. A local
+    score is shown as a preview until the LLM analysis arrives.
+    """
+    if not pdf_file:
+        yield create_error_message(ValueError("Please upload a PDF file")), "", "", ""
+        return
+
+    if fast_mode:
+        yield process_resume_fast_safe(pdf_file)
+        return
+
+    updates = queue.Queue()
+    try:
+        stages = build_stream_stages(
+            pdf_file,
+            prepare_model_config(
+                model, huggingface_model_name, ollama_model_name, groq_model_name
+            ),
+            api_key,
+            additional_instructions,
+            job_descriptions,
+            combined_mode,
+            session_memo,
+            emit=updates.put,
+        )
+    except Exception as e:
+        # E.g. an unknown model; shown like any other pipeline error.
+        yield stream_outputs(("error", e), {})[0]
+        return
+
+    def run():
+        try:
+            with span(
+                "pipeline",
+                mode="combined" if combined_mode else "standard",
+                streaming=True,
+            ):
+                results = run_stages(
+                    stages,
+                    on_stage_done=lambda name, value: updates.put(
+                        ("stage", name, value)
+                    ),
+                )
+            updates.put(("finished", results))
+        except Exception as e:
+            updates.put(("error", e))
+
+    threading.Thread(target=run, daemon=True).start()
+
+    completed = {}
+    while True:
+        outputs, finished = stream_outputs(updates.get(), completed)
+        if outputs is not None:
+            yield outputs
+        if finished:
+            return
+
+
+async def process_resume_async(
+    pdf_file: str,
+    model: str,
+    huggingface_model_name: str,
+    ollama_model_name: str,
+    groq_model_name: str,
+    api_key: str,
+    additional_instructions: str,
+    job_descriptions: str,
+    fast_mode: bool = False,
+    combined_mode: bool = False,
+    session_memo: Dict = None,
+) -> AsyncIterator[Tuple[str, str, str, str]]:
+    """
+    Async, admission-controlled `process_resume_stream` used by the UI.
+
+    At most MAX_ACTIVE_ANALYSES analyses run at once. Others wait in a
+    bounded FIFO queue and see their position; when the queue is full, or a
+    request has waited MAX_QUEUE_WAIT_SECONDS, it gets a "busy, try again"
+    message instead of timing out. Blocking stages run in worker threads.
+    """
+    if not pdf_file:
+        yield create_error_message(ValueError("Please upload a PDF file")), "", "", ""
+        return
 
-        # Generate suggestions
-        suggestions = {
-            "detailed_recommendations": result.get("detailed_recommendations", []),
-            "improvement_strategies": result.get("improvement_strategies", []),
-        }
+    if fast_mode:
+        # Local scoring takes milliseconds; no need to queue for a slot.
+        yield process_resume_fast_safe(pdf_file)
+        return
 
-        # Generate reports
-        report = analyzer.markdown_report(
+    try:
+        waiter = admission.enter()
+    except ServerBusy as e:
+        yield create_busy_message(str(e)), "", "", ""
+        return
+
+    task = None
+    queued_at = time.perf_counter()
+    try:
+        while waiter is not None and not waiter.done():
+            if time.perf_counter() - queued_at > MAX_QUEUE_WAIT_SECONDS:
+                metrics.increment("admission_rejected_total", reason="wait_timeout")
+                yield create_busy_message(
+                    "The analyzer is still busy. Please try again in a few minutes."
+                ), "", "", ""
+                return
+            yield create_queue_message(admission.position(waiter)), "", "", ""
+            await admission.wait(waiter, QUEUE_POLL_SECONDS)
+        metrics.observe("admission_wait_seconds", time.perf_counter() - queued_at)
+
+        loop = asyncio.get_running_loop()
+        updates = asyncio.Queue()
+        try:
+            stages = build_stream_stages(
+                pdf_file,
+                prepare_model_config(
+                    model, huggingface_model_name, ollama_model_name, groq_model_name
+                ),
+                api_key,
+                additional_instructions,
+                job_descriptions,
+                combined_mode,
+                session_memo,
+                emit=lambda update: loop.call_soon_threadsafe(
+                    updates.put_nowait, update
+                ),
+            )
+        except Exception as e:
+            yield stream_outputs(("error", e), {})[0]
+            return
+
+        async def run():
+            try:
+                with span(
+                    "pipeline",
+                    mode="combined" if combined_mode else "standard",
+                    streaming=True,
+                ):
+                    results = await run_stages_async(
+                        stages,
+                        on_stage_done=lambda name, value: updates.put_nowait(
+                            ("stage", name, value)
+                        ),
+                    )
+                updates.put_nowait(("finished", results))
+            except Exception as e:
+                updates.put_nowait(("error", e))
+
+        task = asyncio.ensure_future(run())
+        completed = {}
+        while True:
+            outputs, finished = stream_outputs(await updates.get(), completed)
+            if outputs is not None:
+                yield outputs
+            if finished:
+                return
+    finally:
+        if task is not None:
+            task.cancel()
+        admission.leave(waiter)
+
+
+def build_stream_stages(
+    pdf_file: str,
+    model_config,
+    api_key: str,
+    additional_instructions: str,
+    job_descriptions: str,
+    combined_mode: bool,
+    session_memo: Dict,
+    emit: Callable[[tuple], None],
+) -> List[Stage]:
+    """
+    Stages for the streaming handlers; partial reports are passed to `emit`
+    as ("partial_report", report) while the optimized resume is generated.
+    """
+
+    def stream_report(model_config, api_key, result, instructions, sections):
+        for report, done in analyzer.markdown_report_stream(
             model_config,
             api_key,
-            suggestions,
-            additional_instructions or "",
+            build_suggestions(result),
+            instructions or "",
             sections,
+        ):
+            if done:
+                return report
+            emit(("partial_report", report))
+
+    if combined_mode:
+        stages = build_combined_stages(
+            pdf_file, model_config, api_key, additional_instructions, job_descriptions
+        )
+    else:
+        stages = build_stages(
             pdf_file,
+            model_config,
+            api_key,
+            additional_instructions,
+            job_descriptions,
+            stream_report,
         )
-
-        # Compare with job descriptions if provided
-        comparison_of_jd = analyzer.compare_with_job_descriptions(
-            model_config, api_key, sections, job_descriptions
+    stages.append(artifact_stage(pdf_file, session_memo))
+
+    if session_memo is not None:
+        stages = memoize_stages(
+            stages,
+            session_memo,
+            stage_keys(
+                pdf_file,
+                model_config,
+                additional_instructions,
+                job_descriptions,
+                combined_mode,
+            ),
         )
+    return stages
 
-        # Load markdown content
-        markdown_content = load_markdown_content_from_file(pdf_file)
 
-        # Format outputs
-        return format_outputs(result, report, comparison_of_jd, markdown_content)
+def stream_outputs(
+    update: tuple, completed: Dict
+) -> Tuple[Optional[Tuple[str, str, str, str]], bool]:
+    """
+    Fold one pipeline update into `completed`.
 
+    Returns the outputs to show (or None if nothing changed) and whether the
+    run is over.
+    """
+    kind, *payload = update
+    if kind == "error":
+        error = payload[0]
+        logger.error(f"Error processing resume: {str(error)}", exc_info=error)
+        if isinstance(error, StageError):
+            error = error.error
+        return (create_error_message(error), "", "", ""), True
+    if kind == "finished":
+        results = payload[0]
+        return (
+            format_outputs(
+                results["result"],
+                results["report"],
+                results["comparison_of_jd"],
+                results["markdown_content"],
+                results["artifact"],
+            ),
+            True,
+        )
+    if kind == "stage":
+        name, value = payload
+        completed[name] = value
+        if name == "sections" and "result" not in completed:
+            completed["preview"] = analyzer.analyze_resume_fast(value)
+            return format_progress(completed), False
+        if name in ("result", "comparison_of_jd"):
+            return format_progress(completed), False
+    elif kind == "partial_report":
+        return format_progress(completed, payload[0]), False
+    return None, False
+
+
+def process_resume_fast_safe(pdf_file: str) -> Tuple[str, str, str, str]:
+    """`process_resume_fast`, with errors rendered as an error message."""
+    try:
+        return process_resume_fast(pdf_file)
     except Exception as e:
         logger.error(f"Error processing resume: {str(e)}", exc_info=True)
         return create_error_message(e), "", "", ""
 
 
-def create_interface() -> gr.Blocks:
+def process_resume_fast(pdf_file: str) -> Tuple[str, str, str, str]:
+    """Score the resume locally without any LLM calls."""
+    sections = analyzer.extract_pdf_content(pdf_file)
+    result = analyzer.analyze_resume_fast(sections)
+    return format_outputs(
+        result,
+        None,
+        None,
+        "### Fast mode scores the resume locally. Turn it off to generate an optimized resume.",
+    )
+
+
+def build_stages(
+    pdf_file: str,
+    model_config,
+    api_key: str,
+    additional_instructions: str,
+    job_descriptions: str,
+    report_fn,
+) -> List[Stage]:
+    """
+    Build the processing pipeline. The job description comparison only needs
+    the extracted content, so it runs alongside the analysis -> report chain.
+    Long resumes skip that chain: one map-reduce pass over their parts
+    yields both the analysis and the report, and additional instructions are
+    applied by a separate rewrite of the parts, so changing them keeps the
+    analysis.
+    """
+    return [
+        Stage("sections", lambda: analyzer.extract_pdf_content(pdf_file)),
+        Stage(
+            "chunked",
+            lambda sections: (
+                analyzer.chunked_analysis(model_config, api_key, sections, "")
+                if needs_chunking(sections)
+                else None
+            ),
+            deps=["sections"],
+        ),
+        Stage(
+            "result",
+            lambda sections, chunked: (
+                chunked["analysis"]
+                if chunked
+                else analyzer.analyze_resume(sections, model_config, api_key)
+            ),
+            deps=["sections", "chunked"],
+        ),
+        Stage(
+            "report",
+            lambda sections, result, chunked: (
+                analyzer.chunked_report(
+                    model_config, api_key, chunked, additional_instructions, sections
+                )
+                if chunked
+                else report_fn(
+                    model_config,
+                    api_key,
+                    result,
+                    additional_instructions,
+                    sections,
+                )
+            ),
+            deps=["sections", "result", "chunked"],
+        ),
+        Stage(
+            "comparison_of_jd",
+            lambda sections: analyzer.compare_with_job_descriptions(
+                model_config, api_key, sections, job_descriptions
+            ),
+            deps=["sections"],
+        ),
+        Stage(
+            "markdown_content",
+            lambda report: report.get("content", ""),
+            deps=["report"],
+        ),
+    ]
+
+
+def build_combined_stages(
+    pdf_file: str,
+    model_config,
+    api_key: str,
+    additional_instructions: str,
+    job_descriptions: str,
+) -> List[Stage]:
+    """
+    Build the single-call pipeline: one LLM call returns the analysis, the
+    optimized resume and the job comparison. Several pasted job descriptions
+    are still ranked separately, alongside the combined call.
+    """
+    rank_separately = len(split_job_descriptions(job_descriptions or "")) > 1
+    stages = [
+        Stage("sections", lambda: analyzer.extract_pdf_content(pdf_file)),
+        Stage(
+            "combined",
+            lambda sections: analyzer.combined_analysis(
+                model_config,
+                api_key,
+                sections,
+                additional_instructions or "",
+                "" if rank_separately else job_descriptions,
+            ),
+            deps=["sections"],
+        ),
+        Stage("result", lambda combined: combined["analysis"], deps=["combined"]),
+        Stage("report", lambda combined: combined["report"], deps=["combined"]),
+        Stage(
+            "markdown_content",
+            lambda report: report.get("content", ""),
+            deps=["report"],
+        ),
+    ]
+    if rank_separately:
+        stages.append(
+            Stage(
+                "comparison_of_jd",
+                lambda sections: analyzer.compare_with_job_descriptions(
+                    model_config, api_key, sections, job_descriptions
+                ),
+                deps=["sections"],
+            )
+        )
+    else:
+        stages.append(
+            Stage(
+                "comparison_of_jd",
+                lambda combined: combined["job_comparision"],
+                deps=["combined"],
+            )
+        )
+    return stages
+
+
+def stage_keys(
+    pdf_file: str,
+    model_config,
+    additional_instructions: str,
+    job_descriptions: str,
+    combined_mode: bool = False,
+) -> Dict[str, str]:
+    """
+    Hash each stage's own inputs, so that e.g. changing only the additional
+    instructions re-runs the report but reuses the extraction, analysis and
+    job comparison from the previous run in this session.
+    """
+    with open(pdf_file, "rb") as f:
+        pdf = content_hash(f.read())
+    model = content_hash(model_config)
+    instructions = (additional_instructions or "").strip()
+    jd = (job_descriptions or "").strip()
+
+    keys = {
+        "sections": pdf,
+        "comparison_of_jd": content_hash(pdf, model, jd),
+    }
+    if combined_mode:
+        keys["combined"] = content_hash(pdf, model, instructions, jd)
+        if len(split_job_descriptions(jd)) <= 1:
+            # Part of the combined response, not a separate stage result.
+            del keys["comparison_of_jd"]
+    else:
+        keys["chunked"] = content_hash(pdf, model)
+        keys["result"] = content_hash(pdf, model)
+        keys["report"] = content_hash(pdf, model, instructions)
+        keys["markdown_content"] = keys["report"]
+    return keys
+
+
+def artifact_stage(pdf_file: str, session_memo: Optional[Dict]) -> Stage:
+    """
+    Save the optimized resume in the background, namespaced by session.
+    Yields the file's path, or None with RESUME_ARTIFACTS=0.
+    """
+    namespace = session_namespace(session_memo)
+    return Stage(
+        "artifact",
+        lambda markdown_content: (
+            artifact_store.save(namespace, pdf_file, markdown_content)
+            if ARTIFACTS_ENABLED and markdown_content
+            else None
+        ),
+        deps=["markdown_content"],
+    )
+
+
+def session_namespace(session_memo: Optional[Dict]) -> str:
+    """A random id kept in the session's memo; "default" without a session."""
+    if session_memo is None:
+        return "default"
+    return session_memo.setdefault("session_id", uuid.uuid4().hex)
+
+
+def build_suggestions(result: Dict) -> Dict:
+    """Pick the analysis fields the report prompt builds on."""
+    return {
+        "detailed_recommendations": result.get("detailed_recommendations", []),
+        "improvement_strategies": result.get("improvement_strategies", []),
+    }
+
+
+def generate_report(
+    model_config,
+    api_key: str,
+    result: Dict,
+    additional_instructions: str,
+    sections: Dict,
+) -> Dict:
+    """Generate the optimized resume report from the analysis suggestions."""
+    return analyzer.markdown_report(
+        model_config,
+        api_key,
+        build_suggestions(result),
+        additional_instructions or "",
+        sections,
+    )
+
+
+def create_interface() -> "gr.Blocks":
     """Create and return the Gradio interface."""
+    # gradio is imported by the UI builders only, so headless callers of the
+    # pipeline (batch jobs, workers, benchmarks) don't pay for loading it.
+    import gradio as gr
+
     with gr.Blocks(
         title="Smart Resume Analyzer & Optimizer",
         css="footer {visibility: hidden} .container { max-width: 1200px; margin: 0 auto; }",
@@ -98,6 +661,10 @@ def create_interface() -> gr.Blocks:
             with gr.TabItem("📄 Optimized Resume", id=3):
                 markdown_output = gr.Markdown()
 
+        # Per-session stage results, so re-running with only new instructions
+        # re-generates the report alone.
+        input_components["session_memo"] = gr.State({})
+
         setup_event_handlers(
             input_components,
             [analysis_output, report_output, comparison_output, markdown_output],
@@ -108,6 +675,8 @@ def create_interface() -> gr.Blocks:
 
 def setup_event_handlers(inputs: Dict, outputs: list):
     """Setup event handlers for the interface."""
+    import gradio as gr
+
     # Model selection handlers
     inputs["model_dropdown"].change(
         fn=lambda x: (
@@ -121,7 +690,8 @@ def setup_event_handlers(inputs: Dict, outputs: list):
             gr.update(
                 visible=x == "Groq Model", value="" if x != "Groq Model" else None
             ),
-            gr.update(visible=x != "Ollama Model"),
+            # Ollama needs no key, and Auto uses the server's keys.
+            gr.update(visible=x not in ("Ollama Model", AUTO_MODEL)),
         ),
         inputs=[inputs["model_dropdown"]],
         outputs=[
@@ -133,8 +703,10 @@ def setup_event_handlers(inputs: Dict, outputs: list):
     )
 
     # Submit button handler remains the same
+    # Admission control in process_resume_async bounds concurrency, so Gradio's
+    # own per-event limit (1 by default) is lifted.
     inputs["submit_btn"].click(
-        fn=process_resume,
+        fn=process_resume_async,
         inputs=[
             inputs["pdf_input"],
             inputs["model_dropdown"],
@@ -144,13 +716,19 @@ def setup_event_handlers(inputs: Dict, outputs: list):
             inputs["api_key_input"],
             inputs["additional_instructions"],
             inputs["job_descriptions"],
+            inputs["fast_mode"],
+            inputs["combined_mode"],
+            inputs["session_memo"],
         ],
         outputs=outputs,
+        concurrency_limit=None,
     )
 
 
 def create_header():
     """Create the application header."""
+    import gradio as gr
+
     gr.Markdown(
         """
         # 🚀 Smart Resume Analyzer & Optimizer
@@ -166,6 +744,8 @@ def create_header():
 
 def create_input_section() -> Dict:
     """Create and return input components."""
+    import gradio as gr
+
     with gr.Column(scale=1):
         pdf_input = gr.File(
             label="📎 Upload Your Resume (PDF)",
@@ -174,7 +754,7 @@ def create_input_section() -> Dict:
 
         with gr.Row():
             model_dropdown = gr.Dropdown(
-                choices=list(analyzer.supported_models.keys()),
+                choices=ui_models(),
                 label="🤖 Select AI Model",
                 value="Mistral Medium",
             )
@@ -212,6 +792,16 @@ def create_input_section() -> Dict:
             lines=5,
         )
 
+        fast_mode = gr.Checkbox(
+            label="⚡ Fast mode (local ATS scoring only, no AI model or API key needed)",
+            value=False,
+        )
+
+        combined_mode = gr.Checkbox(
+            label="🧩 Combined mode (one AI call for analysis, optimized resume and job match; needs a large context window)",
+            value=False,
+        )
+
         submit_btn = gr.Button("🔍 Analyze Resume", variant="primary", scale=1)
 
     return {
@@ -223,10 +813,21 @@ def create_input_section() -> Dict:
         "groq_model_input": groq_model_input,
         "additional_instructions": additional_instructions,
         "job_descriptions": job_descriptions,
+        "fast_mode": fast_mode,
+        "combined_mode": combined_mode,
         "submit_btn": submit_btn,
     }
 
 
+def ui_models() -> List[str]:
+    """The models the UI offers; "Auto" only with UI_AUTO_MODEL=1."""
+    return [
+        name
+        for name in analyzer.supported_models
+        if UI_AUTO_MODEL or name != AUTO_MODEL
+    ]
+
+
 def prepare_model_config(
     model: str,
     huggingface_model_name: str,
@@ -234,6 +835,8 @@ def prepare_model_config(
     groq_model_name: str,
 ) -> Dict:
     """Prepare model configuration based on selection."""
+    if model == AUTO_MODEL and not UI_AUTO_MODEL:
+        raise ValueError("The Auto model is not enabled in this interface")
     if model == "HuggingFace Inference API" and huggingface_model_name.strip():
         return {model: huggingface_model_name}
     elif model == "Ollama Model" and ollama_model_name.strip():
@@ -243,26 +846,35 @@ def prepare_model_config(
     return model
 
 
-def load_markdown_content_from_file(pdf_file: str) -> str:
-    """Load markdown content from file."""
-    if not pdf_file:
-        return "### No content provided"
-
-    filename = f"{pdf_file.split('/')[-1].split('.')[0]}_updated_resume.md"
-    return load_markdown_content(f"Resumes/{filename}")
+def report_summary(report: Dict, artifact: Optional[str]) -> Dict:
+    """The report for the Detailed Reports tab; the resume has its own tab."""
+    message = "Your optimized resume is shown in the 'Optimized Resume' tab."
+    if artifact:
+        message += f" A copy has been saved as '{artifact}'."
+    message += (
+        " For a summary of the modifications made, please refer to the below"
+        " section. If you’d like to make further changes, feel free to provide"
+        " additional instructions in the 'Resume Analysis' section."
+    )
+    return {**report, "content": message}
 
 
 def format_outputs(
-    result: Dict, report: str, comparison_of_jd: str, markdown_content: str
+    result: Dict,
+    report: Dict,
+    comparison_of_jd: str,
+    markdown_content: str,
+    artifact: Optional[str] = None,
 ) -> Tuple[str, str, str, str]:
     """Format all outputs for display."""
-    ats_score_html = format_ats_score(result.get("ats_score", {}))
-    recommendations_html = format_recommendations(
-        result.get("detailed_recommendations", [])
-    )
-    strategies_html = format_strategies(result.get("improvement_strategies", []))
-    report_html = format_detailed_report(report)
-    comparison_html = format_job_comparison(comparison_of_jd)
+    with span("render"):
+        ats_score_html = format_ats_score(result.get("ats_score", {}))
+        recommendations_html = format_recommendations(
+            result.get("detailed_recommendations", [])
+        )
+        strategies_html = format_strategies(result.get("improvement_strategies", []))
+        report_html = format_detailed_report(report_summary(report, artifact))
+        comparison_html = format_job_comparison(comparison_of_jd)
 
     return (
         ats_score_html,
@@ -272,6 +884,61 @@ def format_outputs(
     )
 
 
+PREVIEW_NOTICE = """
+    <div style='padding: 10px 20px; background: #383838; border-radius: 10px; color: #e0e0e0;'>
+        ⚡ Preview from the local scorer. The AI analysis will replace it shortly.
+    </div>
+"""
+
+
+def format_progress(
+    completed: Dict, partial_report: Dict = None
+) -> Tuple[str, str, str, str]:
+    """Format whatever is available while the pipeline is still running."""
+    result = completed.get("result") or completed.get("preview") or {}
+    partial_report = partial_report or {}
+    report_html = ""
+    if "result" not in completed and result:
+        report_html = PREVIEW_NOTICE
+    if result:
+        report_html += format_recommendations(
+            result.get("detailed_recommendations", [])
+        ) + format_strategies(result.get("improvement_strategies", []))
+    if partial_report:
+        report_html += format_detailed_report(partial_report)
+
+    return (
+        format_ats_score(result.get("ats_score", {})),
+        report_html,
+        format_job_comparison(completed.get("comparison_of_jd")),
+        partial_report.get("content", ""),
+    )
+
+
+# How often queued requests get a fresh queue position.
+QUEUE_POLL_SECONDS = 1.0
+
+
+def create_queue_message(position: int) -> str:
+    """Create the message shown while waiting for a free analysis slot."""
+    return f"""
+        <div style='padding: 20px; background: #383838; border-radius: 10px; color: #e0e0e0;'>
+            <h3>⏳ Waiting for a free slot</h3>
+            <p>You are number {position} in the queue. Your analysis will start automatically.</p>
+        </div>
+    """
+
+
+def create_busy_message(message: str) -> str:
+    """Create the message shown when a request is turned away under load."""
+    return f"""
+        <div style='padding: 20px; background: #fef3c7; border-radius: 10px; color: #92400e;'>
+            <h3>🚦 Busy, try again</h3>
+            <p>{message}</p>
+        </div>
+    """
+
+
 def create_error_message(error: Exception) -> str:
     """Create formatted error message."""
     return f"""
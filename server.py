@@ -0,0 +1,146 @@
+"""
+Run the analyzer as several worker processes on one host.
+
+Example:
+    python server.py --workers 4 --port 7860    # workers on ports 7860-7863
+
+Each worker is a uvicorn process serving app:app (the Gradio UI plus
+/healthz, /readyz and /metrics) on its own port. Gradio keeps queue and
+session state in process memory, so put a load balancer with sticky
+sessions in front of the ports rather than sharing one socket. Workers
+share the on-disk LLM and PDF caches and the provider rate limits through
+SQLite in WAL mode. Crashed workers are restarted.
+"""
+
+import argparse
+import logging
+import multiprocessing
+import os
+import signal
+import sys
+import time
+from typing import Dict
+
+logger = logging.getLogger(__name__)
+
+# A worker that dies sooner than this after starting is restarted with a delay,
+# so a bad deploy doesn't spin in a tight crash loop.
+MIN_WORKER_UPTIME_SECONDS = 10.0
+RESTART_DELAY_SECONDS = 5.0
+
+
+def serve(host: str, port: int, log_level: str):
+    """Worker process entry point."""
+    import uvicorn
+
+    uvicorn.run("app:app", host=host, port=port, log_level=log_level)
+
+
+def share_state_between_workers():
+    """Default the shared-store settings on; explicit env values still win."""
+    # Read by utils.retry and utils.resume_analyzer when the workers import them.
+    os.environ.setdefault("LLM_RATE_LIMITS_SHARED", "1")
+    os.environ.setdefault("PDF_CACHE_DISK", "1")
+
+
+class Supervisor:
+    """Starts one worker per port and restarts any that exit unexpectedly."""
+
+    def __init__(self, host: str, ports, log_level: str = "info"):
+        self.host = host
+        self.ports = list(ports)
+        self.log_level = log_level
+        self.workers: Dict[int, multiprocessing.Process] = {}
+        self.started: Dict[int, float] = {}
+        self.stopping = False
+        # Spawn rather than fork: workers must not inherit the supervisor's
+        # threads or any half-initialized state.
+        self._context = multiprocessing.get_context("spawn")
+
+    def start(self, port: int):
+        process = self._context.Process(
+            target=serve,
+            args=(self.host, port, self.log_level),
+            name=f"worker-{port}",
+        )
+        process.start()
+        self.workers[port] = process
+        self.started[port] = time.monotonic()
+        logger.info(f"Started worker pid {process.pid} on port {port}")
+
+    def stop(self, *_):
+        self.stopping = True
+
+    def run(self) -> int:
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        for port in self.ports:
+            self.start(port)
+        restart_at: Dict[int, float] = {}
+        while not self.stopping:
+            time.sleep(0.5)
+            now = time.monotonic()
+            for port, process in list(self.workers.items()):
+                if process.is_alive() or self.stopping:
+                    continue
+                if port not in restart_at:
+                    uptime = now - self.started[port]
+                    delay = (
+                        RESTART_DELAY_SECONDS
+                        if uptime < MIN_WORKER_UPTIME_SECONDS
+                        else 0.0
+                    )
+                    logger.warning(
+                        f"Worker on port {port} exited with code "
+                        f"{process.exitcode}; restarting in {delay:.0f}s"
+                    )
+                    restart_at[port] = now + delay
+                if now >= restart_at[port]:
+                    del restart_at[port]
+                    self.start(port)
+        self.shutdown()
+        return 0
+
+    def shutdown(self, timeout: float = 30.0):
+        """SIGTERM every worker, letting uvicorn finish in-flight requests."""
+        for process in self.workers.values():
+            if process.is_alive():
+                process.terminate()
+        deadline = time.monotonic() + timeout
+        for process in self.workers.values():
+            process.join(max(0.0, deadline - time.monotonic()))
+            if process.is_alive():
+                logger.warning(f"Worker pid {process.pid} did not stop; killing it")
+                process.kill()
+                process.join()
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=int(os.getenv("WEB_CONCURRENCY", "0")) or os.cpu_count() or 1,
+        help="Worker processes, one per port (default: $WEB_CONCURRENCY or CPUs)",
+    )
+    parser.add_argument("--host", default=os.getenv("HOST", "0.0.0.0"))
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=int(os.getenv("PORT", "7860")),
+        help="Port of the first worker; the others use the following ports",
+    )
+    parser.add_argument("--log-level", default="info")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    logging.basicConfig(level=logging.INFO)
+    args = parse_args(argv)
+    share_state_between_workers()
+    ports = range(args.port, args.port + max(1, args.workers))
+    return Supervisor(args.host, ports, args.log_level).run()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,9 @@
+import os
+import tempfile
+
+# Keep test runs off the on-disk caches and artifact folder. Must be set
+# before the utils modules are imported.
+_WORKDIR = tempfile.mkdtemp(prefix="resume-tests-")
+os.environ.setdefault("RESUME_ANALYZER_CACHE_DIR", os.path.join(_WORKDIR, "cache"))
+os.environ.setdefault("RESUME_ARTIFACTS_DIR", os.path.join(_WORKDIR, "artifacts"))
+os.environ.setdefault("LLM_CACHE_DISK", "0")
@@ -0,0 +1,20 @@
+import json
+
+from batch import run_batch
+from benchmarks.fake_provider import FakeProvider
+from benchmarks.fixtures import build_corpus
+
+
+def test_batch_analyzes_every_resume_once(tmp_path):
+    model = FakeProvider().register("Fake LLM batch")
+    corpus = build_corpus(str(tmp_path), page_counts=(1, 2, 3))
+    output = str(tmp_path / "results.jsonl")
+
+    counts = run_batch(list(corpus.values()), output, model, "", concurrency=2)
+    assert counts == {"ok": 3, "error": 0, "skipped": 0}
+    with open(output) as f:
+        records = [json.loads(line) for line in f]
+    assert sorted(r["file"] for r in records) == sorted(corpus.values())
+
+    # A re-run skips what is already recorded.
+    assert run_batch(list(corpus.values()), output, model, "")["skipped"] == 3
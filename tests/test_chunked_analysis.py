@@ -0,0 +1,60 @@
+from benchmarks.fake_provider import FakeProvider
+from benchmarks.fixtures import build_corpus
+from utils.chunking import chunk_sections
+from utils.pipeline import run_stages
+
+import main
+from api import build_pipeline_stages
+
+EXPERIENCE = "\n".join(
+    f"- Led project {i}, cutting latency by {10 + i}% for 2M users" for i in range(600)
+)
+SECTIONS = {"header": "Jane Doe", "skills": "Python, SQL", "experience": EXPERIENCE}
+
+
+def test_long_resume_is_analyzed_once_per_request(tmp_path):
+    fake = FakeProvider()
+    model = fake.register("Fake LLM chunked")
+    corpus = build_corpus(str(tmp_path), page_counts=(32,))
+    sections = main.analyzer.extract_pdf_content(corpus[32])
+    parts = len(chunk_sections(sections))
+    assert parts > 1
+
+    memo = {}
+    outputs = main.process_resume(
+        corpus[32], model, "", "", "", "", "", "", session_memo=memo
+    )
+    assert "72/100" in outputs[0]
+    assert fake.calls == parts
+
+    # New instructions only rewrite the parts; the analysis is reused.
+    rewritten = main.process_resume(
+        corpus[32], model, "", "", "", "", "Keep it short", "", session_memo=memo
+    )
+    assert rewritten[0] == outputs[0]
+    assert fake.calls == 2 * parts
+
+
+def test_api_pipeline_runs_map_phase_once():
+    fake = FakeProvider()
+    model = fake.register("Fake LLM pipeline")
+    stages = build_pipeline_stages(model, "", SECTIONS, "", "")
+    results = run_stages(stages)
+    assert fake.calls == len(chunk_sections(SECTIONS))
+    assert results["analysis"]["ats_score"]["overall_score"] == 72
+    assert results["report"]["content"]
+
+
+def test_report_of_long_resume_does_not_rescore_it():
+    fake = FakeProvider()
+    model = fake.register("Fake LLM report only")
+    kinds, kind = [], fake.kind
+    fake.kind = lambda prompt: kinds.append(kind(prompt)) or kinds[-1]
+    suggestions = {"detailed_recommendations": ["Quantify"]}
+    reports = list(
+        main.analyzer.markdown_report_stream(model, "", suggestions, "", SECTIONS)
+    )
+    assert [done for _, done in reports] == [True]
+    assert reports[0][0]["content"]
+    # One report-only call per part, no scoring pass.
+    assert kinds == ["report"] * len(chunk_sections(SECTIONS))
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from utils.clients import ClientRegistry
+
+
+class FakeClient:
+    def __init__(self):
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_slow_factory_does_not_block_other_clients():
+    registry = ClientRegistry()
+    started = threading.Event()
+
+    def slow_factory():
+        started.set()
+        time.sleep(0.5)
+        return FakeClient()
+
+    thread = threading.Thread(target=registry.get, args=("slow", "key", slow_factory))
+    thread.start()
+    started.wait()
+    begin = time.monotonic()
+    registry.get("fast", "key", FakeClient)
+    assert time.monotonic() - begin < 0.2
+    thread.join()
+
+
+def test_concurrent_builds_share_one_client():
+    registry = ClientRegistry()
+    built = []
+    barrier = threading.Barrier(4)
+
+    def factory():
+        barrier.wait()
+        built.append(FakeClient())
+        return built[-1]
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(registry.get("p", "k", factory)))
+        for _ in range(4)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len({id(client) for client in results}) == 1
+    assert sum(not client.closed for client in built) == 1
+
+
+def test_evicted_clients_are_not_closed():
+    registry = ClientRegistry(max_size=1)
+    first = registry.get("p", "key-1", FakeClient)
+    registry.get("p", "key-2", FakeClient)
+    assert len(registry) == 1
+    assert not first.closed
+    assert registry.get("p", "key-1", FakeClient) is not first
@@ -0,0 +1,28 @@
+from benchmarks.fake_provider import FakeProvider
+from utils import llm_models
+from utils.data_models import JobComparisionResult
+from utils.llm_models import (
+    get_response_from_llm_model,
+    response_cache,
+    response_cache_key,
+)
+
+PROMPT = 'Compare. {"percentage_of_chances": ...} fallback cache test'
+
+
+def test_fallback_answer_is_cached_under_the_fallback_model(monkeypatch):
+    primary = FakeProvider(error_rate=1.0).register("Fake Primary")
+    fallback = FakeProvider().register("Fake Fallback")
+    monkeypatch.setattr(llm_models, "FALLBACK_MODELS", [fallback])
+
+    response = get_response_from_llm_model(
+        primary,
+        "",
+        PROMPT,
+        max_retries=1,
+        retry_delay=0,
+        result_model=JobComparisionResult,
+    )
+    assert response["percentage_of_chances"] == 64
+    assert response_cache.get(response_cache_key(primary, PROMPT)) is None
+    assert response_cache.get(response_cache_key(fallback, PROMPT)) == response
@@ -0,0 +1,33 @@
+from utils.resume_analyzer import ResumeAnalyzer
+from utils.jd_ranking import split_job_descriptions
+
+SINGLE_JD = """Senior Backend Engineer
+
+
+We are looking for a backend engineer with 5+ years of Python experience
+and strong SQL and PostgreSQL skills.
+
+
+Responsibilities include designing APIs, owning services in production and
+mentoring other engineers on the team.
+
+
+Experience with Kafka, Terraform and CI/CD pipelines is a plus."""
+
+
+def test_single_posting_with_spaced_paragraphs_is_not_split():
+    assert split_job_descriptions(SINGLE_JD) == [SINGLE_JD]
+
+
+def test_rule_lines_and_numbered_titles_split_postings():
+    text = f"{SINGLE_JD}\n---\n{SINGLE_JD}\nJob 3: Data Engineer\n{SINGLE_JD}"
+    postings = split_job_descriptions(text)
+    assert len(postings) == 3
+    assert postings[2].startswith("Job 3: Data Engineer")
+
+
+def test_missing_job_description_is_reported():
+    comparison = ResumeAnalyzer().compare_with_job_descriptions(
+        "Mistral Medium", "", {"skills": "Python"}, "  "
+    )
+    assert comparison["analysis"] == "No job description provided."
@@ -0,0 +1,38 @@
+import json
+
+import pytest
+
+from utils.data_models import MarkdownResult
+from utils.json_repair import extract_json
+from utils.llm_models import parse_llm_response
+from utils.retry import ResponseParseError
+
+REPORT = {
+    "content": "# Resume\n\n```python\nprint('hi')\n```\n\n## Skills\n- Python",
+    "changes": ["Added a code sample"],
+    "additional": "",
+}
+
+
+def test_fenced_response_with_code_block_in_content():
+    text = "```json\n" + json.dumps(REPORT) + "\n```"
+    assert extract_json(text) == (REPORT, False)
+
+
+def test_code_block_in_content_without_outer_fence():
+    text = "Here you go:\n" + json.dumps(REPORT, indent=2)
+    assert extract_json(text) == (REPORT, False)
+
+
+def test_repairs_common_defects():
+    value, repaired = extract_json("{'content': 'x', changes: ['a',], additional: None}")
+    assert repaired
+    assert value == {"content": "x", "changes": ["a"], "additional": None}
+
+
+def test_truncated_object_is_a_parse_failure():
+    text = "```json\n" + json.dumps(REPORT)[:40]
+    with pytest.raises(ValueError):
+        extract_json(text)
+    with pytest.raises(ResponseParseError):
+        parse_llm_response(text, MarkdownResult)
@@ -0,0 +1,13 @@
+from benchmarks.fixtures import build_corpus
+from utils import pdf_extraction
+from utils.pdf_extraction import extract_text
+
+
+def test_parallel_extraction_matches_serial_and_never_forks(tmp_path):
+    path = build_corpus(str(tmp_path), page_counts=(32,))[32]
+    with open(path, "rb") as f:
+        data = f.read()
+
+    serial = extract_text(data, max_workers=1)
+    assert extract_text(data, threshold=2, max_workers=2) == serial
+    assert pdf_extraction._get_pool()._mp_context.get_start_method() == "spawn"
@@ -0,0 +1,38 @@
+import threading
+import time
+
+import pytest
+
+from benchmarks.fake_provider import FakeProvider
+from utils.llm_models import get_response_from_llm_model
+from utils.pipeline import Stage, StageError, current_cancel_event, run_stages
+
+
+def test_failed_stage_stops_sibling_llm_retries():
+    fake = FakeProvider(error_rate=1.0)
+    model = fake.register("Fake LLM cancel")
+    finished = threading.Event()
+
+    def slow_llm_stage():
+        try:
+            return get_response_from_llm_model(
+                model, "", "cancel test", max_retries=10, retry_delay=5
+            )
+        finally:
+            finished.set()
+
+    def failing_stage():
+        time.sleep(0.2)
+        raise ValueError("boom")
+
+    with pytest.raises(StageError, match="boom"):
+        run_stages([Stage("llm", slow_llm_stage), Stage("boom", failing_stage)])
+    # Without cancellation the backoff alone would keep it retrying for minutes.
+    assert finished.wait(2)
+    assert fake.calls <= 2
+
+
+def test_cancel_event_is_only_visible_inside_stages():
+    events = run_stages([Stage("event", current_cancel_event)])
+    assert isinstance(events["event"], threading.Event)
+    assert current_cancel_event() is None
@@ -0,0 +1,46 @@
+import logging
+
+from utils.prompt_builder import (
+    PromptTemplate,
+    compact_text,
+    log_token_savings,
+    strip_running_lines,
+)
+
+
+def test_compaction_keeps_ranges_and_standalone_numbers():
+    text = "Worked 2016-\n2020 on infra-\nstructure\nUsers served\n100\nmore"
+    assert compact_text(text) == (
+        "Worked 2016-\n2020 on infrastructure\nUsers served\n100\nmore"
+    )
+
+
+def test_page_numbers_are_dropped_only_where_pages_have_them():
+    pages = [
+        "Jane Doe\nExperience\n- Led X\n100\n- Led Y\n1",
+        "Jane Doe\n- Led Z\n2",
+        "Jane Doe\nSkills\nPython\n3",
+    ]
+    text = strip_running_lines("\f".join(pages))
+    assert text == (
+        "Jane Doe\nExperience\n- Led X\n100\n- Led Y\f- Led Z\fSkills\nPython"
+    )
+    assert compact_text("Metrics\n100\n250") == "Metrics\n100\n250"
+
+
+def test_legacy_payload_is_only_built_for_debug_logging(caplog):
+    calls = []
+
+    def legacy():
+        calls.append(1)
+        return "x" * 1000
+
+    template = PromptTemplate("Resume: {{resume_content}}")
+    prompt = template.render(resume_content="short")
+    log_token_savings("test", template, prompt, legacy, len("short"))
+    assert calls == []
+
+    with caplog.at_level(logging.DEBUG, logger="utils.prompt_builder"):
+        log_token_savings("test", template, prompt, legacy, len("short"))
+    assert calls == [1]
+    assert "test prompt" in caplog.text
@@ -0,0 +1,77 @@
+import pytest
+
+from utils.retry import (
+    MAX_BACKOFF_SECONDS,
+    RateLimiterRegistry,
+    ResponseParseError,
+    SharedTokenBucket,
+    TokenBucket,
+    backoff_delay,
+    classify_error,
+)
+
+
+class HTTPError(Exception):
+    def __init__(self, status_code, headers=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.headers = headers or {}
+
+
+@pytest.mark.parametrize("status", [408, 429, 500, 503])
+def test_transient_statuses_are_retried(status):
+    assert classify_error(HTTPError(status)) == (True, None)
+
+
+@pytest.mark.parametrize("status", [400, 401, 404, 409, 425])
+def test_other_client_errors_are_fatal(status):
+    assert classify_error(HTTPError(status)) == (False, None)
+
+
+def test_retry_after_and_wrapped_errors():
+    try:
+        try:
+            raise HTTPError(429, {"retry-after": "7"})
+        except HTTPError as e:
+            raise RuntimeError("adapter failed") from e
+    except RuntimeError as wrapped:
+        assert classify_error(wrapped) == (True, 7.0)
+
+    assert classify_error(ResponseParseError("bad JSON")) == (True, None)
+    assert classify_error(TimeoutError()) == (True, None)
+    assert classify_error(ValueError("unknown model")) == (False, None)
+
+
+def test_backoff_is_jittered_capped_and_honors_retry_after():
+    for attempt in range(1, 10):
+        delay = backoff_delay(attempt, 2)
+        assert 0 <= delay <= min(MAX_BACKOFF_SECONDS, 2 * 2 ** (attempt - 1))
+    assert backoff_delay(1, 0.01, retry_after=5) == 5
+    assert backoff_delay(1, 0.01, retry_after=10_000) == MAX_BACKOFF_SECONDS
+
+
+def test_token_bucket_allows_a_burst_then_waits():
+    bucket = TokenBucket(rate=10, capacity=2)
+    assert bucket._reserve() == 0
+    assert bucket._reserve() == 0
+    assert bucket._reserve() == pytest.approx(0.1, abs=0.01)
+
+
+def test_shared_bucket_is_one_bucket_across_connections(tmp_path):
+    path = str(tmp_path / "state.sqlite3")
+    buckets = []
+    for _ in range(2):
+        registry = RateLimiterRegistry({"Fake": (1.0, 2)}, shared_path=path)
+        buckets.append(registry.get("Fake", "key"))
+    assert all(isinstance(bucket, SharedTokenBucket) for bucket in buckets)
+    assert buckets[0]._reserve() == 0
+    assert buckets[1]._reserve() == 0
+    # Both registries drew from the same two tokens.
+    assert buckets[0]._reserve() == pytest.approx(1.0, abs=0.05)
+
+
+def test_unlisted_providers_are_not_throttled():
+    registry = RateLimiterRegistry({"Fake": (1.0, 1)})
+    assert registry.get("Other", "key") is None
+    assert registry.throttle("Other", "key") == 0.0
+    assert registry.get("Fake", "a") is not registry.get("Fake", "b")
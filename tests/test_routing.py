@@ -0,0 +1,40 @@
+import pytest
+
+from utils import routing
+from utils.routing import model_stats, rank_by_health
+
+MODELS = [("A", "fast", "fast"), ("B", "slow", "slow"), ("C", "new", "new")]
+
+
+@pytest.fixture(autouse=True)
+def fresh_stats(monkeypatch):
+    model_stats.reset()
+    monkeypatch.setattr(routing, "PROBE_FRACTION", 0.0)
+    yield
+    model_stats.reset()
+
+
+def test_unmeasured_models_get_the_prior_not_zero():
+    model_stats.record_call("A", "fast", 1.0, ok=True)
+    model_stats.record_call("B", "slow", 30.0, ok=True)
+    assert rank_by_health(MODELS) == ["fast", "new", "slow"]
+
+
+def test_stale_model_keeps_its_last_latency(monkeypatch):
+    model_stats.record_call("A", "fast", 1.0, ok=True)
+    model_stats.record_call("B", "slow", 30.0, ok=True)
+    monkeypatch.setattr(routing, "STATS_STALE_SECONDS", -1.0)
+    assert model_stats.stale("B", "slow")
+    assert rank_by_health(MODELS)[-1] == "slow"
+
+
+def test_cold_start_keeps_tier_order():
+    assert rank_by_health(MODELS) == ["fast", "slow", "new"]
+
+
+def test_probes_put_a_stale_model_first(monkeypatch):
+    model_stats.record_call("A", "fast", 1.0, ok=True)
+    model_stats.record_call("B", "slow", 30.0, ok=True)
+    monkeypatch.setattr(routing, "PROBE_FRACTION", 1.0)
+    assert rank_by_health(MODELS)[0] == "new"
+    assert rank_by_health(MODELS)[1:] == ["fast", "slow"]
@@ -0,0 +1,86 @@
+from benchmarks.fixtures import make_pdf
+from utils.prompts import (
+    get_comparision_with_job_description_prompt,
+    get_resume_analyzer_prompt,
+)
+from utils.resume_analyzer import ResumeAnalyzer
+from utils.sections import find_sections, split_sections
+
+RESUME = """Jane Doe
+jane@example.com
+
+Professional Summary:
+Backend engineer.
+
+WORK EXPERIENCE
+- Led X
+Skills
+Python, SQL
+Experience
+- Older job"""
+
+
+def test_sections_in_one_pass_with_offsets():
+    sections = find_sections(RESUME)
+    assert [s.name for s in sections] == [
+        "header",
+        "summary",
+        "experience",
+        "skills",
+        "experience",
+    ]
+    summary = sections[1]
+    assert summary.heading == "Professional Summary"
+    assert RESUME[summary.start :].startswith("Professional Summary:")
+    assert summary.body(RESUME) == "Backend engineer."
+
+
+def test_repeated_headings_are_merged():
+    sections = split_sections(RESUME)
+    assert sections["experience"] == "- Led X\n\n- Older job"
+    assert split_sections("no headings\njust text") == {
+        "content": "no headings\njust text"
+    }
+
+
+def test_running_header_does_not_leak_into_sections(tmp_path):
+    running = "Jane Doe - Curriculum Vitae"
+    pages = [
+        [running, "Summary", "Backend engineer.", "Experience", "- Led X"],
+        [running, "- Led Y", "Education", "BSc Computer Science"],
+        [running, "Skills", "Python, SQL"],
+    ]
+    path = tmp_path / "running.pdf"
+    path.write_bytes(make_pdf(pages))
+
+    sections = ResumeAnalyzer().extract_pdf_content(str(path))
+    assert sections["header"] == running
+    prompt = get_resume_analyzer_prompt(sections)
+    assert prompt.count(running) == 1
+
+
+def test_sub_headings_inside_a_role_stay_with_it():
+    text = (
+        "Experience\nAcme Corp\nAchievements:\n- Led Kafka migration\n"
+        "Globex, Engineer\nTechnologies\nGo, Postgres\nAwards\n- Hackathon winner\n"
+        "Education\nBSc Computer Science"
+    )
+    sections = split_sections(text)
+    assert list(sections) == ["experience", "education"]
+    assert "Kafka" in sections["experience"]
+    assert "Hackathon" in sections["experience"]
+
+    prompt = get_comparision_with_job_description_prompt(sections, "Kafka engineer")
+    assert "Kafka" in prompt and "Globex" in prompt
+
+
+def test_secondary_headings_need_capitals_or_a_blank_line():
+    text = "Experience\n- Led X\n\nAWARDS\n- Best paper\nLanguages\n\nFrench"
+    assert list(split_sections(text)) == ["experience", "awards", "languages"]
+
+
+def test_job_comparison_keeps_sections_it_does_not_omit():
+    sections = {"header": "Jane", "awards": "Kafka award", "interests": "Chess"}
+    prompt = get_comparision_with_job_description_prompt(sections, "Kafka")
+    assert "Kafka award" in prompt and "Jane" in prompt
+    assert "Chess" not in prompt
@@ -0,0 +1,32 @@
+import asyncio
+
+import main
+
+
+def _raise(*args, **kwargs):
+    raise ValueError("Unsupported model configuration")
+
+
+def test_stream_reports_stage_construction_errors(monkeypatch):
+    monkeypatch.setattr(main, "prepare_model_config", _raise)
+    outputs = list(
+        main.process_resume_stream("resume.pdf", "Bad", "", "", "", "", "", "")
+    )
+    assert len(outputs) == 1
+    assert "Unsupported model configuration" in outputs[0][0]
+
+
+def test_async_reports_stage_construction_errors(monkeypatch):
+    monkeypatch.setattr(main, "prepare_model_config", _raise)
+
+    async def collect():
+        return [
+            outputs
+            async for outputs in main.process_resume_async(
+                "resume.pdf", "Bad", "", "", "", "", "", ""
+            )
+        ]
+
+    outputs = asyncio.run(collect())
+    assert "Unsupported model configuration" in outputs[-1][0]
+    assert main.admission.queued == 0
@@ -0,0 +1,16 @@
+import pytest
+
+import main
+from utils.routing import AUTO_MODEL
+
+
+def test_auto_model_is_hidden_from_the_ui_by_default(monkeypatch):
+    monkeypatch.setattr(main, "UI_AUTO_MODEL", False)
+    assert AUTO_MODEL not in main.ui_models()
+    assert "Mistral Medium" in main.ui_models()
+    with pytest.raises(ValueError, match="not enabled"):
+        main.prepare_model_config(AUTO_MODEL, "", "", "")
+
+    monkeypatch.setattr(main, "UI_AUTO_MODEL", True)
+    assert AUTO_MODEL in main.ui_models()
+    assert main.prepare_model_config(AUTO_MODEL, "", "", "") == AUTO_MODEL
@@ -0,0 +1,188 @@
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from . import metrics
+
+# Analyses running at once, and how many more may wait for a slot before new
+# requests are turned away with a "busy" message.
+MAX_ACTIVE_ANALYSES = int(os.getenv("MAX_ACTIVE_ANALYSES", "8"))
+MAX_QUEUED_ANALYSES = int(os.getenv("MAX_QUEUED_ANALYSES", "32"))
+# Queued requests give up after this long rather than waiting indefinitely.
+MAX_QUEUE_WAIT_SECONDS = float(os.getenv("MAX_QUEUE_WAIT_SECONDS", "120"))
+# In-flight LLM calls per provider, e.g. LLM_CONCURRENCY="Mistral=2,OpenAI=16".
+DEFAULT_PROVIDER_CONCURRENCY = int(os.getenv("LLM_CONCURRENCY_DEFAULT", "4"))
+
+
+class ServerBusy(RuntimeError):
+    """Raised when the wait queue is full or a queued request waited too long."""
+
+
+class AdmissionController:
+    """
+    Admits at most `max_active` analyses at a time; up to `max_queued` more
+    wait in FIFO order and anything beyond that is rejected immediately.
+
+    Used from a single event loop: `enter()` returns None when admitted right
+    away, or a future that resolves once a slot is handed over. Every
+    `enter()` must be paired with `leave()`, including on cancellation.
+    """
+
+    def __init__(
+        self,
+        max_active: int = MAX_ACTIVE_ANALYSES,
+        max_queued: int = MAX_QUEUED_ANALYSES,
+    ):
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.active = 0
+        self._queue: Deque[asyncio.Future] = deque()
+
+    def enter(self) -> Optional[asyncio.Future]:
+        if self.active < self.max_active and not self._queue:
+            self.active += 1
+            self._update_gauges()
+            return None
+        if self.saturated():
+            metrics.increment("admission_rejected_total", reason="queue_full")
+            raise ServerBusy(
+                "The analyzer is at capacity right now. Please try again in a minute."
+            )
+        waiter = asyncio.get_running_loop().create_future()
+        self._queue.append(waiter)
+        self._update_gauges()
+        return waiter
+
+    @property
+    def queued(self) -> int:
+        return len(self._queue)
+
+    def saturated(self) -> bool:
+        """True when new requests would be turned away as busy."""
+        return len(self._queue) >= self.max_queued
+
+    def position(self, waiter: Optional[asyncio.Future]) -> int:
+        """1-based position of `waiter` in the queue, 0 once admitted."""
+        try:
+            return self._queue.index(waiter) + 1
+        except ValueError:
+            return 0
+
+    def leave(self, waiter: Optional[asyncio.Future]):
+        """Release an admitted slot, or drop `waiter` from the queue."""
+        if waiter is not None and not waiter.done():
+            waiter.cancel()
+            self._queue.remove(waiter)
+            self._update_gauges()
+            return
+        # Hand the slot straight to the next waiter so nobody can jump the queue.
+        while self._queue:
+            successor = self._queue.popleft()
+            if not successor.done():
+                successor.set_result(True)
+                self._update_gauges()
+                return
+        self.active -= 1
+        self._update_gauges()
+
+    async def wait(self, waiter: asyncio.Future, timeout: float) -> bool:
+        """Wait up to `timeout` seconds for `waiter`; True once admitted."""
+        await asyncio.wait({waiter}, timeout=timeout)
+        return waiter.done()
+
+    @asynccontextmanager
+    async def admitted(
+        self, timeout: float = MAX_QUEUE_WAIT_SECONDS
+    ) -> AsyncIterator[None]:
+        """
+        Hold a slot for the enclosed block, queueing for up to `timeout`
+        seconds first. Raises ServerBusy when the queue is full or the wait
+        times out.
+        """
+        waiter = self.enter()
+        try:
+            if waiter is not None:
+                queued_at = time.perf_counter()
+                if not await self.wait(waiter, timeout):
+                    metrics.increment("admission_rejected_total", reason="wait_timeout")
+                    raise ServerBusy(
+                        "The analyzer is still busy. Please try again in a few minutes."
+                    )
+                metrics.observe(
+                    "admission_wait_seconds", time.perf_counter() - queued_at
+                )
+            yield
+        finally:
+            self.leave(waiter)
+
+    def _update_gauges(self):
+        metrics.set_gauge("admission_active", self.active)
+        metrics.set_gauge("admission_queue_depth", len(self._queue))
+
+
+def _load_provider_limits() -> Dict[str, int]:
+    limits = {}
+    for item in os.getenv("LLM_CONCURRENCY", "").split(","):
+        if "=" in item:
+            provider, value = item.split("=", 1)
+            limits[provider.strip()] = int(value)
+    return limits
+
+
+class ProviderConcurrency:
+    """
+    Caps in-flight LLM calls per provider, so one slow provider can only hold
+    its own share of threads. Calls beyond the cap block until a slot frees.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, int]] = None,
+        default: int = DEFAULT_PROVIDER_CONCURRENCY,
+    ):
+        self.limits = _load_provider_limits() if limits is None else limits
+        self.default = default
+        self._semaphores: Dict[str, threading.BoundedSemaphore] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, provider: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            semaphore = self._semaphores.get(provider)
+            if semaphore is None:
+                limit = self.limits.get(provider, self.default)
+                semaphore = threading.BoundedSemaphore(max(1, limit))
+                self._semaphores[provider] = semaphore
+            return semaphore
+
+    def _track(self, provider: str, delta: int):
+        with self._lock:
+            self._in_flight[provider] = self._in_flight.get(provider, 0) + delta
+            in_flight = self._in_flight[provider]
+        metrics.set_gauge("llm_in_flight", in_flight, provider=provider)
+
+    @contextmanager
+    def slot(self, provider: str):
+        semaphore = self._semaphore(provider)
+        if not semaphore.acquire(blocking=False):
+            start = time.perf_counter()
+            semaphore.acquire()
+            metrics.observe(
+                "llm_concurrency_wait_seconds",
+                time.perf_counter() - start,
+                provider=provider,
+            )
+        self._track(provider, 1)
+        try:
+            yield
+        finally:
+            self._track(provider, -1)
+            semaphore.release()
+
+
+admission = AdmissionController()
+provider_concurrency = ProviderConcurrency()
@@ -0,0 +1,153 @@
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from typing import Optional, Set
+
+from . import metrics
+from .cache import content_hash
+
+logger = logging.getLogger(__name__)
+
+# Optimized resumes are kept as files under ARTIFACTS_DIR/<session>/ unless
+# RESUME_ARTIFACTS=0; the UI itself never reads them back.
+ARTIFACTS_ENABLED = os.getenv("RESUME_ARTIFACTS", "1") != "0"
+ARTIFACTS_DIR = os.getenv("RESUME_ARTIFACTS_DIR", "Resumes")
+# Files older than the retention period are deleted, then the oldest ones until
+# the store fits in ARTIFACTS_MAX_BYTES. Checked at most every interval.
+ARTIFACTS_RETENTION_SECONDS = float(
+    os.getenv("RESUME_ARTIFACTS_RETENTION_SECONDS", str(7 * 24 * 3600))
+)
+ARTIFACTS_MAX_BYTES = int(
+    os.getenv("RESUME_ARTIFACTS_MAX_BYTES", str(256 * 1024 * 1024))
+)
+ARTIFACTS_CLEANUP_INTERVAL_SECONDS = 300
+
+_UNSAFE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _safe(part: str, default: str) -> str:
+    part = _UNSAFE.sub("_", part).strip("._")
+    return part[:64] or default
+
+
+class ArtifactStore:
+    """
+    Content-addressed files written off the request path.
+
+    `save()` returns the final path at once and writes in a background
+    thread; identical content maps to the same file, so concurrent sessions
+    never overwrite each other. Only files inside namespace directories are
+    ever cleaned up.
+    """
+
+    def __init__(
+        self,
+        root: str = ARTIFACTS_DIR,
+        retention: float = ARTIFACTS_RETENTION_SECONDS,
+        max_bytes: int = ARTIFACTS_MAX_BYTES,
+        cleanup_interval: float = ARTIFACTS_CLEANUP_INTERVAL_SECONDS,
+    ):
+        self.root = root
+        self.retention = retention
+        self.max_bytes = max_bytes
+        self.cleanup_interval = cleanup_interval
+        self._executor = ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="artifacts"
+        )
+        self._pending: Set[Future] = set()
+        self._lock = threading.Lock()
+        self._last_cleanup = 0.0
+
+    def path_for(self, namespace: str, name: str, content: str) -> str:
+        stem = _safe(os.path.splitext(os.path.basename(name or ""))[0], "resume")
+        digest = content_hash(content)[:16]
+        return os.path.join(
+            self.root,
+            _safe(namespace, "default"),
+            f"{stem}_updated_resume-{digest}.md",
+        )
+
+    def save(self, namespace: str, name: str, content: str) -> str:
+        """Queue `content` for writing and return the path it will have."""
+        path = self.path_for(namespace, name, content)
+        future = self._executor.submit(self._write, path, content)
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._done)
+        return path
+
+    def _done(self, future: Future):
+        with self._lock:
+            self._pending.discard(future)
+        if future.exception() is not None:
+            metrics.increment("artifact_write_errors_total")
+            logger.warning(f"Could not save artifact: {future.exception()}")
+
+    def flush(self, timeout: Optional[float] = None):
+        """Wait for queued writes, e.g. before shutting down."""
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending, timeout=timeout)
+
+    def _write(self, path: str, content: str):
+        if os.path.exists(path):
+            # Same content already stored; refresh it for the retention policy.
+            os.utime(path)
+        else:
+            directory = os.path.dirname(path)
+            os.makedirs(directory, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(content)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            metrics.increment("artifact_writes_total")
+        if time.monotonic() - self._last_cleanup >= self.cleanup_interval:
+            self._last_cleanup = time.monotonic()
+            self.cleanup()
+
+    def cleanup(self) -> int:
+        """Apply the retention and size limits; returns the files removed."""
+        if not os.path.isdir(self.root):
+            return 0
+        now = time.time()
+        files, removed = [], 0
+        for entry in os.scandir(self.root):
+            if not entry.is_dir():
+                continue  # only namespaces are managed
+            for item in os.scandir(entry.path):
+                if item.is_file():
+                    stat = item.stat()
+                    files.append((stat.st_mtime, stat.st_size, item.path))
+
+        files.sort()
+        total = sum(size for _, size, _ in files)
+        for mtime, size, path in files:
+            if now - mtime <= self.retention and total <= self.max_bytes:
+                break
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+            removed += 1
+
+        for entry in os.scandir(self.root):
+            if entry.is_dir():
+                try:
+                    os.rmdir(entry.path)  # only succeeds once it is empty
+                except OSError:
+                    pass
+        if removed:
+            metrics.increment("artifact_cleanup_removed_total", removed)
+        return removed
+
+
+artifact_store = ArtifactStore()
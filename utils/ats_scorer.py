@@ -0,0 +1,309 @@
+"""
+Deterministic, LLM-free ATS scoring.
+
+Scores the same categories as the LLM analysis (see CategoryBreakdowns) from
+keyword coverage against industry term lists, section presence, bullet and
+metric usage and simple readability statistics. It runs in milliseconds, so
+it serves both as a "fast mode" and as an instant preview while the LLM
+analysis is still running.
+"""
+
+import re
+from typing import Dict, List
+
+import numpy as np
+
+from .data_models import ATSScore, CategoryBreakdowns, FinalResult
+from .sections import find_sections, join_sections
+
+# Same weights the analyzer prompt asks the LLM to use.
+CATEGORY_WEIGHTS = {
+    "keyword_optimization": 0.35,
+    "structural_formatting": 0.25,
+    "content_quality": 0.20,
+    "professional_narrative": 0.15,
+    "additional_factors": 0.05,
+}
+
+# fmt: off
+INDUSTRY_TERMS = {
+    "software": [
+        "python", "java", "javascript", "typescript", "go", "rust", "c++", "sql",
+        "api", "rest", "microservices", "docker", "kubernetes", "aws", "azure",
+        "gcp", "ci/cd", "git", "linux", "testing", "agile", "scrum", "react",
+        "node", "django", "flask", "fastapi", "backend", "frontend", "cloud",
+        "distributed", "scalable", "architecture", "devops", "terraform",
+    ],
+    "data": [
+        "python", "sql", "machine learning", "deep learning", "statistics",
+        "pandas", "numpy", "tensorflow", "pytorch", "scikit-learn", "spark",
+        "hadoop", "etl", "data pipeline", "tableau", "power bi", "analytics",
+        "modeling", "nlp", "llm", "experimentation", "a/b testing", "airflow",
+        "snowflake", "bigquery", "visualization", "regression", "forecasting",
+    ],
+    "management": [
+        "leadership", "stakeholder", "roadmap", "strategy", "budget", "hiring",
+        "mentoring", "cross-functional", "okrs", "kpis", "delivery", "planning",
+        "operations", "process improvement", "risk management", "vendor",
+        "agile", "scrum", "program management", "product management",
+        "p&l", "executive", "coaching", "performance reviews",
+    ],
+    "marketing": [
+        "seo", "sem", "content", "campaign", "brand", "social media", "crm",
+        "hubspot", "salesforce", "google analytics", "conversion", "funnel",
+        "email marketing", "copywriting", "market research", "roi", "growth",
+        "segmentation", "paid media", "engagement", "lead generation",
+    ],
+    "finance": [
+        "financial modeling", "forecasting", "budgeting", "excel", "gaap",
+        "ifrs", "audit", "valuation", "reconciliation", "accounts payable",
+        "accounts receivable", "variance analysis", "fp&a", "compliance",
+        "reporting", "risk", "tax", "treasury", "sap", "erp",
+    ],
+    "design": [
+        "figma", "sketch", "adobe", "photoshop", "illustrator", "ux", "ui",
+        "user research", "wireframes", "prototyping", "usability testing",
+        "design systems", "accessibility", "interaction design", "typography",
+        "information architecture", "personas", "journey mapping",
+    ],
+}
+
+ACTION_VERBS = {
+    "achieved", "built", "created", "delivered", "designed", "developed",
+    "drove", "established", "executed", "improved", "increased", "launched",
+    "led", "managed", "optimized", "reduced", "implemented", "automated",
+    "streamlined", "spearheaded", "owned", "architected", "mentored",
+    "negotiated", "generated", "scaled", "migrated", "resolved", "analyzed",
+}
+# fmt: on
+
+# Headings are recognized by utils.sections.
+SECTION_WEIGHTS = {
+    "experience": 0.3,
+    "education": 0.2,
+    "skills": 0.25,
+    "summary": 0.15,
+    "projects": 0.05,
+    "certifications": 0.05,
+}
+
+_WORD = re.compile(r"[a-z][a-z0-9+#/&.-]*[a-z0-9+#]|[a-z]")
+_SENTENCE_SPLIT = re.compile(r"[.!?]+\s+|\n+")
+_BULLET = re.compile(r"^\s*(?:[-•*▪●◦‣]|\d+[.)])\s+")
+_METRIC = re.compile(r"\d+(?:[.,]\d+)?\s*(?:%|x\b|k\b|m\b|\+)|[$€£]\s?\d|\b\d{2,}\b")
+_EMAIL = re.compile(r"[\w.+-]+@[\w-]+\.[\w.]+")
+_PHONE = re.compile(r"\+?\d[\d\s().-]{7,}\d")
+_LINK = re.compile(r"linkedin\.com|github\.com|https?://", re.IGNORECASE)
+_FIRST_PERSON = re.compile(r"\b(i|me|my|mine)\b", re.IGNORECASE)
+_VOWEL_GROUPS = re.compile(r"[aeiouy]+")
+
+
+def _build_vocabulary():
+    vocabulary = sorted({term for terms in INDUSTRY_TERMS.values() for term in terms})
+    index = {term: i for i, term in enumerate(vocabulary)}
+    matrix = np.zeros((len(INDUSTRY_TERMS), len(vocabulary)), dtype=np.float32)
+    for row, terms in enumerate(INDUSTRY_TERMS.values()):
+        matrix[row, [index[term] for term in terms]] = 1.0
+    return vocabulary, index, matrix
+
+
+# Industry x term incidence matrix, built once at import time.
+VOCABULARY, TERM_INDEX, INDUSTRY_MATRIX = _build_vocabulary()
+INDUSTRIES = list(INDUSTRY_TERMS)
+
+
+def _term_counts(tokens: List[str]) -> np.ndarray:
+    """Count vocabulary terms (unigrams and bigrams) in one vectorized pass."""
+    bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+    ids = [TERM_INDEX[t] for t in tokens + bigrams if t in TERM_INDEX]
+    return np.bincount(np.asarray(ids, dtype=np.int64), minlength=len(VOCABULARY))
+
+
+def _clip(value: float) -> int:
+    return int(round(float(np.clip(value, 0, 100))))
+
+
+def _keyword_score(tokens: List[str], findings: Dict) -> int:
+    if not tokens:
+        return 0
+    counts = _term_counts(tokens)
+    present = (counts > 0).astype(np.float32)
+    coverage = INDUSTRY_MATRIX @ present / INDUSTRY_MATRIX.sum(axis=1)
+    density = INDUSTRY_MATRIX @ counts / len(tokens)
+
+    best = int(np.argmax(coverage))
+    findings["industry"] = INDUSTRIES[best]
+    findings["matched_terms"] = [
+        VOCABULARY[i] for i in np.flatnonzero(INDUSTRY_MATRIX[best] * present)
+    ]
+    findings["missing_terms"] = [
+        VOCABULARY[i] for i in np.flatnonzero(INDUSTRY_MATRIX[best] * (1 - present))
+    ]
+    # ~40% coverage of an industry list is already strong; 2-6% density of
+    # industry terms reads as targeted rather than stuffed.
+    coverage_score = min(coverage[best] / 0.4, 1.0) * 80
+    density_score = 20 if 0.02 <= density[best] <= 0.06 else 10 * (density[best] > 0)
+    return _clip(coverage_score + density_score)
+
+
+def _find_sections(text: str) -> Dict[str, bool]:
+    present = {section.name for section in find_sections(text)}
+    return {name: name in present for name in SECTION_WEIGHTS}
+
+
+def _structure_score(text: str, lines: List[str], words: int, findings: Dict) -> int:
+    sections = _find_sections(text)
+    findings["sections"] = sections
+    section_score = sum(SECTION_WEIGHTS[name] for name, ok in sections.items() if ok)
+
+    has_contact = bool(_EMAIL.search(text)) + bool(_PHONE.search(text))
+    findings["has_email"] = bool(_EMAIL.search(text))
+    bullets = sum(1 for line in lines if _BULLET.match(line))
+    findings["bullet_count"] = bullets
+    length_ok = 350 <= words <= 1200
+    findings["word_count"] = words
+
+    return _clip(
+        section_score * 60
+        + has_contact * 7.5
+        + min(bullets / 8, 1.0) * 15
+        + (10 if length_ok else 0)
+    )
+
+
+def _content_score(lines: List[str], findings: Dict) -> int:
+    bullet_lines = [line for line in lines if _BULLET.match(line)]
+    candidates = bullet_lines or [line for line in lines if len(line.split()) > 5]
+    if not candidates:
+        return 0
+    with_metrics = np.array([bool(_METRIC.search(line)) for line in candidates])
+    first_words = [
+        _BULLET.sub("", line).strip().split(" ", 1)[0].lower() for line in candidates
+    ]
+    with_verbs = np.array([word in ACTION_VERBS for word in first_words])
+    findings["metric_ratio"] = float(with_metrics.mean())
+    findings["action_verb_ratio"] = float(with_verbs.mean())
+    return _clip(with_metrics.mean() / 0.5 * 55 + with_verbs.mean() / 0.6 * 45)
+
+
+def _narrative_score(text: str, tokens: List[str], findings: Dict) -> int:
+    sentences = [s for s in _SENTENCE_SPLIT.split(text) if len(s.split()) > 2]
+    if not sentences or not tokens:
+        return 0
+    sentence_lengths = np.array([len(s.split()) for s in sentences], dtype=np.float32)
+    syllables = np.array(
+        [max(1, len(_VOWEL_GROUPS.findall(t))) for t in tokens], dtype=np.float32
+    )
+    # Flesch reading ease; resumes land lower than prose, 30-60 is healthy.
+    reading_ease = 206.835 - 1.015 * sentence_lengths.mean() - 84.6 * syllables.mean()
+    findings["reading_ease"] = float(reading_ease)
+    findings["avg_sentence_length"] = float(sentence_lengths.mean())
+    first_person = len(_FIRST_PERSON.findall(text))
+    findings["first_person_count"] = first_person
+
+    readability = 1.0 - min(abs(reading_ease - 45) / 45, 1.0)
+    concise = 1.0 if sentence_lengths.mean() <= 25 else 25 / sentence_lengths.mean()
+    summary = 1.0 if findings.get("sections", {}).get("summary") else 0.0
+    return _clip(
+        readability * 40 + concise * 30 + summary * 20 + (10 if first_person < 3 else 0)
+    )
+
+
+def _additional_score(text: str, findings: Dict) -> int:
+    has_link = bool(_LINK.search(text))
+    findings["has_links"] = has_link
+    sections = findings.get("sections", {})
+    return _clip(
+        has_link * 40
+        + sections.get("certifications", False) * 30
+        + sections.get("projects", False) * 30
+    )
+
+
+def score_text(text: str) -> Dict:
+    """Return {"ats_score": ATSScore, "findings": {...}} for resume text."""
+    lines = [line for line in text.splitlines() if line.strip()]
+    tokens = _WORD.findall(text.lower())
+    findings: Dict = {}
+
+    breakdown = {
+        "keyword_optimization": _keyword_score(tokens, findings),
+        "structural_formatting": _structure_score(text, lines, len(tokens), findings),
+        "content_quality": _content_score(lines, findings),
+    }
+    breakdown["professional_narrative"] = _narrative_score(text, tokens, findings)
+    breakdown["additional_factors"] = _additional_score(text, findings)
+
+    overall = sum(breakdown[name] * weight for name, weight in CATEGORY_WEIGHTS.items())
+    ats_score = ATSScore(
+        overall_score=_clip(overall),
+        category_breakdowns=CategoryBreakdowns(**breakdown),
+    )
+    return {"ats_score": ats_score, "findings": findings}
+
+
+def _recommendations(findings: Dict) -> List[str]:
+    recommendations = []
+    missing = [name for name, ok in findings.get("sections", {}).items() if not ok]
+    for name in missing:
+        if SECTION_WEIGHTS[name] >= 0.15:
+            recommendations.append(
+                f"Add a clearly labelled '{name.title()}' section so ATS parsers can find it."
+            )
+    if findings.get("missing_terms"):
+        terms = ", ".join(findings["missing_terms"][:8])
+        recommendations.append(
+            f"Consider covering common {findings['industry']} keywords you have experience with: {terms}."
+        )
+    if findings.get("metric_ratio", 0) < 0.3:
+        recommendations.append(
+            "Quantify more achievements with numbers, percentages or amounts."
+        )
+    if findings.get("action_verb_ratio", 0) < 0.4:
+        recommendations.append(
+            "Start bullet points with strong action verbs (e.g. led, built, reduced)."
+        )
+    if not findings.get("has_email"):
+        recommendations.append("Include a professional email address in the header.")
+    if findings.get("bullet_count", 0) < 5:
+        recommendations.append(
+            "Use bullet points for responsibilities and achievements instead of paragraphs."
+        )
+    return recommendations
+
+
+def _strategies(findings: Dict) -> List[str]:
+    strategies = []
+    words = findings.get("word_count", 0)
+    if words < 350:
+        strategies.append(
+            "Expand on the scope and impact of your most relevant roles; the resume is short for ATS ranking."
+        )
+    elif words > 1200:
+        strategies.append(
+            "Trim older or less relevant roles; very long resumes dilute keyword density."
+        )
+    if findings.get("avg_sentence_length", 0) > 25:
+        strategies.append("Break long sentences into concise, scannable statements.")
+    if findings.get("first_person_count", 0) >= 3:
+        strategies.append(
+            "Drop first-person pronouns and write in implied first person."
+        )
+    if not findings.get("has_links"):
+        strategies.append("Add LinkedIn, GitHub or portfolio links.")
+    return strategies
+
+
+def analyze_locally(resume_content: Dict[str, str]) -> Dict:
+    """
+    Fill a FinalResult-shaped dict without calling an LLM.
+
+    Accepts the same sections dict the LLM analysis receives.
+    """
+    text = join_sections(resume_content)
+    scored = score_text(text)
+    return FinalResult(
+        ats_score=scored["ats_score"],
+        detailed_recommendations=_recommendations(scored["findings"]),
+        improvement_strategies=_strategies(scored["findings"]),
+    ).model_dump()
@@ -0,0 +1,146 @@
+"""
+Map-reduce over long resumes.
+
+A resume above CHUNK_THRESHOLD_CHARS is packed into parts of whole sections
+(oversized sections are split between lines), each part is scored and
+rewritten by its own, much smaller LLM call, and the per-part results are
+merged here without another call.
+"""
+
+import os
+from typing import Dict, List
+
+from .data_models import FinalResult, MarkdownResult
+
+# Resumes longer than this many characters are analyzed in parts; 0 disables.
+CHUNK_THRESHOLD_CHARS = int(os.getenv("RESUME_CHUNK_THRESHOLD_CHARS", "12000"))
+# Target size of one part. Smaller sections are packed together up to this.
+CHUNK_MAX_CHARS = int(os.getenv("RESUME_CHUNK_MAX_CHARS", "6000"))
+# Parts analyzed at once per resume.
+CHUNK_CONCURRENCY = int(os.getenv("RESUME_CHUNK_CONCURRENCY", "8"))
+# Merged recommendations and strategies are capped at this many each,
+# taking every part's first items before anyone's later ones.
+MAX_MERGED_ITEMS = 10
+
+# Appended to a section's name when it continues in the next part, so its
+# Markdown heading isn't repeated.
+CONTINUED = "_continued"
+
+
+def needs_chunking(sections: Dict[str, str]) -> bool:
+    size = sum(len(str(value)) for value in sections.values())
+    return CHUNK_THRESHOLD_CHARS > 0 and size > CHUNK_THRESHOLD_CHARS
+
+
+def _split_text(text: str, max_chars: int) -> List[str]:
+    """Split at paragraph, else line, boundaries into pieces of about max_chars."""
+    pieces, current = [], ""
+    for separator in ("\n\n", "\n"):
+        if all(len(block) <= max_chars for block in text.split(separator)):
+            break
+    for block in text.split(separator):
+        if current and len(current) + len(separator) + len(block) > max_chars:
+            pieces.append(current)
+            current = block
+        else:
+            current = f"{current}{separator}{block}" if current else block
+    if current:
+        pieces.append(current)
+    return pieces
+
+
+def chunk_sections(
+    sections: Dict[str, str], max_chars: int = CHUNK_MAX_CHARS
+) -> List[Dict[str, str]]:
+    """
+    Parts of at most about `max_chars`, each a sections dict in document
+    order. A section only spans parts when it is larger than one part.
+    """
+    parts: List[Dict[str, str]] = []
+    current: Dict[str, str] = {}
+    size = 0
+    for name, value in sections.items():
+        pieces = _split_text(str(value), max_chars)
+        for index, piece in enumerate(pieces):
+            key = name if index == 0 else name + CONTINUED
+            if current and size + len(piece) > max_chars:
+                parts.append(current)
+                current, size = {}, 0
+            current[key] = piece
+            size += len(piece)
+    if current:
+        parts.append(current)
+    return parts
+
+
+def _interleave(lists: List[List[str]], limit: int) -> List[str]:
+    """Round-robin over the lists, dropping repeats, up to `limit` items."""
+    merged, seen = [], set()
+    for row in range(max(map(len, lists), default=0)):
+        for items in lists:
+            if row < len(items) and items[row].strip().lower() not in seen:
+                seen.add(items[row].strip().lower())
+                merged.append(items[row])
+    return merged[:limit]
+
+
+def merge_analyses(analyses: List[Dict], sizes: List[int]) -> Dict:
+    """
+    Reduce per-part FinalResult dicts to one. Scores are averaged weighted
+    by part size.
+    """
+    total = sum(sizes) or 1
+
+    def weighted(scores: List[int]) -> int:
+        return round(sum(s * size for s, size in zip(scores, sizes)) / total)
+
+    categories = analyses[0]["ats_score"]["category_breakdowns"].keys()
+    return FinalResult.model_validate(
+        {
+            "ats_score": {
+                "overall_score": weighted(
+                    [a["ats_score"]["overall_score"] for a in analyses]
+                ),
+                "category_breakdowns": {
+                    name: weighted(
+                        [a["ats_score"]["category_breakdowns"][name] for a in analyses]
+                    )
+                    for name in categories
+                },
+            },
+            "detailed_recommendations": _interleave(
+                [a["detailed_recommendations"] for a in analyses], MAX_MERGED_ITEMS
+            ),
+            "improvement_strategies": _interleave(
+                [a["improvement_strategies"] for a in analyses], MAX_MERGED_ITEMS
+            ),
+        }
+    ).model_dump()
+
+
+def merge_reports(reports: List[Dict]) -> Dict:
+    """Reduce per-part MarkdownResult dicts to one, in document order."""
+    return MarkdownResult.model_validate(
+        {
+            "content": "\n\n".join(
+                r["content"].strip() for r in reports if r["content"].strip()
+            ),
+            "changes": [change for r in reports for change in r["changes"]],
+            "additional": "\n\n".join(
+                dict.fromkeys(
+                    r["additional"].strip() for r in reports if r["additional"].strip()
+                )
+            ),
+        }
+    ).model_dump()
+
+
+def merge_results(results: List[Dict], sizes: List[int]) -> Dict:
+    """
+    Reduce per-part CombinedResult dicts to {"analysis": FinalResult,
+    "report": MarkdownResult}.
+    """
+    return {
+        "analysis": merge_analyses([result["analysis"] for result in results], sizes),
+        "report": merge_reports([result["report"] for result in results]),
+    }
@@ -0,0 +1,126 @@
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+MAX_CLIENTS = int(os.getenv("LLM_CLIENT_POOL_SIZE", "32"))
+CLIENT_IDLE_SECONDS = float(os.getenv("LLM_CLIENT_IDLE_SECONDS", "600"))
+HTTP_POOL_MAXSIZE = int(os.getenv("LLM_HTTP_POOL_MAXSIZE", "16"))
+
+
+def key_fingerprint(api_key: Optional[str]) -> str:
+    """Short, non-reversible identifier for an API key, safe to log."""
+    if not api_key:
+        return "-"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def _close(client: Any):
+    close = getattr(client, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception:
+            pass
+
+
+class ClientRegistry:
+    """
+    Long-lived provider clients keyed by (provider, API key, host).
+
+    SDK clients own their HTTP connection pools, so reusing them keeps
+    connections alive across requests instead of paying a TLS handshake on
+    every call. The registry is bounded (least recently used clients are
+    dropped first) and clients idle for longer than `idle_seconds` are
+    dropped on the next access. Dropped clients aren't closed, since another
+    thread may still be mid-request with one; their connections are released
+    when the last reference goes away. Clients are built outside the lock,
+    so a slow SDK import or client construction only delays its own caller.
+    API keys are only ever stored as fingerprints.
+    """
+
+    def __init__(
+        self, max_size: int = MAX_CLIENTS, idle_seconds: float = CLIENT_IDLE_SECONDS
+    ):
+        self.max_size = max_size
+        self.idle_seconds = idle_seconds
+        self._clients: "OrderedDict[tuple, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        provider: str,
+        api_key: Optional[str],
+        factory: Callable[[], Any],
+        host: Optional[str] = None,
+    ) -> Any:
+        key = (provider, key_fingerprint(api_key), host or "")
+        client = self._lookup(key)
+        if client is not None:
+            return client
+
+        built = factory()
+        with self._lock:
+            entry = self._clients.get(key)
+            if entry is not None:
+                # Another thread built one meanwhile; ours was never used.
+                client = entry[0]
+            else:
+                client = built
+                self._clients[key] = [client, time.monotonic()]
+                while len(self._clients) > self.max_size:
+                    self._clients.popitem(last=False)
+        if client is not built:
+            _close(built)
+        return client
+
+    def _lookup(self, key: tuple) -> Optional[Any]:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            entry = self._clients.get(key)
+            if entry is None:
+                return None
+            entry[1] = now
+            self._clients.move_to_end(key)
+            return entry[0]
+
+    def _evict_idle(self, now: float):
+        stale_keys = [
+            key
+            for key, (_, last_used) in self._clients.items()
+            if now - last_used > self.idle_seconds
+        ]
+        for key in stale_keys:
+            del self._clients[key]
+
+    def clear(self):
+        """Close every client, e.g. at shutdown; unlike eviction, this closes."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            _close(client)
+
+    def __len__(self):
+        return len(self._clients)
+
+    def __repr__(self):
+        return f"ClientRegistry(size={len(self)}, max_size={self.max_size})"
+
+
+def new_http_session() -> requests.Session:
+    """A requests session with a keep-alive connection pool."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=HTTP_POOL_MAXSIZE)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+client_registry = ClientRegistry()
@@ -1,40 +1,79 @@
-from pydantic import BaseModel, Field
-from typing import List
+from pydantic import BaseModel, BeforeValidator, Field
+from typing import Annotated, List, Optional
+
+
+def _to_int(value):
+    """Accept the "85%" and 72.5 that models sometimes return for scores."""
+    if isinstance(value, str):
+        value = value.strip().rstrip("%").strip()
+        try:
+            value = float(value)
+        except ValueError:
+            return value
+    if isinstance(value, float):
+        return round(value)
+    return value
+
+
+Score = Annotated[int, BeforeValidator(_to_int)]
 
 
 class CategoryBreakdowns(BaseModel):
-    keyword_optimization: int
-    structural_formatting: int
-    content_quality: int
-    professional_narrative: int
-    additional_factors: int
+    keyword_optimization: Score = 0
+    structural_formatting: Score = 0
+    content_quality: Score = 0
+    professional_narrative: Score = 0
+    additional_factors: Score = 0
 
 
 class ATSScore(BaseModel):
-    overall_score: int
-    category_breakdowns: CategoryBreakdowns
+    overall_score: Score
+    category_breakdowns: CategoryBreakdowns = Field(default_factory=CategoryBreakdowns)
 
 
 class FinalResult(BaseModel):
     ats_score: ATSScore
-    detailed_recommendations: List[str]
-    improvement_strategies: List[str]
+    detailed_recommendations: List[str] = Field(default_factory=list)
+    improvement_strategies: List[str] = Field(default_factory=list)
 
 
 class MarkdownResult(BaseModel):
     content: str = Field(description="Fully transformed Markdown resume document.")
     changes: List[str] = Field(
-        description="Track changes you made in resume content. Provide the exact words or section you have added or modified in the resume."
+        default_factory=list,
+        description="Track changes you made in resume content. Provide the exact words or section you have added or modified in the resume.",
     )
     additional: str = Field(
-        description="Additional answer to the user additional instructions. If no additional instructions provided then make this empty. Make sure output is normal text and not a markdown text."
+        default="",
+        description="Additional answer to the user additional instructions. If no additional instructions provided then make this empty. Make sure output is normal text and not a markdown text.",
     )
 
+
 class JobComparisionResult(BaseModel):
     analysis: str = Field(description="Analysis of job description and resume")
-    percentage_of_chances: int = Field(
+    percentage_of_chances: Score = Field(
         description="percentage for candidate to get selected for given job descriptions. This should be approximately percentage based on the resume and job description candidate can get selected."
     )
     suggestions: str = Field(
-        description="To get selected for job description what candidate needs to do provide some suggestions"
+        default="",
+        description="To get selected for job description what candidate needs to do provide some suggestions",
+    )
+
+
+class RankedJobComparisionResult(JobComparisionResult):
+    rank: int = Field(description="1-based rank among the pasted job descriptions.")
+    title: str = Field(description="First line of the job description.")
+    similarity: float = Field(
+        description="Local TF-IDF cosine similarity used to shortlist the posting."
+    )
+
+
+class CombinedResult(BaseModel):
+    analysis: FinalResult = Field(description="ATS score and recommendations.")
+    report: MarkdownResult = Field(
+        description="Optimized resume applying the analysis recommendations."
+    )
+    job_comparision: Optional[JobComparisionResult] = Field(
+        default=None,
+        description="Comparison with the job description. Null if no job description is provided.",
     )
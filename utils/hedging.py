@@ -0,0 +1,145 @@
+import contextvars
+import os
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Deque, Dict, List, NamedTuple, Optional, Tuple
+
+from . import metrics
+
+# Ordered fallback models, e.g.
+# LLM_FALLBACK_MODELS="Groq Model:llama-3.3-70b-versatile,Ollama Model:llama3.2".
+# Custom models take their provider-side name after the first colon.
+FALLBACK_MODELS = [
+    spec.strip()
+    for spec in os.getenv("LLM_FALLBACK_MODELS", "").split(",")
+    if spec.strip()
+]
+# With LLM_HEDGE=1, a request still running after the model's observed p90
+# latency is duplicated to the next fallback; otherwise fallbacks are only
+# tried after errors.
+HEDGE_ENABLED = os.getenv("LLM_HEDGE", "0") == "1"
+HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "90"))
+# Until a model has this many samples, hedge after a fixed delay instead.
+HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+HEDGE_DEFAULT_DELAY_SECONDS = float(os.getenv("LLM_HEDGE_DELAY_SECONDS", "15"))
+HEDGE_THREADS = int(os.getenv("LLM_HEDGE_THREADS", "64"))
+
+
+class Candidate(NamedTuple):
+    provider: str
+    model: Any  # a SUPPORTED_MODELS key, or {key: custom model name}
+    api_key: str
+
+
+class RequestCancelled(RuntimeError):
+    """A request stopped because another candidate answered or its pipeline failed."""
+
+
+def parse_model_spec(spec: str):
+    """'Groq Model:llama3' -> {'Groq Model': 'llama3'}; plain names unchanged."""
+    name, _, custom = spec.partition(":")
+    return {name.strip(): custom.strip()} if custom.strip() else name.strip()
+
+
+class LatencyTracker:
+    """Recent successful call latencies per (provider, model)."""
+
+    def __init__(self, window: int = 200):
+        self.window = window
+        self._samples: Dict[Tuple[str, str], Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, provider: str, model: str, seconds: float):
+        with self._lock:
+            samples = self._samples.get((provider, model))
+            if samples is None:
+                samples = self._samples[(provider, model)] = deque(maxlen=self.window)
+            samples.append(seconds)
+
+    def percentile(
+        self, provider: str, model: str, percent: float, min_samples: int = 1
+    ) -> Optional[float]:
+        with self._lock:
+            samples = sorted(self._samples.get((provider, model), ()))
+        if len(samples) < max(1, min_samples):
+            return None
+        return samples[min(len(samples) - 1, int(len(samples) * percent / 100))]
+
+
+latency_tracker = LatencyTracker()
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+
+
+def _hedge_executor() -> ThreadPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=HEDGE_THREADS, thread_name_prefix="llm-hedge"
+            )
+        return _executor
+
+
+def first_success(
+    candidates: List[Candidate],
+    request: Callable[[Candidate, threading.Event], Any],
+    hedge_delay: Callable[[Candidate], Optional[float]],
+) -> Any:
+    """
+    Return the first successful `request(candidate, cancel)` over `candidates`.
+
+    The next candidate is started when every running one has failed, or,
+    when `hedge_delay(candidate)` returns a delay, as soon as the latest one
+    has been running that long. Once a request succeeds, `cancel` is set so
+    the others stop retrying; a provider call already in flight can't be
+    interrupted and its result is discarded.
+    """
+    cancel = threading.Event()
+    remaining = list(candidates)
+    pending: Dict[Future, Candidate] = {}
+    errors = []
+
+    def launch(reason: Optional[str]) -> Optional[float]:
+        candidate = remaining.pop(0)
+        if reason:
+            metrics.increment(
+                "llm_fallback_requests_total",
+                provider=candidate.provider,
+                reason=reason,
+            )
+        context = contextvars.copy_context()
+        future = _hedge_executor().submit(context.run, request, candidate, cancel)
+        pending[future] = candidate
+        return hedge_delay(candidate)
+
+    delay = launch(None)
+    try:
+        while pending:
+            done, _ = wait(
+                pending,
+                timeout=delay if remaining else None,
+                return_when=FIRST_COMPLETED,
+            )
+            if not done:
+                delay = launch("slow")
+                continue
+            for future in done:
+                candidate = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    errors.append(e)
+                    continue
+                metrics.increment(
+                    "llm_fallback_winner_total",
+                    provider=candidate.provider,
+                    primary=candidate is candidates[0],
+                )
+                return result
+            if not pending and remaining:
+                delay = launch("error")
+    finally:
+        cancel.set()
+    raise errors[-1]
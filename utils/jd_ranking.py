@@ -0,0 +1,102 @@
+import re
+import zlib
+from typing import List, Tuple
+
+import numpy as np
+
+# Hashed term-vector width; collisions are negligible for a few dozen postings.
+HASH_DIMENSIONS = 2**14
+MIN_POSTING_CHARS = 80
+
+# Lines that separate pasted postings: rules (---, ===, ***) are dropped,
+# numbered titles ("Job 2: Backend Engineer") start the next posting.
+_RULE = re.compile(r"^\s*[-=*_#~]{3,}\s*$")
+_NUMBERED_TITLE = re.compile(
+    r"^\s*(?:job(?: description| posting)?|posting|role)\s*#?\d+\b", re.IGNORECASE
+)
+_TOKEN = re.compile(r"[a-z][a-z0-9+#.]*[a-z0-9+#]|[a-z]")
+_STOPWORDS = frozenset(
+    "a an and are as at be by for from has have in is it of on or our that the "
+    "their this to we will with you your who what which job role team work "
+    "experience years ability strong skills".split()
+)
+
+
+def split_job_descriptions(text: str) -> List[str]:
+    """
+    Split a textbox of pasted postings into individual job descriptions.
+
+    Postings are separated by rule lines (---, ===) or numbered titles
+    ("Job 2:"). Blank lines are not separators: a single posting often has
+    widely spaced paragraphs. Fragments too short to be a posting are merged
+    into the previous one.
+    """
+    text = text.strip()
+    if not text:
+        return []
+
+    parts, current = [], []
+    for line in text.splitlines():
+        if _RULE.match(line) or _NUMBERED_TITLE.match(line):
+            parts.append("\n".join(current))
+            current = [] if _RULE.match(line) else [line]
+        else:
+            current.append(line)
+    parts.append("\n".join(current))
+
+    postings = []
+    for part in (part.strip() for part in parts):
+        if not part:
+            continue
+        if postings and len(part) < MIN_POSTING_CHARS:
+            postings[-1] = f"{postings[-1]}\n{part}"
+        else:
+            postings.append(part)
+    return postings
+
+
+def posting_title(posting: str, max_length: int = 80) -> str:
+    """First non-empty line of a posting, for display."""
+    for line in posting.splitlines():
+        line = line.strip(" \t#*-:")
+        if line:
+            return line[:max_length]
+    return "Job description"
+
+
+def _term_ids(text: str) -> np.ndarray:
+    tokens = [t for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+    return np.fromiter(
+        (zlib.crc32(token.encode("utf-8")) % HASH_DIMENSIONS for token in tokens),
+        dtype=np.int64,
+        count=len(tokens),
+    )
+
+
+def _tfidf_matrix(documents: List[str]) -> np.ndarray:
+    counts = np.stack(
+        [np.bincount(_term_ids(doc), minlength=HASH_DIMENSIONS) for doc in documents]
+    ).astype(np.float32)
+    # Sublinear tf, smoothed idf, L2-normalized rows.
+    tf = np.log1p(counts)
+    df = (counts > 0).sum(axis=0)
+    idf = np.log((1 + len(documents)) / (1 + df)) + 1
+    matrix = tf * idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1, norms)
+
+
+def rank_job_descriptions(
+    resume_text: str, postings: List[str]
+) -> List[Tuple[int, float]]:
+    """
+    Rank postings by cosine similarity of hashed TF-IDF vectors to the resume.
+
+    Returns (posting index, similarity) pairs, most similar first.
+    """
+    if not postings:
+        return []
+    matrix = _tfidf_matrix([resume_text] + postings)
+    similarities = matrix[1:] @ matrix[0]
+    order = np.argsort(-similarities, kind="stable")
+    return [(int(i), float(similarities[i])) for i in order]
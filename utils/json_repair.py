@@ -0,0 +1,115 @@
+import json
+import re
+from typing import Any, Dict, Tuple
+
+# A ```json ... ``` fence around the whole response. Anchored at both ends so
+# a code block inside a Markdown string value doesn't end it early.
+_FENCE = re.compile(r"\A\s*```[a-zA-Z]*[ \t]*\n(.*)\n[ \t]*```\s*\Z", re.DOTALL)
+_WORD = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_TRAILING_COMMA = re.compile(r",\s*[}\]]")
+_KEY_COLON = re.compile(r"\s*:")
+# Opening quote -> characters that close it.
+_QUOTES = {'"': '"', "'": "'", "\u201c": "\u201d"}
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+_ESCAPES = {"\n": "\\n", "\r": "\\r", "\t": "\\t"}
+
+
+def extract_json(text: str) -> Tuple[Dict[str, Any], bool]:
+    """
+    Extract the JSON object from an LLM response.
+
+    Markdown fences and prose around the object are ignored. If the object
+    itself is not valid JSON, common defects are repaired: trailing commas,
+    single or curly quotes, unquoted keys, Python literals and raw newlines in
+    strings. Truncated output is not completed: a cut-off object would pass
+    validation with defaulted fields, so it is rejected to trigger a re-ask.
+
+    Returns (object, repaired) and raises ValueError if nothing usable is found.
+    """
+    fence = _FENCE.match(text)
+    if fence and "{" in fence.group(1):
+        text = fence.group(1)
+    start = text.find("{")
+    if start == -1:
+        raise ValueError("No JSON object found in response")
+    candidate = text[start : _object_end(text, start)]
+
+    try:
+        value = json.loads(candidate)
+        repaired = False
+    except json.JSONDecodeError:
+        try:
+            value = json.loads(_repair(candidate))
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Response is not valid or complete JSON: {e}") from e
+        repaired = True
+
+    if not isinstance(value, dict):
+        raise ValueError("Response does not contain a valid JSON object")
+    return value, repaired
+
+
+def _object_end(text: str, start: int) -> int:
+    """Index just past the object starting at `start`, or len(text) if unclosed."""
+    depth = 0
+    in_string = escape = False
+    for i in range(start, len(text)):
+        char = text[i]
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            depth += 1
+        elif char in "}]":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+    return len(text)
+
+
+def _repair(text: str) -> str:
+    out = []
+    closer = None  # characters that end the string being scanned
+    escape = False
+    i = 0
+    while i < len(text):
+        char = text[i]
+        if closer:
+            if escape:
+                escape = False
+                out.append(char)
+            elif char == "\\":
+                escape = True
+                out.append(char)
+            elif char in closer:
+                closer = None
+                out.append('"')
+            elif char == '"':
+                out.append('\\"')
+            else:
+                out.append(_ESCAPES.get(char, char))
+        elif char in _QUOTES:
+            closer = _QUOTES[char]
+            out.append('"')
+        elif char == "," and _TRAILING_COMMA.match(text, i):
+            pass  # trailing comma
+        elif _WORD.match(text, i):
+            word = _WORD.match(text, i).group()
+            i += len(word)
+            if word in _LITERALS:
+                out.append(_LITERALS[word])
+            elif _KEY_COLON.match(text, i):
+                out.append(f'"{word}"')  # unquoted key
+            else:
+                out.append(word)
+            continue
+        else:
+            out.append(char)
+        i += 1
+    return "".join(out)
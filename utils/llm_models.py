@@ -1,15 +1,51 @@
-import json
+import contextvars
+import importlib
+import logging
+import os
+import sys
+import threading
 import time
 import requests
-import openai
-import anthropic
-from mistralai import Mistral
-from ollama import Client
-from huggingface_hub import InferenceClient
-from groq import Groq
+from pydantic import ValidationError
+
+from .admission import provider_concurrency
+from .cache import TieredCache, content_hash
+from .clients import client_registry, new_http_session
+from .hedging import (
+    FALLBACK_MODELS,
+    HEDGE_DEFAULT_DELAY_SECONDS,
+    HEDGE_ENABLED,
+    HEDGE_MIN_SAMPLES,
+    HEDGE_PERCENTILE,
+    Candidate,
+    RequestCancelled,
+    first_success,
+    latency_tracker,
+    parse_model_spec,
+)
+from .json_repair import extract_json
+from . import metrics
+from .pipeline import current_cancel_event
+from .prompt_builder import estimate_tokens
+from .retry import ResponseParseError, backoff_delay, classify_error, rate_limiters
+from .routing import (
+    AUTO_MODEL,
+    QUALITY_TIERS,
+    auto_tier,
+    is_auto_model,
+    model_stats,
+    rank_by_health,
+)
+from .streaming import parse_partial_json
+from .tracing import span
 
 
 TEMPERATURE = 0.1
+# Output budget for providers that require one (Anthropic). A rewritten resume
+# easily exceeds 1000 tokens, and a truncated response fails JSON parsing and
+# is retried in full. Claude 3 models cap output at 4096 tokens.
+MAX_OUTPUT_TOKENS = int(os.getenv("LLM_MAX_OUTPUT_TOKENS", "8192"))
+MODEL_OUTPUT_LIMITS = {"claude-3-opus-latest": 4096}
 # For custom_model like huggingface add custom_model as value.
 SUPPORTED_MODELS = {
     "Mistral Medium": "mistral-medium-latest",
@@ -25,13 +61,131 @@ SUPPORTED_MODELS = {
     "HuggingFace Inference API": "custom_model",
     "Ollama Model": "custom_model",
     "Groq Model": "custom_model",
+    # Routed per call to the fastest healthy model of a quality tier.
+    AUTO_MODEL: "auto",
 }
 
+# Parsed responses keyed by provider, resolved model, temperature and prompt.
+response_cache = TieredCache(
+    "llm_responses",
+    max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "256")),
+    ttl=float(os.getenv("LLM_CACHE_TTL_SECONDS", str(7 * 24 * 3600))),
+    max_bytes=int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024))),
+    disk=os.getenv("LLM_CACHE_DISK", "1") != "0",
+)
+
+
+def _load_prices():
+    prices = {}
+    for item in filter(None, os.getenv("LLM_PRICES", "").split(",")):
+        name, _, value = item.partition("=")
+        input_price, _, output_price = value.partition(":")
+        prices[name.strip()] = (float(input_price), float(output_price or input_price))
+    return prices
+
+
+# USD per million input:output tokens, keyed by provider model name, e.g.
+# LLM_PRICES="gpt-4o=2.5:10,mistral-medium-latest=0.4:2". Unpriced models
+# record tokens but no cost.
+LLM_PRICES = _load_prices()
+
+# Token counts reported by the provider for the call in progress, if any.
+_usage = contextvars.ContextVar("llm_usage", default=None)
+
+
+def _record_usage(usage, input_field, output_field):
+    """Remember the token usage a provider reported for the current call."""
+    if usage is None:
+        return
+    values = []
+    for field in (input_field, output_field):
+        value = usage.get(field) if isinstance(usage, dict) else None
+        values.append(getattr(usage, field, None) if value is None else value)
+    if all(isinstance(value, int) for value in values):
+        _usage.set(tuple(values))
+
+
+def _record_tokens(provider, model_name, input_tokens, output_tokens):
+    metrics.increment(
+        "llm_input_tokens_total", input_tokens, provider=provider, model=model_name
+    )
+    metrics.increment(
+        "llm_output_tokens_total", output_tokens, provider=provider, model=model_name
+    )
+    if model_name in LLM_PRICES:
+        input_price, output_price = LLM_PRICES[model_name]
+        cost = (input_tokens * input_price + output_tokens * output_price) / 1e6
+        metrics.increment(
+            "llm_cost_usd_total", cost, provider=provider, model=model_name
+        )
+
+
+logger = logging.getLogger(__name__)
+
+# Provider SDKs, imported on first use: a deployment usually talks to one
+# provider, and importing all six adds seconds and ~100MB to every process.
+PROVIDER_SDKS = {
+    "OpenAI": "openai",
+    "Claude": "anthropic",
+    "Mistral": "mistralai",
+    "HuggingFace Inference API": "huggingface_hub",
+    "Ollama Model": "ollama",
+    "Groq Model": "groq",
+}
+_sdk_lock = threading.Lock()
+
+
+def _sdk(provider):
+    """The SDK module for `provider`, importing it on first use."""
+    module = PROVIDER_SDKS[provider]
+    loaded = sys.modules.get(module)
+    if loaded is not None:
+        return loaded
+    with _sdk_lock:
+        if module in sys.modules:
+            return sys.modules[module]
+        start = time.perf_counter()
+        loaded = importlib.import_module(module)
+        elapsed = time.perf_counter() - start
+    metrics.increment("provider_sdk_import_seconds_total", elapsed, provider=provider)
+    logger.info(f"Imported {module} SDK for {provider} in {elapsed:.2f}s")
+    return loaded
+
+
+def preload_providers(providers=None):
+    """
+    Import provider SDKs ahead of the first request, e.g. at server startup;
+    all of them if `providers` is None.
+    """
+    for provider in providers if providers is not None else PROVIDER_SDKS:
+        _sdk(provider)
+
+
+# The highest-ranked models of a tier that an auto request may try in turn.
+AUTO_MAX_CANDIDATES = int(os.getenv("LLM_AUTO_MAX_CANDIDATES", "3"))
+
+
+def get_cache_stats():
+    """Hit/miss counters for the LLM response cache."""
+    return response_cache.stats()
+
+
+def get_retry_stats():
+    """Retry, fatal error and throttling counters, per provider."""
+    return {
+        name: {dict(labels).get("provider"): value for labels, value in series.items()}
+        for name, series in metrics.counters_snapshot().items()
+        if name.startswith(("llm_retries", "llm_fatal", "llm_throttle"))
+    }
+
 
 def openai_model(model, api_key, prompt):
     """Call OpenAI's ChatCompletion API with a given prompt."""
-    openai.api_key = api_key
-    response = openai.ChatCompletion.create(
+    # Pass the key per request rather than mutating the global openai.api_key,
+    # which races between concurrent users. The SDK keeps a pooled
+    # keep-alive session per thread.
+    response = _sdk("OpenAI").ChatCompletion.create(
+        api_key=api_key,
         model=model,
         messages=[
             {"role": "system", "content": "You are an expert in ATS resume scoring."},
@@ -39,38 +193,101 @@ def openai_model(model, api_key, prompt):
         ],
         temperature=TEMPERATURE,
     )
+    _record_usage(response.get("usage"), "prompt_tokens", "completion_tokens")
     return response.choices[0].message.content
 
 
+def openai_model_stream(model, api_key, prompt):
+    """Stream response text deltas from OpenAI's ChatCompletion API."""
+    response = _sdk("OpenAI").ChatCompletion.create(
+        api_key=api_key,
+        model=model,
+        messages=[
+            {"role": "system", "content": "You are an expert in ATS resume scoring."},
+            {"role": "user", "content": prompt},
+        ],
+        temperature=TEMPERATURE,
+        stream=True,
+    )
+    for chunk in response:
+        if chunk.choices:
+            delta = chunk.choices[0].delta.get("content")
+            if delta:
+                yield delta
+
+
+def max_output_tokens(model) -> int:
+    return min(MAX_OUTPUT_TOKENS, MODEL_OUTPUT_LIMITS.get(model, MAX_OUTPUT_TOKENS))
+
+
 def anthropic_model(model, api_key, prompt):
     """Call Anthropic's Claude model with a given prompt."""
-    client = anthropic.Anthropic(api_key=api_key)
+    client = client_registry.get(
+        "anthropic", api_key, lambda: _sdk("Claude").Anthropic(api_key=api_key)
+    )
     response = client.messages.create(
         model=model,
-        max_tokens=1000,
+        max_tokens=max_output_tokens(model),
         messages=[{"role": "user", "content": prompt}],
         temperature=TEMPERATURE,
     )
+    _record_usage(response.usage, "input_tokens", "output_tokens")
     return response.content[0].text
 
 
+def anthropic_model_stream(model, api_key, prompt):
+    """Stream response text deltas from Anthropic's Claude model."""
+    client = client_registry.get(
+        "anthropic", api_key, lambda: _sdk("Claude").Anthropic(api_key=api_key)
+    )
+    with client.messages.stream(
+        model=model,
+        max_tokens=max_output_tokens(model),
+        messages=[{"role": "user", "content": prompt}],
+        temperature=TEMPERATURE,
+    ) as stream:
+        yield from stream.text_stream
+
+
 def mistral_model(model, api_key, prompt):
     """Call Mistral's chat completion API with a given prompt."""
-    client = Mistral(api_key=api_key)
+    client = client_registry.get(
+        "mistral", api_key, lambda: _sdk("Mistral").Mistral(api_key=api_key)
+    )
     response = client.chat.complete(
         model=model,
         messages=[{"role": "user", "content": prompt}],
         temperature=TEMPERATURE,
     )
+    _record_usage(response.usage, "prompt_tokens", "completion_tokens")
     return response.choices[0].message.content
 
 
+def mistral_model_stream(model, api_key, prompt):
+    """Stream response text deltas from Mistral's chat API."""
+    client = client_registry.get(
+        "mistral", api_key, lambda: _sdk("Mistral").Mistral(api_key=api_key)
+    )
+    response = client.chat.stream(
+        model=model,
+        messages=[{"role": "user", "content": prompt}],
+        temperature=TEMPERATURE,
+    )
+    for event in response:
+        if event.data.choices:
+            delta = event.data.choices[0].delta.content
+            if delta:
+                yield delta
+
+
 def ollama_model(model, api, prompt):
     """Call Ollama's API using the official Ollama Python SDK."""
 
     ollama_model_name = list(model.values())[0]
     # Initialize client with custom host if provided, otherwise use default
-    client = Client(host=api) if api else Client()
+    client = client_registry.get(
+        "ollama", None, lambda: _sdk("Ollama Model").Client(host=api or None), host=api
+    )
 
     try:
         # Generate response using the Ollama SDK
@@ -79,9 +296,27 @@ def ollama_model(model, api, prompt):
             prompt=prompt,
             stream=False,
         )
+        _record_usage(response, "prompt_eval_count", "eval_count")
         return response["response"]
     except Exception as e:
-        raise Exception(f"Failed to call Ollama API: {str(e)}")
+        raise Exception(f"Failed to call Ollama API: {str(e)}") from e
+
+
+def ollama_model_stream(model, api, prompt):
+    """Stream response text deltas from Ollama."""
+    ollama_model_name = list(model.values())[0]
+    client = client_registry.get(
+        "ollama", None, lambda: _sdk("Ollama Model").Client(host=api or None), host=api
+    )
+
+    try:
+        for chunk in client.generate(
+            model=ollama_model_name, prompt=prompt, stream=True
+        ):
+            if chunk["response"]:
+                yield chunk["response"]
+    except Exception as e:
+        raise Exception(f"Failed to call Ollama API: {str(e)}") from e
 
 
 def groq_model(model, api, prompt):
@@ -102,8 +337,10 @@ def groq_model(model, api, prompt):
     groq_model_name = list(model.values())[0]
 
     try:
-        # Initialize the Groq client with the API key
-        client = Groq(api_key=api)
+        # Reuse the Groq client (and its connection pool) for this API key
+        client = client_registry.get(
+            "groq", api, lambda: _sdk("Groq Model").Groq(api_key=api)
+        )
 
         # Generate response using the Groq SDK
         response = client.chat.completions.create(
@@ -112,10 +349,32 @@ def groq_model(model, api, prompt):
             temperature=TEMPERATURE,
         )
 
+        _record_usage(response.usage, "prompt_tokens", "completion_tokens")
         return response.choices[0].message.content
 
     except Exception as e:
-        raise Exception(f"Failed to call Groq API: {str(e)}")
+        raise Exception(f"Failed to call Groq API: {str(e)}") from e
+
+
+def groq_model_stream(model, api, prompt):
+    """Stream response text deltas from Groq."""
+    groq_model_name = list(model.values())[0]
+
+    try:
+        client = client_registry.get(
+            "groq", api, lambda: _sdk("Groq Model").Groq(api_key=api)
+        )
+        response = client.chat.completions.create(
+            messages=[{"role": "user", "content": prompt}],
+            model=groq_model_name,
+            temperature=TEMPERATURE,
+            stream=True,
+        )
+        for chunk in response:
+            if chunk.choices and chunk.choices[0].delta.content:
+                yield chunk.choices[0].delta.content
+    except Exception as e:
+        raise Exception(f"Failed to call Groq API: {str(e)}") from e
 
 
 def huggingface_model(model, api_key, prompt):
@@ -127,7 +386,8 @@ def huggingface_model(model, api_key, prompt):
         headers = {"Authorization": f"Bearer {api_key}"}
         payload = {"inputs": prompt}
 
-        response = requests.post(API_URL, headers=headers, json=payload, timeout=30)
+        session = client_registry.get("huggingface-http", None, new_http_session)
+        response = session.post(API_URL, headers=headers, json=payload, timeout=30)
         response.raise_for_status()
         data = response.json()
 
@@ -139,43 +399,110 @@ def huggingface_model(model, api_key, prompt):
 
     try:
         # First try the chat completions API
-        client = InferenceClient(api_key=api_key)
+        client = client_registry.get(
+            "huggingface",
+            api_key,
+            lambda: _sdk("HuggingFace Inference API").InferenceClient(api_key=api_key),
+        )
         messages = [{"role": "user", "content": prompt}]
         completion = client.chat.completions.create(
             model=custom_model_name, messages=messages, timeout=30
         )
+        _record_usage(completion.usage, "prompt_tokens", "completion_tokens")
         return completion.choices[0].message.content
     except (requests.exceptions.HTTPError, Exception) as e:
         # Fall back to regular inference API
         return try_inference_api()
 
 
-def route_llm_model(model, api_key, prompt):
-    """Route the request to the appropriate LLM model with enhanced error handling."""
-    model_dispatch = {
-        "OpenAI": openai_model,
-        "Claude": anthropic_model,
-        "Mistral": mistral_model,
-        "HuggingFace Inference API": huggingface_model,
-        "Ollama Model": ollama_model,
-        "Groq Model": groq_model,
-    }
+def huggingface_model_stream(model, api_key, prompt):
+    """
+    Stream response text deltas from Hugging Face's chat completions API.
+
+    If streaming fails before the first token, falls back to the blocking
+    adapter (which has its own fallback) and yields its whole answer at once.
+    """
+    custom_model_name = list(model.values())[0]
+    started = False
+    try:
+        client = client_registry.get(
+            "huggingface",
+            api_key,
+            lambda: _sdk("HuggingFace Inference API").InferenceClient(api_key=api_key),
+        )
+        for chunk in client.chat.completions.create(
+            model=custom_model_name,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            timeout=30,
+        ):
+            if chunk.choices and chunk.choices[0].delta.content:
+                started = True
+                yield chunk.choices[0].delta.content
+    except Exception:
+        if started:
+            raise
+        yield huggingface_model(model, api_key, prompt)
+
+
+MODEL_DISPATCH = {
+    "OpenAI": openai_model,
+    "Claude": anthropic_model,
+    "Mistral": mistral_model,
+    "HuggingFace Inference API": huggingface_model,
+    "Ollama Model": ollama_model,
+    "Groq Model": groq_model,
+}
 
+STREAM_DISPATCH = {
+    "OpenAI": openai_model_stream,
+    "Claude": anthropic_model_stream,
+    "Mistral": mistral_model_stream,
+    "HuggingFace Inference API": huggingface_model_stream,
+    "Ollama Model": ollama_model_stream,
+    "Groq Model": groq_model_stream,
+}
+
+
+def register_provider(prefix, handler, stream_handler=None, models=None):
+    """
+    Register an additional provider, e.g. a local or fake backend.
+
+    `handler(model, api_key, prompt)` returns the response text and
+    `stream_handler` yields text deltas; without one, streaming yields the
+    blocking response in a single chunk. `models` maps display names, which
+    must start with `prefix`, to provider-side model names.
+    """
+    MODEL_DISPATCH[prefix] = handler
+    STREAM_DISPATCH[prefix] = stream_handler or (
+        lambda model, api_key, prompt: iter([handler(model, api_key, prompt)])
+    )
+    for name, sub_model_name in (models or {prefix: prefix}).items():
+        if not name.startswith(prefix):
+            raise ValueError(f"Model '{name}' must start with '{prefix}'")
+        SUPPORTED_MODELS[name] = sub_model_name
+
+
+def resolve_model(model):
+    """
+    Resolve a model selection into (provider, handler, resolved model name).
+
+    `model` is either a key of SUPPORTED_MODELS or, for custom models, a
+    single-entry dict mapping that key to the provider-side model name.
+    """
     if not model:
         raise ValueError("Model parameter cannot be None")
 
     if isinstance(model, dict):
-        if not model:
-            raise ValueError("Model dictionary cannot be empty")
         model_name = list(model.keys())[0]
     else:
         model_name = model
 
     # Find the appropriate model handler
-    handler = None
-    for key, function in model_dispatch.items():
+    provider, handler = None, None
+    for key, function in MODEL_DISPATCH.items():
         if model_name.startswith(key):
-            handler = function
+            provider, handler = key, function
             break
 
     if not handler:
@@ -185,39 +512,454 @@ def route_llm_model(model, api_key, prompt):
     sub_model_name = SUPPORTED_MODELS.get(model_name)
     if not sub_model_name:
         raise ValueError(f"Unknown model name: {model_name}")
+    if sub_model_name == "custom_model":
+        if not isinstance(model, dict):
+            raise ValueError(f"{model_name} requires a custom model name")
+        sub_model_name = list(model.values())[0]
+
+    return provider, handler, sub_model_name
+
+
+def build_model_config(model: str, custom_model_name: str = ""):
+    """
+    A model selection as the UI makes it, from a model name and an optional
+    custom model name: the name, or {name: custom name}.
+    """
+    if model not in SUPPORTED_MODELS:
+        raise ValueError(f"Unknown model name: {model}")
+    if model == AUTO_MODEL:
+        # The custom name picks the quality tier.
+        return {model: custom_model_name} if custom_model_name else model
+    if SUPPORTED_MODELS[model] == "custom_model":
+        if not custom_model_name:
+            raise ValueError(f"{model} requires a custom model name")
+        return {model: custom_model_name}
+    return model
+
+
+def route_llm_model(model, api_key, prompt, stream=False):
+    """
+    Route the request to the appropriate LLM model with enhanced error handling.
+
+    With `stream=True` this returns an iterator of response text deltas
+    instead of the full response text.
+    """
+    provider, handler, sub_model_name = resolve_model(model)
+    model_name = list(model.keys())[0] if isinstance(model, dict) else model
+    target = model if SUPPORTED_MODELS[model_name] == "custom_model" else sub_model_name
+
+    if stream:
+        return _stream_with_errors(
+            STREAM_DISPATCH[provider], target, api_key, prompt, model_name
+        )
 
     try:
-        if sub_model_name == "custom_model":
-            return handler(model, api_key, prompt)
-        return handler(sub_model_name, api_key, prompt)
+        return handler(target, api_key, prompt)
     except Exception as e:
-        raise RuntimeError(f"Error calling {model_name}: {str(e)}")
+        raise RuntimeError(f"Error calling {model_name}: {str(e)}") from e
+
+
+def _stream_with_errors(handler, target, api_key, prompt, model_name):
+    try:
+        yield from handler(target, api_key, prompt)
+    except Exception as e:
+        raise RuntimeError(f"Error calling {model_name}: {str(e)}") from e
+
+
+def parse_llm_response(response_text, result_model=None, provider=None):
+    """
+    Extract the JSON object from an LLM response, repairing common defects,
+    and validate it against the pydantic `result_model` when given, filling
+    in field defaults. Only a response that can't be repaired or validated
+    raises ResponseParseError, which triggers a re-ask.
+    """
+    with span("llm_parse", provider=provider):
+        return _parse_llm_response(response_text, result_model, provider)
 
 
-def parse_llm_response(response_text):
-    """Parse the LLM response and return a JSON object."""
+def _parse_llm_response(response_text, result_model, provider):
     try:
-        cleaned_response = response_text.strip("```").strip("json").strip('"')
-        return json.loads(cleaned_response)
-    except json.JSONDecodeError as e:
-        raise ValueError(f"Failed to parse LLM response. Error: {e}")
+        response, repaired = extract_json(response_text)
+    except ValueError as e:
+        metrics.increment("llm_json_parse_total", provider=provider, outcome="failed")
+        logger.warning(f"Could not parse {provider} response as JSON")
+        raise ResponseParseError(f"Failed to parse LLM response. Error: {e}") from e
+    outcome = "repaired" if repaired else "clean"
+
+    if result_model is not None:
+        try:
+            response = result_model.model_validate(response).model_dump()
+        except ValidationError as e:
+            metrics.increment(
+                "llm_json_parse_total", provider=provider, outcome="invalid"
+            )
+            # Pydantic's message quotes the input, i.e. resume content; keep
+            # only the failing fields.
+            problems = _validation_summary(e)
+            logger.warning(
+                f"{provider} response failed {result_model.__name__} validation: "
+                f"{problems}"
+            )
+            raise ResponseParseError(f"Invalid LLM response: {problems}") from e
+
+    metrics.increment("llm_json_parse_total", provider=provider, outcome=outcome)
+    if repaired:
+        logger.info(f"Repaired malformed JSON in {provider} response")
+    return response
+
+
+def _validation_summary(error: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(map(str, detail['loc'])) or 'response'}: {detail['msg']}"
+        for detail in error.errors()
+    )
+
+
+def response_cache_key(model, prompt):
+    """Content-addressed cache key for an LLM call."""
+    if is_auto_model(model):
+        # Any model of the tier may answer, so they share one entry.
+        return content_hash(AUTO_MODEL, auto_tier(model), TEMPERATURE, prompt)
+    provider, _, sub_model_name = resolve_model(model)
+    return content_hash(provider, sub_model_name, TEMPERATURE, prompt)
+
+
+def _call_provider(provider, model, api_key, prompt, attempt=1):
+    """
+    One provider call inside an llm_call span, recording its latency and
+    input/output tokens (as reported by the provider, else estimated).
+    """
+    _, _, model_name = resolve_model(model)
+    _usage.set(None)
+    outcome = "error"
+    start = time.perf_counter()
+    with span("llm_call", provider=provider, model=model_name, attempt=attempt) as call:
+        try:
+            with provider_concurrency.slot(provider):
+                response_text = route_llm_model(model, api_key, prompt)
+            outcome = "ok"
+        finally:
+            duration = time.perf_counter() - start
+            metrics.observe(
+                "llm_request_duration_seconds",
+                duration,
+                provider=provider,
+                model=model_name,
+                outcome=outcome,
+            )
+            model_stats.record_call(provider, model_name, duration, outcome == "ok")
+        latency_tracker.record(provider, model_name, duration)
+        usage = _usage.get()
+        input_tokens, output_tokens = usage or (
+            estimate_tokens(prompt),
+            estimate_tokens(response_text),
+        )
+        _record_tokens(provider, model_name, input_tokens, output_tokens)
+        call.set(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            tokens_estimated=usage is None,
+        )
+    return response_text
+
+
+# API keys for fallback models on a different provider than the one selected.
+# Ollama takes its host here and works without one.
+PROVIDER_KEY_ENV = {
+    "OpenAI": "OPENAI_API_KEY",
+    "Claude": "ANTHROPIC_API_KEY",
+    "Mistral": "MISTRAL_API_KEY",
+    "HuggingFace Inference API": "HF_TOKEN",
+    "Groq Model": "GROQ_API_KEY",
+    "Ollama Model": "OLLAMA_HOST",
+}
 
 
-def get_response_from_llm_model(model, api_key, prompt, max_retries=3, retry_delay=2):
-    """Fetch response from the LLM model with retry logic."""
+def _provider_api_key(provider):
+    """The environment's key for `provider`, or None when one is required and missing."""
+    env = PROVIDER_KEY_ENV.get(provider)
+    if env is None:
+        return ""
+    key = os.getenv(env, "")
+    if not key and provider != "Ollama Model":
+        return None
+    return key
+
+
+def fallback_candidates(model, api_key):
+    """
+    The selected model followed by the usable LLM_FALLBACK_MODELS. Fallbacks
+    on another provider use that provider's key from the environment and are
+    skipped when it isn't set.
+    """
+    provider, _, model_name = resolve_model(model)
+    candidates = [Candidate(provider, model, api_key)]
+    for spec in FALLBACK_MODELS:
+        fallback = parse_model_spec(spec)
+        try:
+            fallback_provider, _, fallback_name = resolve_model(fallback)
+        except ValueError as e:
+            logger.warning(f"Ignoring fallback model '{spec}': {e}")
+            continue
+        if (fallback_provider, fallback_name) == (provider, model_name):
+            continue
+        if fallback_provider == provider:
+            key = api_key
+        else:
+            key = _provider_api_key(fallback_provider)
+        if key is not None:
+            candidates.append(Candidate(fallback_provider, fallback, key))
+    return candidates
+
+
+def auto_candidates(model):
+    """
+    The models of the selected quality tier that have a key in the
+    environment, healthiest and fastest first, capped at AUTO_MAX_CANDIDATES.
+    """
+    tier = auto_tier(model)
+    usable = []
+    for spec in QUALITY_TIERS[tier]:
+        choice = parse_model_spec(spec)
+        try:
+            provider, _, model_name = resolve_model(choice)
+        except ValueError as e:
+            logger.warning(f"Ignoring model '{spec}' of tier '{tier}': {e}")
+            continue
+        key = _provider_api_key(provider)
+        if key is not None:
+            usable.append((provider, model_name, Candidate(provider, choice, key)))
+    if not usable:
+        raise ValueError(
+            f"No model of the '{tier}' tier has an API key configured on the server"
+        )
+    return rank_by_health(usable)[:AUTO_MAX_CANDIDATES]
+
+
+def hedge_delay(candidate):
+    """How long `candidate` may run before a hedge is sent; None to never hedge."""
+    if not HEDGE_ENABLED:
+        return None
+    _, _, model_name = resolve_model(candidate.model)
+    observed = latency_tracker.percentile(
+        candidate.provider, model_name, HEDGE_PERCENTILE, HEDGE_MIN_SAMPLES
+    )
+    return HEDGE_DEFAULT_DELAY_SECONDS if observed is None else observed
+
+
+def get_response_from_llm_model(
+    model,
+    api_key,
+    prompt,
+    max_retries=3,
+    retry_delay=2,
+    use_cache=True,
+    result_model=None,
+):
+    """
+    Fetch response from the LLM model with retry logic.
+
+    The response is parsed leniently and validated against the pydantic
+    `result_model` when given. Only transient failures (rate limits, 5xx,
+    timeouts, JSON that can't be repaired or validated) are retried, with jittered exponential backoff starting at `retry_delay`
+    seconds and honoring Retry-After. Fatal errors such as an invalid API key
+    fail immediately. Outgoing calls are shaped by a per-provider, per-key
+    token bucket.
+
+    With LLM_FALLBACK_MODELS set, a model that fails is replaced by the next
+    fallback, and with LLM_HEDGE=1 a slow one is raced against it; the first
+    valid response wins and is cached for the model that produced it, so the
+    selected model's entry never holds another model's answer. The "Auto"
+    model uses the healthiest, fastest models of its tier the same way, and
+    caches under its tier, which any of them may answer.
+    """
+    cache_key = response_cache_key(model, prompt) if use_cache else None
+    if cache_key:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+    if is_auto_model(model):
+        candidates = auto_candidates(model)
+    elif FALLBACK_MODELS:
+        candidates = fallback_candidates(model, api_key)
+    else:
+        candidates = [Candidate(resolve_model(model)[0], model, api_key)]
+
+    if len(candidates) > 1:
+        winner, response = first_success(
+            candidates,
+            lambda candidate, cancel: (
+                candidate,
+                _request_with_retries(
+                    candidate.provider,
+                    candidate.model,
+                    candidate.api_key,
+                    prompt,
+                    max_retries,
+                    retry_delay,
+                    result_model,
+                    cancel,
+                ),
+            ),
+            hedge_delay,
+        )
+        if cache_key and not is_auto_model(model):
+            cache_key = response_cache_key(winner.model, prompt)
+    else:
+        provider, model, api_key = candidates[0]
+        response = _request_with_retries(
+            provider, model, api_key, prompt, max_retries, retry_delay, result_model
+        )
+    if cache_key:
+        response_cache.set(cache_key, response)
+    return response
+
+
+def _request_with_retries(
+    provider,
+    model,
+    api_key,
+    prompt,
+    max_retries,
+    retry_delay,
+    result_model,
+    cancel=None,
+):
+    """
+    The retry loop of `get_response_from_llm_model`; stops once `cancel` is
+    set, or the pipeline running the calling stage has failed.
+    """
+    _, _, model_name = resolve_model(model)
+    stage_cancel = current_cancel_event()
     for attempt in range(1, max_retries + 1):
+        if cancel is not None and cancel.is_set():
+            raise RequestCancelled("Another model answered first")
+        if stage_cancel is not None and stage_cancel.is_set():
+            raise RequestCancelled("Another pipeline stage failed")
         try:
-            # Route the request to the selected LLM model
-            response_text = route_llm_model(model, api_key, prompt)
-            print(response_text)
-            return parse_llm_response(response_text)
+            rate_limiters.throttle(provider, api_key)
+            response_text = _call_provider(provider, model, api_key, prompt, attempt)
+            try:
+                response = parse_llm_response(response_text, result_model, provider)
+            except ResponseParseError:
+                model_stats.record_parse(provider, model_name, False)
+                raise
+            model_stats.record_parse(provider, model_name, True)
+            return response
         except Exception as e:
+            retryable, retry_after = classify_error(e)
+            if not retryable:
+                metrics.increment("llm_fatal_errors_total", provider=provider)
+                raise RuntimeError(f"LLM request failed: {e}") from e
             if attempt < max_retries:
-                print(
-                    f"Attempt {attempt}/{max_retries} failed. Retrying in {retry_delay} seconds..."
+                delay = backoff_delay(attempt, retry_delay, retry_after)
+                metrics.increment("llm_retries_total", provider=provider)
+                logger.warning(
+                    f"{provider} attempt {attempt}/{max_retries} failed ({e}). "
+                    f"Retrying in {delay:.1f} seconds..."
                 )
-                time.sleep(retry_delay)
+                waiting_on = cancel if cancel is not None else stage_cancel
+                if waiting_on is not None:
+                    waiting_on.wait(delay)
+                else:
+                    time.sleep(delay)
             else:
+                metrics.increment("llm_retries_exhausted_total", provider=provider)
                 raise RuntimeError(
                     f"Failed to get a response from the LLM after {max_retries} attempts. Error: {e}"
-                )
+                ) from e
+
+
+def stream_response_from_llm_model(
+    model, api_key, prompt, result_model=None, use_cache=True, partial_interval=0.1
+):
+    """
+    Stream a structured response, yielding (response, done) pairs.
+
+    While tokens arrive, `response` is a best-effort parse of the partial JSON,
+    re-parsed at most every `partial_interval` seconds. The final pair has
+    done=True and carries the fully parsed response, validated against the
+    pydantic `result_model` when given. If the stream fails or the final JSON
+    is invalid, or fails outright while fallback models are configured, falls
+    back to the blocking, retrying path.
+    """
+    cache_key = response_cache_key(model, prompt) if use_cache else None
+    if cache_key:
+        cached = response_cache.get(cache_key)
+        if cached is not None:
+            yield cached, True
+            return
+
+    # An auto selection streams from its best model; the blocking fallback
+    # below still routes over the whole tier.
+    target, target_key = model, api_key
+    if is_auto_model(model):
+        _, target, target_key = auto_candidates(model)[0]
+    provider, _, model_name = resolve_model(target)
+
+    chunks = []
+    last_parsed = 0.0
+    labels = {"provider": provider, "model": model_name}
+    response_text = None
+    start = time.perf_counter()
+    try:
+        rate_limiters.throttle(provider, target_key)
+        with provider_concurrency.slot(provider):
+            start = time.perf_counter()
+            for delta in route_llm_model(target, target_key, prompt, stream=True):
+                if not chunks:
+                    metrics.observe(
+                        "llm_time_to_first_token_seconds",
+                        time.perf_counter() - start,
+                        **labels,
+                    )
+                chunks.append(delta)
+                now = time.monotonic()
+                if now - last_parsed >= partial_interval:
+                    last_parsed = now
+                    partial = parse_partial_json("".join(chunks))
+                    if partial:
+                        yield partial, False
+
+        response_text = "".join(chunks)
+        duration = time.perf_counter() - start
+        metrics.observe(
+            "llm_request_duration_seconds", duration, outcome="ok", **labels
+        )
+        model_stats.record_call(provider, model_name, duration, True)
+        # Streaming APIs don't report usage consistently, so always estimate.
+        _record_tokens(
+            provider,
+            model_name,
+            estimate_tokens(prompt),
+            estimate_tokens(response_text),
+        )
+        response = parse_llm_response(response_text, result_model, provider)
+        model_stats.record_parse(provider, model_name, True)
+    except Exception as e:
+        if response_text is None:
+            model_stats.record_call(
+                provider, model_name, time.perf_counter() - start, False
+            )
+        elif isinstance(e, ResponseParseError):
+            model_stats.record_parse(provider, model_name, False)
+        retryable, _ = classify_error(e)
+        if not retryable and not (FALLBACK_MODELS or is_auto_model(model)):
+            metrics.increment("llm_fatal_errors_total", provider=provider)
+            raise RuntimeError(f"LLM request failed: {e}") from e
+        metrics.increment("llm_stream_fallbacks_total", provider=provider)
+        logger.warning(
+            f"Streaming from {provider} failed ({e}). "
+            "Falling back to a blocking request...",
+            exc_info=True,
+        )
+        response = get_response_from_llm_model(
+            model, api_key, prompt, use_cache=use_cache, result_model=result_model
+        )
+        yield response, True
+        return
+
+    if cache_key:
+        response_cache.set(cache_key, response)
+    yield response, True
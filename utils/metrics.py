@@ -0,0 +1,125 @@
+import bisect
+import threading
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+_lock = threading.Lock()
+_counters: Dict[Tuple[str, Tuple], float] = defaultdict(float)
+_gauges: Dict[Tuple[str, Tuple], float] = {}
+# (name, labels) -> [per-bucket counts..., +Inf count], sum
+_histograms: Dict[Tuple[str, Tuple], List] = {}
+
+# Seconds; wide enough for sub-millisecond parsing and minute-long LLM calls.
+DEFAULT_BUCKETS = (
+    0.001,
+    0.005,
+    0.01,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1,
+    2.5,
+    5,
+    10,
+    30,
+    60,
+    120,
+)
+
+
+def _labels_key(labels: Dict[str, str]) -> Tuple:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def increment(name: str, value: float = 1, **labels):
+    """Add `value` to the counter `name` with the given labels."""
+    with _lock:
+        _counters[(name, _labels_key(labels))] += value
+
+
+def set_gauge(name: str, value: float, **labels):
+    """Set the gauge `name` with the given labels to `value`."""
+    with _lock:
+        _gauges[(name, _labels_key(labels))] = value
+
+
+def observe(name: str, value: float, **labels):
+    """Record `value` in the histogram `name` with the given labels."""
+    index = bisect.bisect_left(DEFAULT_BUCKETS, value)
+    with _lock:
+        entry = _histograms.get((name, _labels_key(labels)))
+        if entry is None:
+            entry = [[0] * (len(DEFAULT_BUCKETS) + 1), 0.0]
+            _histograms[(name, _labels_key(labels))] = entry
+        entry[0][index] += 1
+        entry[1] += value
+
+
+def counters_snapshot() -> Dict[str, Dict[Tuple, float]]:
+    """Return {name: {labels: value}} for every counter recorded so far."""
+    snapshot: Dict[str, Dict[Tuple, float]] = defaultdict(dict)
+    with _lock:
+        for (name, labels), value in _counters.items():
+            snapshot[name][labels] = value
+    return dict(snapshot)
+
+
+def render_prometheus() -> str:
+    """All counters, gauges and histograms in the Prometheus text exposition format."""
+    with _lock:
+        counters = sorted(_counters.items())
+        gauges = sorted(_gauges.items())
+        histograms = sorted(
+            (key, (list(buckets), total))
+            for key, (buckets, total) in _histograms.items()
+        )
+
+    lines = []
+    declared = set()
+    for (name, labels), value in counters:
+        if name not in declared:
+            declared.add(name)
+            lines.append(f"# TYPE {name} counter")
+        lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+
+    for (name, labels), value in gauges:
+        if name not in declared:
+            declared.add(name)
+            lines.append(f"# TYPE {name} gauge")
+        lines.append(f"{name}{_format_labels(labels)} {_number(value)}")
+
+    for (name, labels), (buckets, total) in histograms:
+        if name not in declared:
+            declared.add(name)
+            lines.append(f"# TYPE {name} histogram")
+        cumulative = 0
+        for bound, count in zip(DEFAULT_BUCKETS + ("+Inf",), buckets):
+            cumulative += count
+            bucket_labels = _format_labels(labels + (("le", str(bound)),))
+            lines.append(f"{name}_bucket{bucket_labels} {cumulative}")
+        lines.append(f"{name}_sum{_format_labels(labels)} {_number(total)}")
+        lines.append(f"{name}_count{_format_labels(labels)} {cumulative}")
+    return "\n".join(lines) + "\n"
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(value)
+
+
+def _format_labels(labels: Tuple) -> str:
+    if not labels:
+        return ""
+    pairs = (f'{key}="{_escape(value)}"' for key, value in labels)
+    return "{" + ",".join(pairs) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def reset():
+    with _lock:
+        _counters.clear()
+        _gauges.clear()
+        _histograms.clear()
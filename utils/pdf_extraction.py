@@ -0,0 +1,90 @@
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Optional
+
+import PyPDF2
+
+# Documents with at least this many pages are fanned out to a process pool.
+PARALLEL_PAGE_THRESHOLD = int(os.getenv("PDF_PARALLEL_PAGE_THRESHOLD", "16"))
+# Hard cap on characters kept per page, bounding memory for pathological PDFs.
+MAX_PAGE_CHARS = int(os.getenv("PDF_MAX_PAGE_CHARS", "20000"))
+PAGE_SEPARATOR = "\f"
+MAX_WORKERS = int(os.getenv("PDF_EXTRACTION_WORKERS", str(min(4, os.cpu_count() or 1))))
+
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Spawn rather than fork: the pool is created lazily inside a
+            # threaded server, and a forked child would inherit locks held
+            # by other threads (logging, SQLite, HTTP clients).
+            _pool = ProcessPoolExecutor(
+                max_workers=MAX_WORKERS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def _page_text(page, max_chars: int) -> str:
+    return (page.extract_text() or "")[:max_chars]
+
+
+def _extract_page_range(
+    data: bytes, start: int, stop: int, max_chars: int
+) -> List[str]:
+    """Worker entry point: extract pages [start, stop) from the raw PDF bytes."""
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    return [_page_text(reader.pages[i], max_chars) for i in range(start, stop)]
+
+
+def iter_page_texts(
+    data: bytes,
+    threshold: int = PARALLEL_PAGE_THRESHOLD,
+    max_chars: int = MAX_PAGE_CHARS,
+    max_workers: int = MAX_WORKERS,
+) -> Iterator[str]:
+    """
+    Yield the text of each page in order.
+
+    Small documents are parsed in-process. Larger ones are split into one
+    contiguous page range per worker and parsed in a process pool, which
+    sidesteps the GIL for PyPDF2's pure-Python parsing; pages are still
+    yielded in document order as each range completes.
+    """
+    reader = PyPDF2.PdfReader(io.BytesIO(data))
+    page_count = len(reader.pages)
+
+    if page_count < threshold or max_workers < 2:
+        for page in reader.pages:
+            yield _page_text(page, max_chars)
+        return
+
+    chunk = -(-page_count // max_workers)
+    starts = list(range(0, page_count, chunk))
+    stops = [min(start + chunk, page_count) for start in starts]
+    results = _get_pool().map(
+        _extract_page_range,
+        [data] * len(starts),
+        starts,
+        stops,
+        [max_chars] * len(starts),
+    )
+    for texts in results:
+        yield from texts
+
+
+def extract_text(data: bytes, **kwargs) -> str:
+    """
+    Extract the full text of a PDF, joining the pages once at the end.
+
+    Pages are separated by PAGE_SEPARATOR (a form feed), which str.splitlines
+    treats as a line break, so page boundaries stay recoverable downstream.
+    """
+    return PAGE_SEPARATOR.join(iter_page_texts(data, **kwargs))
@@ -0,0 +1,268 @@
+import asyncio
+import contextvars
+import inspect
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional
+
+from .tracing import span
+
+# Worker threads shared by all async pipelines for their blocking stages.
+ASYNC_STAGE_THREADS = int(os.getenv("PIPELINE_STAGE_THREADS", "32"))
+_async_executor: Optional[ThreadPoolExecutor] = None
+_async_executor_lock = threading.Lock()
+
+# The cancel event of the pipeline running the current stage, if any.
+_cancel_event: contextvars.ContextVar[Optional[threading.Event]] = (
+    contextvars.ContextVar("pipeline_cancel_event", default=None)
+)
+
+
+@dataclass
+class Stage:
+    """A unit of work in the pipeline.
+
+    `fn` receives the results of its dependencies as keyword arguments, keyed
+    by the dependency stage name.
+    """
+
+    name: str
+    fn: Callable[..., Any]
+    deps: List[str] = field(default_factory=list)
+
+
+class StageError(RuntimeError):
+    """Raised when a stage fails; carries the failing stage name."""
+
+    def __init__(self, stage: str, error: Exception):
+        super().__init__(f"Stage '{stage}' failed: {error}")
+        self.stage = stage
+        self.error = error
+
+
+def _validate(stages: List[Stage]) -> Dict[str, Stage]:
+    by_name = {}
+    for stage in stages:
+        if stage.name in by_name:
+            raise ValueError(f"Duplicate stage name: {stage.name}")
+        by_name[stage.name] = stage
+
+    for stage in stages:
+        for dep in stage.deps:
+            if dep not in by_name:
+                raise ValueError(f"Stage '{stage.name}' depends on unknown '{dep}'")
+
+    # Kahn's algorithm, only to reject cycles up front.
+    remaining = {name: set(stage.deps) for name, stage in by_name.items()}
+    while remaining:
+        ready = [name for name, deps in remaining.items() if not deps]
+        if not ready:
+            raise ValueError(f"Cycle detected between stages: {sorted(remaining)}")
+        for name in ready:
+            del remaining[name]
+        for deps in remaining.values():
+            deps.difference_update(ready)
+
+    return by_name
+
+
+def current_cancel_event() -> Optional[threading.Event]:
+    """
+    The cancel event of the pipeline running the calling stage, or None
+    outside a pipeline. LLM requests made by a stage stop retrying once it is
+    set; other long-running work can poll it to bail out early.
+    """
+    return _cancel_event.get()
+
+
+def run_stages(
+    stages: List[Stage],
+    max_workers: Optional[int] = None,
+    cancel_event: Optional[threading.Event] = None,
+    on_stage_done: Optional[Callable[[str, Any], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Run stages on a thread pool, starting each one as soon as all of its
+    dependencies have finished.
+
+    If any stage fails, no further stages are started, queued ones are
+    cancelled, and a StageError wrapping the first failure is raised.
+    `cancel_event` is set as well: stages still running see it through
+    `current_cancel_event()`, and their LLM requests stop before the next
+    attempt. A provider call already in flight finishes and is discarded.
+
+    `on_stage_done(name, result)` is called from the calling thread as each
+    stage completes, so callers can surface intermediate results.
+
+    Returns a dict mapping stage name to its result.
+    """
+    by_name = _validate(stages)
+    cancel_event = cancel_event or threading.Event()
+    results: Dict[str, Any] = {}
+    pending = dict(by_name)
+    running = {}
+
+    executor = ThreadPoolExecutor(
+        max_workers=max_workers or len(stages) or 1,
+        thread_name_prefix="pipeline-stage",
+    )
+    try:
+
+        def submit_ready():
+            for name, stage in list(pending.items()):
+                if all(dep in results for dep in stage.deps):
+                    kwargs = {dep: results[dep] for dep in stage.deps}
+                    # Run in a copy of the caller's context so stage spans
+                    # nest under the caller's span.
+                    context = contextvars.copy_context()
+                    future = executor.submit(
+                        context.run, _run_stage, stage, kwargs, cancel_event
+                    )
+                    running[future] = name
+                    del pending[name]
+
+        submit_ready()
+        while running:
+            done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                error = future.exception()
+                if error is not None:
+                    cancel_event.set()
+                    for other in running:
+                        other.cancel()
+                    raise StageError(name, error) from error
+                results[name] = future.result()
+                if on_stage_done is not None:
+                    on_stage_done(name, results[name])
+            submit_ready()
+    finally:
+        # Don't block on stages still in flight after a failure; their
+        # results are discarded.
+        executor.shutdown(wait=not cancel_event.is_set(), cancel_futures=True)
+
+    return results
+
+
+async def run_stages_async(
+    stages: List[Stage],
+    cancel_event: Optional[threading.Event] = None,
+    on_stage_done: Optional[Callable[[str, Any], None]] = None,
+) -> Dict[str, Any]:
+    """
+    Async counterpart of `run_stages` with the same dependency, failure and
+    callback semantics. Coroutine stages run on the event loop; blocking
+    stages run on a shared pool of PIPELINE_STAGE_THREADS worker threads, so
+    waiting on a slow provider doesn't hold the loop.
+    """
+    by_name = _validate(stages)
+    cancel_event = cancel_event or threading.Event()
+    results: Dict[str, Any] = {}
+    pending = dict(by_name)
+    running: Dict[asyncio.Task, str] = {}
+
+    def submit_ready():
+        for name, stage in list(pending.items()):
+            if all(dep in results for dep in stage.deps):
+                kwargs = {dep: results[dep] for dep in stage.deps}
+                running[
+                    asyncio.ensure_future(_run_stage_async(stage, kwargs, cancel_event))
+                ] = name
+                del pending[name]
+
+    try:
+        submit_ready()
+        while running:
+            done, _ = await asyncio.wait(
+                list(running), return_when=asyncio.FIRST_COMPLETED
+            )
+            for task in done:
+                name = running.pop(task)
+                error = task.exception()
+                if error is not None:
+                    raise StageError(name, error) from error
+                results[name] = task.result()
+                if on_stage_done is not None:
+                    on_stage_done(name, results[name])
+            submit_ready()
+    finally:
+        if running:
+            # Threads already running can't be interrupted; their LLM
+            # requests stop at the next attempt and results are discarded.
+            cancel_event.set()
+            for task in running:
+                task.cancel()
+
+    return results
+
+
+async def _run_stage_async(
+    stage: Stage, kwargs: Dict[str, Any], cancel_event: threading.Event
+) -> Any:
+    if inspect.iscoroutinefunction(stage.fn):
+        # Each task runs in its own copy of the context.
+        _cancel_event.set(cancel_event)
+        with span(f"stage.{stage.name}"):
+            return await stage.fn(**kwargs)
+    global _async_executor
+    with _async_executor_lock:
+        if _async_executor is None:
+            _async_executor = ThreadPoolExecutor(
+                max_workers=ASYNC_STAGE_THREADS, thread_name_prefix="pipeline-async"
+            )
+    # Run in a copy of this context so stage spans nest under the caller's.
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(
+        _async_executor, context.run, _run_stage, stage, kwargs, cancel_event
+    )
+
+
+def _run_stage(
+    stage: Stage, kwargs: Dict[str, Any], cancel_event: threading.Event
+) -> Any:
+    # Always called in a copy of the caller's context, so this doesn't leak.
+    _cancel_event.set(cancel_event)
+    with span(f"stage.{stage.name}"):
+        return stage.fn(**kwargs)
+
+
+def memoize_stages(
+    stages: List[Stage], memo: Dict[str, tuple], keys: Dict[str, str]
+) -> List[Stage]:
+    """
+    Reuse stage results across runs.
+
+    `keys` maps a stage name to a hash of that stage's own inputs. A stage
+    whose key matches the one stored in `memo` returns the stored value
+    without running; any other keyed stage records its result in `memo` on
+    success. Stages without a key always run.
+    """
+    memoized = []
+    for stage in stages:
+        key = keys.get(stage.name)
+        if key is None:
+            memoized.append(stage)
+            continue
+
+        entry = memo.get(stage.name)
+        if entry is not None and entry[0] == key:
+            fn = _memoized_value(entry[1])
+        else:
+            fn = _recording(stage, memo, key)
+        memoized.append(Stage(stage.name, fn, list(stage.deps)))
+    return memoized
+
+
+def _memoized_value(value):
+    return lambda **_: value
+
+
+def _recording(stage: Stage, memo: Dict[str, tuple], key: str):
+    def run(**kwargs):
+        value = stage.fn(**kwargs)
+        memo[stage.name] = (key, value)
+        return value
+
+    return run
@@ -0,0 +1,232 @@
+import json
+import logging
+import re
+import textwrap
+from collections import Counter
+from typing import Callable, Dict, List
+
+from . import metrics
+from .pdf_extraction import PAGE_SEPARATOR
+
+logger = logging.getLogger(__name__)
+
+_PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+
+class PromptTemplate:
+    """
+    A prompt compiled once: dedented, with static values substituted and the
+    text pre-split around its {{placeholders}}, so rendering is a single join.
+    """
+
+    def __init__(self, text: str, legacy_static: Dict[str, str] = None, **static):
+        legacy_text = text
+        text = textwrap.dedent(text).strip("\n")
+        for name, value in static.items():
+            text = text.replace("{{" + name + "}}", value)
+        parts = _PLACEHOLDER.split(text)
+        self._literals = parts[0::2]
+        self.placeholders = parts[1::2]
+
+        # Characters saved on every render versus the old indented prompt
+        # with indented JSON schemas, for token reporting.
+        for name, value in (legacy_static or {}).items():
+            legacy_text = legacy_text.replace("{{" + name + "}}", value)
+        legacy_literals = _PLACEHOLDER.split(legacy_text)[0::2]
+        self.saved_static_chars = sum(map(len, legacy_literals)) - sum(
+            map(len, self._literals)
+        )
+
+    def render(self, **values) -> str:
+        chunks = [self._literals[0]]
+        for name, literal in zip(self.placeholders, self._literals[1:]):
+            chunks.append(str(values[name]))
+            chunks.append(literal)
+        return "".join(chunks)
+
+
+def compact_schema(model) -> str:
+    """A pydantic model's JSON schema without indentation whitespace."""
+    return json.dumps(model.model_json_schema(), separators=(",", ":"))
+
+
+# PDF text extraction artifacts.
+_LIGATURES = str.maketrans(
+    {
+        "\ufb00": "ff",
+        "\ufb01": "fi",
+        "\ufb02": "fl",
+        "\ufb03": "ffi",
+        "\ufb04": "ffl",
+        "\u00ad": "",  # soft hyphen
+        "\u200b": "",  # zero-width space
+        "\ufeff": "",  # byte order mark
+        "\u00a0": " ",  # non-breaking space
+        "\u2022": "-",  # bullets
+        "\u25cf": "-",
+        "\u25aa": "-",
+        "\uf0b7": "-",  # private-use bullet common in Word exports
+    }
+)
+_CID = re.compile(r"\(cid:\d+\)")
+# Only words broken across lines; "2016-\n2020" or "Foo-\nBar" are kept.
+_HYPHENATED_BREAK = re.compile(r"([a-z])-\n([a-z])")
+_INLINE_SPACE = re.compile(r"[ \t\f\v]+")
+_BLANK_LINES = re.compile(r"\n{3,}")
+_PAGE_NUMBER = re.compile(r"^(?:page\s*)?\d{1,3}(?:\s*(?:of|/)\s*\d{1,3})?$", re.I)
+_DIGITS = re.compile(r"\d+")
+
+
+def compact_text(text: str) -> str:
+    """
+    Normalize extracted resume text for prompting: fix ligatures and
+    hyphenated line breaks, drop (cid:N) glyphs, page numbers and running
+    headers/footers repeated across pages, and collapse whitespace. A number
+    on a line of its own is only taken for a page number when numbers like
+    it stand at the top or bottom of most pages.
+    """
+    text = _CID.sub("", text.translate(_LIGATURES))
+    text = _HYPHENATED_BREAK.sub(r"\1\2", text)
+    pages = [
+        [_INLINE_SPACE.sub(" ", line).strip() for line in page.splitlines()]
+        for page in text.split(PAGE_SEPARATOR)
+    ]
+    running = _running_lines(pages)
+
+    seen = set()
+    kept: List[str] = []
+    for lines in pages:
+        edges = _edge_lines(lines)
+        for index, line in enumerate(lines):
+            key = _running_key(line)
+            if key in running:
+                if key != line:
+                    if index in edges:
+                        continue
+                elif line in seen:
+                    continue
+                else:
+                    seen.add(line)
+            kept.append(line)
+        kept.append("")
+
+    return _BLANK_LINES.sub("\n\n", "\n".join(kept)).strip()
+
+
+def strip_running_lines(text: str) -> str:
+    """
+    Drop repeats of running headers/footers from extracted text, keeping the
+    first occurrence (often the candidate's name), and page numbers at the
+    top or bottom of pages; everything else is kept as is.
+    Run on the whole document: once it is split into sections, a header
+    repeated on pages that fall in different sections no longer looks
+    repeated.
+    """
+    pages = text.split(PAGE_SEPARATOR)
+    normalized_pages = [
+        [_INLINE_SPACE.sub(" ", line).strip() for line in page.splitlines()]
+        for page in pages
+    ]
+    running = _running_lines(normalized_pages)
+    if not running:
+        return text
+
+    seen = set()
+    kept_pages = []
+    for page, normalized in zip(pages, normalized_pages):
+        edges = _edge_lines(normalized)
+        kept = []
+        for index, line in enumerate(page.splitlines()):
+            key = _running_key(normalized[index])
+            if key in running:
+                if key != normalized[index]:
+                    if index in edges:
+                        continue
+                elif key in seen:
+                    continue
+                else:
+                    seen.add(key)
+            kept.append(line)
+        kept_pages.append("\n".join(kept))
+    return PAGE_SEPARATOR.join(kept_pages)
+
+
+def _edge_lines(lines: List[str], edge: int = 2) -> set:
+    """Indexes of the first and last `edge` non-empty lines of a page."""
+    content = [index for index, line in enumerate(lines) if line]
+    return set(content[:edge] + content[-edge:])
+
+
+def _running_key(line: str):
+    """Page numbers count as one line whatever their digits."""
+    if _PAGE_NUMBER.match(line):
+        return ("page number", _DIGITS.sub("#", line.lower()))
+    return line
+
+
+def _running_lines(pages: List[List[str]]) -> set:
+    """
+    Lines at the top or bottom of most pages: running headers/footers, and
+    page numbers as `_running_key`s.
+    """
+    if len(pages) < 2:
+        return set()
+    counts = Counter()
+    for lines in pages:
+        counts.update({_running_key(lines[index]) for index in _edge_lines(lines)})
+    threshold = max(2, (len(pages) + 1) // 2)
+    return {line for line, count in counts.items() if count >= threshold}
+
+
+def resume_payload(resume_content) -> str:
+    """Plain-text resume payload instead of indented JSON of the sections."""
+    if not isinstance(resume_content, dict):
+        return compact_text(str(resume_content))
+    if list(resume_content) == ["content"]:
+        return compact_text(str(resume_content["content"]))
+    return "\n\n".join(
+        f"## {name.replace('_', ' ').title()}\n{compact_text(str(value))}"
+        for name, value in resume_content.items()
+        if value
+    )
+
+
+def bullet_list(items: Dict[str, List[str]]) -> str:
+    """Render {"heading": [items]} as compact markdown bullets."""
+    blocks = []
+    for heading, values in items.items():
+        if isinstance(values, list):
+            body = "\n".join(f"- {value}" for value in values)
+        else:
+            body = str(values)
+        blocks.append(f"{heading.replace('_', ' ').title()}:\n{body}")
+    return "\n".join(blocks)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE-style token estimate (~4 characters per token)."""
+    return (len(text) + 3) // 4
+
+
+def log_token_savings(
+    name: str,
+    template: PromptTemplate,
+    prompt: str,
+    legacy_payload: Callable[[], str],
+    payload_chars: int,
+):
+    """
+    Record the estimated prompt tokens, and with DEBUG logging also the
+    tokens saved by compaction. `legacy_payload` builds the old JSON payload
+    and is only called then, so normal requests don't serialize it.
+    """
+    after = estimate_tokens(prompt)
+    metrics.increment("prompt_tokens_estimated_total", after, prompt=name)
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    saved_chars = template.saved_static_chars + len(legacy_payload()) - payload_chars
+    before = (len(prompt) + saved_chars + 3) // 4
+    metrics.increment(
+        "prompt_tokens_saved_estimated_total", before - after, prompt=name
+    )
+    logger.debug(f"{name} prompt: ~{before} -> ~{after} tokens")
@@ -1,9 +1,25 @@
 import json
-from utils.data_models import FinalResult, JobComparisionResult, MarkdownResult
+from utils.data_models import (
+    CombinedResult,
+    FinalResult,
+    JobComparisionResult,
+    MarkdownResult,
+)
+from utils.prompt_builder import (
+    PromptTemplate,
+    bullet_list,
+    compact_schema,
+    log_token_savings,
+    resume_payload,
+)
+from utils.sections import JD_COMPARISON_OMIT_SECTIONS, omit_sections
+from utils.tracing import traced
 
 
-def get_markdown_report_prompt(suggestions, resume_content, additional_instructions):
-    prompt = f"""
+# Static parts are rendered once at import time; only the resume, suggestions
+# and user input are substituted per request.
+MARKDOWN_REPORT_TEMPLATE = PromptTemplate(
+    """
     Objective: Implement a sophisticated, intelligence-driven resume content optimization strategy specifically tailored to meet rigorous Applicant Tracking System (ATS) scanning and parsing requirements.
 
     ## Intelligent Transformation Methodology
@@ -54,22 +70,46 @@ def get_markdown_report_prompt(suggestions, resume_content, additional_instructi
     - Optimize parsing potential
 
     Input Specifications:-
-    Suggestions: {json.dumps(suggestions, indent=2)}
-    Resume Content: {json.dumps(resume_content, indent=2)}
-    Additional insturctions provided by user which must be followed: {additional_instructions}
+    Suggestions:
+    {{suggestions}}
+    Resume Content:
+    {{resume_content}}
+    Additional insturctions provided by user which must be followed: {{additional_instructions}}
 
     Final Note: Final content should be in proper markdown content. This content will directly display to UI.
 
     Below is the pydantic model json schema.
     Don't output all the fields present in the schema. Provide the main fields only.
-    {json.dumps(MarkdownResult.model_json_schema(), indent=2)}
+    {{schema}}
     Don't output explanation or any text. Just provide a valid JSON output only.
-    """
+    """,
+    legacy_static={"schema": json.dumps(MarkdownResult.model_json_schema(), indent=2)},
+    schema=compact_schema(MarkdownResult),
+)
+
+
+@traced("prompt.markdown_report")
+def get_markdown_report_prompt(suggestions, resume_content, additional_instructions):
+    payload = resume_payload(resume_content)
+    suggestions_text = bullet_list(suggestions)
+    prompt = MARKDOWN_REPORT_TEMPLATE.render(
+        suggestions=suggestions_text,
+        resume_content=payload,
+        additional_instructions=additional_instructions,
+    )
+    log_token_savings(
+        "markdown_report",
+        MARKDOWN_REPORT_TEMPLATE,
+        prompt,
+        lambda: json.dumps(suggestions, indent=2)
+        + json.dumps(resume_content, indent=2),
+        len(suggestions_text) + len(payload),
+    )
     return prompt
 
 
-def get_resume_analyzer_prompt(resume_content):
-    prompt = f"""
+RESUME_ANALYZER_TEMPLATE = PromptTemplate(
+    """
     Objective: Conduct a meticulous, multi-dimensional analysis of the provided resume to generate a precise Applicant Tracking System (ATS) compatibility score, leveraging
     advanced algorithmic assessment techniques.
     
@@ -116,17 +156,33 @@ def get_resume_analyzer_prompt(resume_content):
 
     Below is the pydantic model json schema.
     Don't output all the fields present in the schema. Provide the main fields only.
-    {json.dumps(FinalResult.model_json_schema(), indent=2)}
+    {{schema}}
     Don't output explanation or any text. Just provide a valid JSON output only.
 
     Resume Content
-    {json.dumps(resume_content, indent=2)}
-    """
+    {{resume_content}}
+    """,
+    legacy_static={"schema": json.dumps(FinalResult.model_json_schema(), indent=2)},
+    schema=compact_schema(FinalResult),
+)
+
+
+@traced("prompt.resume_analyzer")
+def get_resume_analyzer_prompt(resume_content):
+    payload = resume_payload(resume_content)
+    prompt = RESUME_ANALYZER_TEMPLATE.render(resume_content=payload)
+    log_token_savings(
+        "resume_analyzer",
+        RESUME_ANALYZER_TEMPLATE,
+        prompt,
+        lambda: json.dumps(resume_content, indent=2),
+        len(payload),
+    )
     return prompt
 
 
-def get_comparision_with_job_description_prompt(resume_content, job_description):
-    prompt = f"""
+JOB_COMPARISION_TEMPLATE = PromptTemplate(
+    """
     # Intelligent Resume-Job Description Compatibility Assessment Framework
     ## Comprehensive Evaluation Methodology
 
@@ -157,14 +213,202 @@ def get_comparision_with_job_description_prompt(resume_content, job_description)
     - Professional Narrative Coherence: W%
     
     Input:-
-    Resume Content: {json.dumps(resume_content, indent=2)}
-    Job Description: {job_description}
+    Resume Content:
+    {{resume_content}}
+    Job Description: {{job_description}}
 
     Below is the pydantic model json schema.
     Don't output all the fields present in the schema. Provide the main fields only.
-    {json.dumps(JobComparisionResult.model_json_schema(), indent=2)}
+    {{schema}}
     Don't output explanation or any text. Just provide a valid JSON output only.
     
     Do not output any other explanation or text except.
+    """,
+    legacy_static={
+        "schema": json.dumps(JobComparisionResult.model_json_schema(), indent=2)
+    },
+    schema=compact_schema(JobComparisionResult),
+)
+
+
+@traced("prompt.job_comparision")
+def get_comparision_with_job_description_prompt(resume_content, job_description):
+    # Everything but the sections that never bear on the match, e.g. hobbies.
+    payload = resume_payload(omit_sections(resume_content, JD_COMPARISON_OMIT_SECTIONS))
+    prompt = JOB_COMPARISION_TEMPLATE.render(
+        resume_content=payload, job_description=job_description
+    )
+    log_token_savings(
+        "job_comparision",
+        JOB_COMPARISION_TEMPLATE,
+        prompt,
+        lambda: json.dumps(resume_content, indent=2),
+        len(payload),
+    )
+    return prompt
+
+
+COMBINED_ANALYSIS_TEMPLATE = PromptTemplate(
+    """
+    Objective: In a single pass, (1) score the resume for Applicant Tracking System (ATS) compatibility, (2) rewrite it as an ATS-optimized Markdown resume applying your own recommendations, and (3) compare it with the job description if one is provided.
+
+    1. ATS Analysis ("analysis")
+        - Decompose the resume into header, summary, education, experience, skills, certifications and other sections
+        - Assess keyword density and industry terminology, formatting and parsing compliance, readability, and the substance of quantified achievements
+        - Generate an ATS compatibility score ranging from 1-100, derived from:
+            * Keyword optimization (35%)
+            * Structural formatting (25%)
+            * Content quality (20%)
+            * Professional narrative coherence (15%)
+            * Additional contextual factors (5%)
+        - Provide detailed recommendations and improvement strategies
+
+    2. Optimized Resume ("report")
+        - Apply the recommendations from step 1 with surgical, authentic edits: align keywords with industry terminology, simplify complex constructions, and never invent experience
+        - "content" is the complete transformed resume in proper Markdown; it will be displayed directly in the UI
+        - "changes" lists the exact words or sections you added or modified
+        - "additional" answers the user's additional instructions as plain text, or is empty if there are none
+
+    3. Job Description Comparison ("job_comparision")
+        - Only if a job description is provided; otherwise null
+        - Match technical skills, experience relevance, soft skills and narrative coherence
+        - Estimate the percentage chance of selection (1-100) and give actionable suggestions
+
+    Input:-
+    Resume Content:
+    {{resume_content}}
+    Additional insturctions provided by user which must be followed: {{additional_instructions}}
+    Job Description: {{job_description}}
+
+    Below is the pydantic model json schema.
+    Don't output all the fields present in the schema. Provide the main fields only.
+    {{schema}}
+    Don't output explanation or any text. Just provide a valid JSON output only.
+    """,
+    schema=compact_schema(CombinedResult),
+)
+
+
+@traced("prompt.combined_analysis")
+def get_combined_analysis_prompt(
+    resume_content, additional_instructions, job_description
+):
+    payload = resume_payload(resume_content)
+    prompt = COMBINED_ANALYSIS_TEMPLATE.render(
+        resume_content=payload,
+        additional_instructions=additional_instructions or "None",
+        job_description=job_description or "None",
+    )
+    log_token_savings(
+        "combined_analysis",
+        COMBINED_ANALYSIS_TEMPLATE,
+        prompt,
+        lambda: json.dumps(resume_content, indent=2),
+        len(payload),
+    )
+    return prompt
+
+
+SECTION_ANALYSIS_TEMPLATE = PromptTemplate(
+    """
+    Objective: This is part {{part}} of {{parts}} of a long resume that is scored and optimized part by part. For the sections below only, (1) score them for Applicant Tracking System (ATS) compatibility and (2) rewrite them as ATS-optimized Markdown applying your own recommendations. The other parts are handled separately.
+
+    1. ATS Analysis ("analysis")
+        - Assess keyword density and industry terminology, formatting and parsing compliance, readability, and the substance of quantified achievements
+        - Judge only what these sections can show; don't penalize sections that belong to other parts
+        - Generate an ATS compatibility score ranging from 1-100, derived from:
+            * Keyword optimization (35%)
+            * Structural formatting (25%)
+            * Content quality (20%)
+            * Professional narrative coherence (15%)
+            * Additional contextual factors (5%)
+        - Provide recommendations and improvement strategies specific to these sections
+
+    2. Optimized Sections ("report")
+        - Apply the recommendations from step 1 with surgical, authentic edits: align keywords with industry terminology, simplify complex constructions, and never invent experience
+        - "content" is these sections only, transformed, in proper Markdown; start each with a "##" heading, except sections titled "... Continued", which continue the previous part and must not repeat its heading
+        - "changes" lists the exact words or sections you added or modified
+        - "additional" answers the user's additional instructions as far as they concern these sections, as plain text, or is empty
+
+    Input:-
+    Resume Sections:
+    {{resume_content}}
+    Additional insturctions provided by user which must be followed: {{additional_instructions}}
+
+    Below is the pydantic model json schema.
+    Don't output all the fields present in the schema. Provide the main fields only.
+    {{schema}}
+    Don't output explanation or any text. Just provide a valid JSON output only.
+    """,
+    schema=compact_schema(CombinedResult),
+)
+
+
+@traced("prompt.section_analysis")
+def get_section_analysis_prompt(
+    resume_content, additional_instructions, part: int, parts: int
+):
+    payload = resume_payload(resume_content)
+    prompt = SECTION_ANALYSIS_TEMPLATE.render(
+        resume_content=payload,
+        additional_instructions=additional_instructions or "None",
+        part=part,
+        parts=parts,
+    )
+    log_token_savings(
+        "section_analysis",
+        SECTION_ANALYSIS_TEMPLATE,
+        prompt,
+        lambda: json.dumps(resume_content, indent=2),
+        len(payload),
+    )
+    return prompt
+
+
+SECTION_REPORT_TEMPLATE = PromptTemplate(
     """
+    Objective: This is part {{part}} of {{parts}} of a long resume that is optimized part by part. Rewrite the sections below only as ATS-optimized Markdown, applying the suggestions where they concern these sections and following the user's additional instructions. The other parts are handled separately.
+
+    - Make surgical, authentic edits: align keywords with industry terminology, simplify complex constructions, and never invent experience
+    - "content" is these sections only, transformed, in proper Markdown; start each with a "##" heading, except sections titled "... Continued", which continue the previous part and must not repeat its heading
+    - "changes" lists the exact words or sections you added or modified
+    - "additional" answers the user's additional instructions as far as they concern these sections, as plain text, or is empty
+
+    Input:-
+    Suggestions:
+    {{suggestions}}
+    Resume Sections:
+    {{resume_content}}
+    Additional insturctions provided by user which must be followed: {{additional_instructions}}
+
+    Below is the pydantic model json schema.
+    Don't output all the fields present in the schema. Provide the main fields only.
+    {{schema}}
+    Don't output explanation or any text. Just provide a valid JSON output only.
+    """,
+    schema=compact_schema(MarkdownResult),
+)
+
+
+@traced("prompt.section_report")
+def get_section_report_prompt(
+    suggestions, resume_content, additional_instructions, part: int, parts: int
+):
+    payload = resume_payload(resume_content)
+    suggestions_text = bullet_list(suggestions)
+    prompt = SECTION_REPORT_TEMPLATE.render(
+        suggestions=suggestions_text,
+        resume_content=payload,
+        additional_instructions=additional_instructions or "None",
+        part=part,
+        parts=parts,
+    )
+    log_token_savings(
+        "section_report",
+        SECTION_REPORT_TEMPLATE,
+        prompt,
+        lambda: json.dumps(suggestions, indent=2)
+        + json.dumps(resume_content, indent=2),
+        len(suggestions_text) + len(payload),
+    )
     return prompt
@@ -1,12 +1,51 @@
-import PyPDF2
-from typing import Dict, Any
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, Iterator, List, Tuple
+from .cache import TieredCache, content_hash
+from .chunking import (
+    CHUNK_CONCURRENCY,
+    chunk_sections,
+    merge_reports,
+    merge_results,
+    needs_chunking,
+)
+from .pdf_extraction import extract_text
+from .prompt_builder import strip_running_lines
+from .sections import split_sections
+from .tracing import span
 from .prompts import (
     get_resume_analyzer_prompt,
     get_markdown_report_prompt,
     get_comparision_with_job_description_prompt,
+    get_combined_analysis_prompt,
+    get_section_analysis_prompt,
+    get_section_report_prompt,
 )
 
-from .llm_models import get_response_from_llm_model, SUPPORTED_MODELS
+from .ats_scorer import analyze_locally
+from .data_models import (
+    CombinedResult,
+    FinalResult,
+    JobComparisionResult,
+    MarkdownResult,
+    RankedJobComparisionResult,
+)
+from .jd_ranking import posting_title, rank_job_descriptions, split_job_descriptions
+from .llm_models import (
+    get_response_from_llm_model,
+    stream_response_from_llm_model,
+    SUPPORTED_MODELS,
+)
+
+# Extracted text keyed by a hash of the PDF bytes. Gradio hands us a fresh temp
+# path per upload, so the path itself is useless as a key.
+pdf_cache = TieredCache(
+    "pdf_text",
+    max_entries=int(os.getenv("PDF_CACHE_MAX_ENTRIES", "128")),
+    disk=os.getenv("PDF_CACHE_DISK", "0") == "1",
+)
+# How many of the pasted job descriptions get a full LLM comparison.
+JD_TOP_K = int(os.getenv("JD_TOP_K", "3"))
 
 
 class ResumeAnalyzer:
@@ -18,43 +57,52 @@ class ResumeAnalyzer:
         Extract text content from PDF and segment into sections
         """
         with open(pdf_file, "rb") as file:
-            pdf_reader = PyPDF2.PdfReader(file)
-            full_text = ""
+            return self.extract_pdf_bytes(file.read())
 
-            # Extract full text
-            for page in pdf_reader.pages:
-                full_text += page.extract_text()
-
-            sections = {"content": full_text}
-            return sections
-
-    def _extract_section(
-        self, text: str, start_keyword: str, end_keyword: str = None
-    ) -> str:
+    def extract_pdf_bytes(self, data: bytes) -> Dict[str, str]:
         """
-        Extract a specific section from text
+        Extract text content from the bytes of a PDF, e.g. an API upload
         """
-        text = text.lower()
-        start_idx = text.find(start_keyword)
-        if start_idx == -1:
-            return ""
+        with span("pdf_extract", bytes=len(data)) as extract:
+            # Tagged so entries cached before segmentation aren't reused.
+            cache_key = content_hash(data, "sections-v4")
+            sections = pdf_cache.get(cache_key)
+            extract.set(cached=sections is not None)
+            if sections is not None:
+                return sections
 
-        if end_keyword:
-            end_idx = text.find(end_keyword, start_idx)
-            return text[start_idx:end_idx] if end_idx != -1 else text[start_idx:]
-
-        return text[start_idx:]
+            # Pages are streamed in order and joined once; large documents are
+            # parsed in a process pool.
+            # Running headers are found across pages before the text is
+            # split; the sections are compacted one by one in the prompts.
+            text = strip_running_lines(extract_text(data))
+            sections = split_sections(text)
+            extract.set(chars=len(text), sections=len(sections))
+            pdf_cache.set(cache_key, sections)
+            return sections
 
     def analyze_resume(
         self, sections: Dict[str, str], model: str, api_key: str
     ) -> Dict[str, Any]:
         """
-        Analyze resume using selected LLM
+        Analyze resume using selected LLM. For long resumes this is the
+        analysis half of `chunked_analysis`; callers that need the report too
+        should call that directly and pass it to `chunked_report`.
         """
+        if needs_chunking(sections):
+            return self.chunked_analysis(model, api_key, sections, "")["analysis"]
         prompt = get_resume_analyzer_prompt(resume_content=sections)
-        response = get_response_from_llm_model(model, api_key, prompt)
+        response = get_response_from_llm_model(
+            model, api_key, prompt, result_model=FinalResult
+        )
         return response
 
+    def analyze_resume_fast(self, sections: Dict[str, str]) -> Dict[str, Any]:
+        """
+        Score the resume locally, without an LLM, in milliseconds
+        """
+        return analyze_locally(sections)
+
     def markdown_report(
         self,
         model,
@@ -62,34 +110,226 @@ class ResumeAnalyzer:
         suggestions,
         additional_insturctions,
         resume_content,
-        filename,
     ):
+        """
+        The optimized resume as a MarkdownResult dict; "content" is the Markdown.
+        Long resumes are rewritten in parts against the same suggestions.
+        """
+        if needs_chunking(resume_content):
+            return self.rewrite_in_parts(
+                model, api_key, suggestions, additional_insturctions, resume_content
+            )
         prompt = get_markdown_report_prompt(
             suggestions, resume_content, additional_insturctions
         )
-        filename = filename.split("/")[-1]
-        filename = filename.split(".")[0]
-        response = get_response_from_llm_model(model, api_key, prompt)
-        with open(f"Resumes/{filename}_updated_resume.md", "w") as f:
-            f.write(response.get("content", ""))
-        response["content"] = (
-            f"Your updated resume has been successfully saved as 'Resumes/{filename}_updated_resume.md' on your local device. For a summary of the modifications made, please refer to the below section. You can also view the updated version of your resume in the 'Updated Resume' section. If you’d like to make further changes, feel free to provide additional instructions in the 'Resume Analysis' section."
+        return get_response_from_llm_model(
+            model, api_key, prompt, result_model=MarkdownResult
         )
-        return response
+
+    def markdown_report_stream(
+        self,
+        model,
+        api_key,
+        suggestions,
+        additional_insturctions,
+        resume_content,
+    ) -> Iterator[Tuple[Dict[str, Any], bool]]:
+        """
+        Stream the markdown report as (report, done) pairs.
+
+        Partial reports carry the optimized resume in "content" as it is
+        generated. The final report is validated against MarkdownResult,
+        exactly like `markdown_report`. Long resumes, analyzed in parts, only
+        yield the final report.
+        """
+        if needs_chunking(resume_content):
+            yield self.markdown_report(
+                model, api_key, suggestions, additional_insturctions, resume_content
+            ), True
+            return
+        prompt = get_markdown_report_prompt(
+            suggestions, resume_content, additional_insturctions
+        )
+        yield from stream_response_from_llm_model(
+            model, api_key, prompt, result_model=MarkdownResult
+        )
+
+    def combined_analysis(
+        self,
+        model,
+        api_key,
+        resume_content,
+        additional_insturctions,
+        job_description,
+    ) -> Dict[str, Any]:
+        """
+        Analyze, optimize and compare with a job description in one LLM call.
+
+        The response is validated against CombinedResult. Returns a dict with
+        "analysis", "report" and "job_comparision" (None without a job
+        description). Long resumes are analyzed in parts, alongside a
+        separate job description comparison.
+        """
+        job_description = (job_description or "").strip()
+        if needs_chunking(resume_content):
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                comparison = executor.submit(
+                    self.compare_with_job_descriptions,
+                    model,
+                    api_key,
+                    resume_content,
+                    job_description,
+                )
+                combined = self.chunked_analysis(
+                    model, api_key, resume_content, additional_insturctions
+                )
+                combined["job_comparision"] = comparison.result()
+            return combined
+        prompt = get_combined_analysis_prompt(
+            resume_content, additional_insturctions, job_description
+        )
+        combined = get_response_from_llm_model(
+            model, api_key, prompt, result_model=CombinedResult
+        )
+        if not job_description:
+            combined["job_comparision"] = None
+        return combined
+
+    def chunked_analysis(
+        self, model, api_key, resume_content, additional_insturctions
+    ) -> Dict[str, Any]:
+        """
+        Map-reduce for long resumes: each part of a few sections is scored and
+        rewritten by its own concurrent LLM call, so latency follows the
+        largest part rather than the whole document. Returns "analysis"
+        (FinalResult) and "report" (MarkdownResult), merged locally.
+        """
+        parts = chunk_sections(resume_content)
+        with span("chunked_analysis", parts=len(parts)):
+
+            def analyze(index):
+                prompt = get_section_analysis_prompt(
+                    parts[index], additional_insturctions, index + 1, len(parts)
+                )
+                return get_response_from_llm_model(
+                    model, api_key, prompt, result_model=CombinedResult
+                )
+
+            workers = max(1, min(len(parts), CHUNK_CONCURRENCY))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                results = list(executor.map(analyze, range(len(parts))))
+            sizes = [sum(len(value) for value in part.values()) for part in parts]
+            return merge_results(results, sizes)
+
+    def chunked_report(
+        self, model, api_key, chunked, additional_insturctions, resume_content
+    ) -> Dict[str, Any]:
+        """
+        The report of a long resume given its `chunked_analysis`, which runs
+        without instructions so it can be reused: its report as is, or, with
+        additional instructions, a separate rewrite of the parts that applies
+        them to the same analysis.
+        """
+        if not (additional_insturctions or "").strip():
+            return chunked["report"]
+        suggestions = {
+            "detailed_recommendations": chunked["analysis"]["detailed_recommendations"],
+            "improvement_strategies": chunked["analysis"]["improvement_strategies"],
+        }
+        return self.rewrite_in_parts(
+            model, api_key, suggestions, additional_insturctions, resume_content
+        )
+
+    def rewrite_in_parts(
+        self, model, api_key, suggestions, additional_insturctions, resume_content
+    ) -> Dict[str, Any]:
+        """
+        The report pass of `chunked_analysis` alone: each part is rewritten
+        by its own concurrent LLM call and the MarkdownResults are merged.
+        """
+        parts = chunk_sections(resume_content)
+        with span("rewrite_in_parts", parts=len(parts)):
+
+            def rewrite(index):
+                prompt = get_section_report_prompt(
+                    suggestions,
+                    parts[index],
+                    additional_insturctions,
+                    index + 1,
+                    len(parts),
+                )
+                return get_response_from_llm_model(
+                    model, api_key, prompt, result_model=MarkdownResult
+                )
+
+            workers = max(1, min(len(parts), CHUNK_CONCURRENCY))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return merge_reports(list(executor.map(rewrite, range(len(parts)))))
 
     def compare_with_job_descriptions(
         self, model, api_key, resume_content, job_descriptions
     ):
         job_descriptions = job_descriptions.strip()
+        postings = split_job_descriptions(job_descriptions)
+        if len(postings) > 1:
+            return self.rank_job_descriptions(model, api_key, resume_content, postings)
         if len(job_descriptions):
             prompt = get_comparision_with_job_description_prompt(
                 resume_content, job_descriptions
             )
-            response = get_response_from_llm_model(model, api_key, prompt)
+            response = get_response_from_llm_model(
+                model, api_key, prompt, result_model=JobComparisionResult
+            )
             return response
         else:
-            {
+            return {
                 "analysis": "No job description provided.",
                 "percentage_of_chances": "N/A",
                 "suggestions": "N/A",
             }
+
+    def rank_job_descriptions(
+        self, model, api_key, resume_content, postings: List[str], top_k: int = JD_TOP_K
+    ) -> List[Dict[str, Any]]:
+        """
+        Shortlist the postings most similar to the resume with a local TF-IDF
+        prefilter, then compare only the top `top_k` concurrently with the LLM.
+        Returns RankedJobComparisionResult dicts, best chance of selection first.
+        """
+        resume_text = "\n".join(str(value) for value in resume_content.values())
+        shortlist = rank_job_descriptions(resume_text, postings)[:top_k]
+
+        def compare(index):
+            prompt = get_comparision_with_job_description_prompt(
+                resume_content, postings[index]
+            )
+            return get_response_from_llm_model(
+                model, api_key, prompt, result_model=JobComparisionResult
+            )
+
+        with ThreadPoolExecutor(max_workers=max(1, len(shortlist))) as executor:
+            responses = list(executor.map(compare, [i for i, _ in shortlist]))
+
+        ranked = [
+            {
+                **response,
+                "percentage_of_chances": round(_as_percentage(response)),
+                "title": posting_title(postings[index]),
+                "similarity": round(similarity, 4),
+            }
+            for (index, similarity), response in zip(shortlist, responses)
+        ]
+        ranked.sort(key=lambda item: item["percentage_of_chances"], reverse=True)
+        return [
+            RankedJobComparisionResult.model_validate(
+                {**item, "rank": rank}
+            ).model_dump()
+            for rank, item in enumerate(ranked, start=1)
+        ]
+
+
+def _as_percentage(comparison: Dict[str, Any]) -> float:
+    try:
+        return float(str(comparison.get("percentage_of_chances", 0)).rstrip("%"))
+    except ValueError:
+        return 0.0
@@ -0,0 +1,263 @@
+import email.utils
+import os
+import random
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+from . import metrics
+from .cache import CACHE_DIR, connect_sqlite
+from .clients import key_fingerprint
+
+# Status codes worth retrying besides 5xx: request timeout and rate limiting.
+RETRYABLE_STATUS = {408, 429}
+MAX_BACKOFF_SECONDS = float(os.getenv("LLM_MAX_BACKOFF_SECONDS", "30"))
+
+# Requests per second and burst size per provider, overridable with
+# LLM_RATE_LIMITS="Mistral=1:2,Groq=0.5:3". Providers not listed are unlimited.
+DEFAULT_RATE_LIMITS = {
+    "OpenAI": (5.0, 10),
+    "Claude": (1.0, 5),
+    "Mistral": (1.0, 2),
+    "HuggingFace Inference API": (1.0, 3),
+    "Groq Model": (0.5, 3),
+}
+# With several server workers, keep the buckets in SQLite so the limits above
+# apply to the host as a whole rather than to each worker separately.
+SHARED_RATE_LIMITS = os.getenv("LLM_RATE_LIMITS_SHARED", "0") == "1"
+SHARED_STATE_PATH = os.path.join(CACHE_DIR, "shared_state.sqlite3")
+
+
+class ResponseParseError(ValueError):
+    """The provider answered, but not with valid JSON. Worth a re-ask."""
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    for attr in ("status_code", "http_status", "status"):
+        value = getattr(error, attr, None)
+        if isinstance(value, int):
+            return value
+    response = getattr(error, "response", None)
+    value = getattr(response, "status_code", None)
+    return value if isinstance(value, int) else None
+
+
+def _headers(error: BaseException):
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or getattr(error, "headers", None)
+    return headers or {}
+
+
+def parse_retry_after(value) -> Optional[float]:
+    """Parse a Retry-After header given in seconds or as an HTTP date."""
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _is_transient(error: BaseException) -> bool:
+    if isinstance(error, (TimeoutError, ConnectionError)):
+        return True
+    # Covers requests, httpx and the provider SDKs without importing them.
+    name = type(error).__name__
+    return "Timeout" in name or "Connection" in name or "Connect" in name
+
+
+def classify_error(error: BaseException) -> Tuple[bool, Optional[float]]:
+    """
+    Decide whether `error` is worth retrying.
+
+    Walks the exception chain, since adapters wrap provider errors. Returns
+    (retryable, retry_after_seconds). Rate limits, 5xx responses, timeouts,
+    connection failures and malformed JSON are retryable; everything else
+    (bad API keys, unknown models, other 4xx) is fatal.
+    """
+    seen = set()
+    current = error
+    while current is not None and id(current) not in seen:
+        seen.add(id(current))
+        if isinstance(current, ResponseParseError):
+            return True, None
+        status = _status_code(current)
+        if status is not None:
+            if status in RETRYABLE_STATUS or status >= 500:
+                headers = _headers(current)
+                return True, parse_retry_after(headers.get("retry-after"))
+            return False, None
+        if _is_transient(current):
+            return True, None
+        current = current.__cause__ or current.__context__
+    return False, None
+
+
+def backoff_delay(
+    attempt: int, base: float, retry_after: Optional[float] = None
+) -> float:
+    """Exponential backoff with full jitter, never shorter than Retry-After."""
+    delay = random.uniform(0, min(MAX_BACKOFF_SECONDS, base * 2 ** (attempt - 1)))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, MAX_BACKOFF_SECONDS))
+    return delay
+
+
+class TokenBucket:
+    """Classic token bucket; `acquire` blocks until a token is available."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _reserve(self) -> float:
+        """Take a token, returning how long the caller must wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                self.capacity, self._tokens + (now - self._updated) * self.rate
+            )
+            self._updated = now
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self) -> float:
+        """Block until a token is available and return the time waited."""
+        wait = self._reserve()
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class SharedTokenBucket(TokenBucket):
+    """
+    Token bucket whose state lives in a SQLite row, so every process using
+    the same database draws from one bucket. Uses wall-clock time, since
+    monotonic clocks are not comparable across processes.
+    """
+
+    def __init__(self, conn, lock: threading.Lock, name: str, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.name = name
+        self._conn = conn
+        self._lock = lock
+
+    def _reserve(self) -> float:
+        with self._lock:
+            # IMMEDIATE takes the write lock up front, so two processes can't
+            # both read the same token count and spend it twice.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                tokens, updated = row if row else (self.capacity, now)
+                tokens = min(
+                    self.capacity, tokens + max(0.0, now - updated) * self.rate
+                )
+                tokens -= 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets VALUES (?, ?, ?)",
+                    (self.name, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        if tokens >= 0:
+            return 0.0
+        return -tokens / self.rate
+
+
+def _load_rate_limits() -> Dict[str, Tuple[float, float]]:
+    limits = dict(DEFAULT_RATE_LIMITS)
+    for item in os.getenv("LLM_RATE_LIMITS", "").split(","):
+        if "=" not in item:
+            continue
+        provider, spec = item.split("=", 1)
+        rate, _, burst = spec.partition(":")
+        if float(rate) <= 0:
+            limits.pop(provider.strip(), None)
+        else:
+            limits[provider.strip()] = (float(rate), float(burst or 1))
+    return limits
+
+
+class RateLimiterRegistry:
+    """
+    One token bucket per (provider, API key); shared through the SQLite
+    database at `shared_path` when one is given.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[Dict[str, Tuple[float, float]]] = None,
+        shared_path: Optional[str] = None,
+    ):
+        self.limits = _load_rate_limits() if limits is None else limits
+        self._buckets: Dict[Tuple[str, str], TokenBucket] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_lock = threading.Lock()
+        if shared_path:
+            self._conn = connect_sqlite(shared_path)
+            # Transactions are managed explicitly by SharedTokenBucket.
+            self._conn.isolation_level = None
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS buckets (
+                    name TEXT PRIMARY KEY,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL
+                )
+                """
+            )
+
+    def get(self, provider: str, api_key: Optional[str]) -> Optional[TokenBucket]:
+        if provider not in self.limits:
+            return None
+        key = (provider, key_fingerprint(api_key))
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                if self._conn is not None:
+                    bucket = SharedTokenBucket(
+                        self._conn,
+                        self._conn_lock,
+                        f"{provider}:{key[1]}",
+                        *self.limits[provider],
+                    )
+                else:
+                    bucket = TokenBucket(*self.limits[provider])
+                self._buckets[key] = bucket
+            return bucket
+
+    def throttle(self, provider: str, api_key: Optional[str]) -> float:
+        """Wait for this provider/key's bucket, recording any throttling."""
+        bucket = self.get(provider, api_key)
+        if bucket is None:
+            return 0.0
+        waited = bucket.acquire()
+        if waited > 0:
+            metrics.increment("llm_throttled_total", provider=provider)
+            metrics.increment(
+                "llm_throttle_wait_seconds_total", waited, provider=provider
+            )
+        return waited
+
+
+rate_limiters = RateLimiterRegistry(
+    shared_path=SHARED_STATE_PATH if SHARED_RATE_LIMITS else None
+)
@@ -0,0 +1,223 @@
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from . import metrics
+
+# Selecting this model routes each call to the fastest healthy model of a
+# quality tier: "Auto" uses LLM_AUTO_TIER, {"Auto": "high"} names the tier.
+AUTO_MODEL = "Auto"
+AUTO_DEFAULT_TIER = os.getenv("LLM_AUTO_TIER", "standard")
+
+# Models per tier, best first, overridable with LLM_TIER_<NAME>="Model,...".
+# Custom models are written "Groq Model:llama-3.3-70b-versatile".
+DEFAULT_QUALITY_TIERS = {
+    "high": [
+        "OpenAI GPT-4o",
+        "Claude 3.5 Sonnet",
+        "Mistral Large",
+        "OpenAI GPT-4 Turbo",
+    ],
+    "standard": [
+        "OpenAI GPT-4o",
+        "Claude 3.5 Sonnet",
+        "Mistral Large",
+        "Mistral Medium",
+        "OpenAI GPT-4o Mini",
+        "Claude 3.5 Haiku",
+    ],
+}
+
+# Each new observation moves a rate or latency this far toward itself.
+EWMA_ALPHA = float(os.getenv("LLM_STATS_ALPHA", "0.3"))
+# Error and parse-failure rates halve every this many seconds without new
+# calls, so a model that was avoided after an outage gets tried again.
+STATS_HALF_LIFE_SECONDS = float(os.getenv("LLM_STATS_HALF_LIFE_SECONDS", "30"))
+# Models above this error or parse-failure rate are only used as a last resort.
+MAX_HEALTHY_ERROR_RATE = float(os.getenv("LLM_AUTO_MAX_ERROR_RATE", "0.5"))
+# A latency sample older than this is stale. Stale models keep their last
+# EWMA as a prior and never-measured ones get LATENCY_PRIOR_SECONDS, so a
+# known-slow model isn't re-chosen just because traffic was low.
+STATS_STALE_SECONDS = float(os.getenv("LLM_STATS_STALE_SECONDS", "300"))
+LATENCY_PRIOR_SECONDS = float(os.getenv("LLM_LATENCY_PRIOR_SECONDS", "10"))
+# Share of auto calls that try a stale or unmeasured healthy model first, so
+# every model in the tier keeps being measured without a burst of traffic.
+PROBE_FRACTION = float(os.getenv("LLM_AUTO_PROBE_FRACTION", "0.05"))
+
+
+def _load_tiers() -> Dict[str, List[str]]:
+    tiers = {name: list(models) for name, models in DEFAULT_QUALITY_TIERS.items()}
+    for key, value in os.environ.items():
+        if key.startswith("LLM_TIER_") and value.strip():
+            tiers[key[len("LLM_TIER_") :].lower()] = [
+                spec.strip() for spec in value.split(",") if spec.strip()
+            ]
+    return tiers
+
+
+QUALITY_TIERS = _load_tiers()
+
+
+def is_auto_model(model) -> bool:
+    name = list(model.keys())[0] if isinstance(model, dict) else model
+    return name == AUTO_MODEL
+
+
+def auto_tier(model) -> str:
+    """The quality tier named by an auto model selection."""
+    tier = model[AUTO_MODEL] if isinstance(model, dict) else ""
+    tier = (tier or AUTO_DEFAULT_TIER).strip().lower()
+    if tier not in QUALITY_TIERS:
+        raise ValueError(
+            f"Unknown quality tier '{tier}'; choose from {', '.join(QUALITY_TIERS)}"
+        )
+    return tier
+
+
+class _Rates:
+    __slots__ = (
+        "latency",
+        "error_rate",
+        "parse_failure_rate",
+        "calls",
+        "last_call",
+        "updated",
+    )
+
+    def __init__(self):
+        self.latency: Optional[float] = None
+        self.error_rate = 0.0
+        self.parse_failure_rate = 0.0
+        self.calls = 0
+        self.last_call: Optional[float] = None
+        self.updated = time.monotonic()
+
+    def decay(self, now: float):
+        factor = 0.5 ** ((now - self.updated) / STATS_HALF_LIFE_SECONDS)
+        self.error_rate *= factor
+        self.parse_failure_rate *= factor
+        self.updated = now
+
+
+def _ewma(current: Optional[float], value: float) -> float:
+    return value if current is None else current + EWMA_ALPHA * (value - current)
+
+
+class ModelStats:
+    """
+    Rolling per-model health: EWMA latency of successful calls, and error
+    and parse-failure rates that decay back toward zero while idle.
+    """
+
+    def __init__(self):
+        self._rates: Dict[Tuple[str, str], _Rates] = {}
+        self._lock = threading.Lock()
+
+    def _get(self, provider: str, model: str, now: float) -> _Rates:
+        rates = self._rates.get((provider, model))
+        if rates is None:
+            rates = self._rates[(provider, model)] = _Rates()
+        rates.decay(now)
+        return rates
+
+    def record_call(self, provider: str, model: str, seconds: float, ok: bool):
+        now = time.monotonic()
+        with self._lock:
+            rates = self._get(provider, model, now)
+            rates.calls += 1
+            rates.last_call = now
+            rates.error_rate = _ewma(rates.error_rate, 0.0 if ok else 1.0)
+            if ok:
+                rates.latency = _ewma(rates.latency, seconds)
+            snapshot = (rates.latency, rates.error_rate)
+        labels = {"provider": provider, "model": model}
+        if snapshot[0] is not None:
+            metrics.set_gauge("llm_model_latency_ewma_seconds", snapshot[0], **labels)
+        metrics.set_gauge("llm_model_error_rate", snapshot[1], **labels)
+
+    def record_parse(self, provider: str, model: str, ok: bool):
+        with self._lock:
+            rates = self._get(provider, model, time.monotonic())
+            rates.parse_failure_rate = _ewma(
+                rates.parse_failure_rate, 0.0 if ok else 1.0
+            )
+            value = rates.parse_failure_rate
+        metrics.set_gauge(
+            "llm_model_parse_failure_rate", value, provider=provider, model=model
+        )
+
+    def snapshot(self, provider: str, model: str) -> Dict:
+        now = time.monotonic()
+        with self._lock:
+            rates = self._get(provider, model, now)
+            age = now - (rates.last_call or float("-inf"))
+            return {
+                "latency": rates.latency,
+                "stale": rates.latency is None or age > STATS_STALE_SECONDS,
+                "error_rate": rates.error_rate,
+                "parse_failure_rate": rates.parse_failure_rate,
+                "calls": rates.calls,
+            }
+
+    def healthy(self, provider: str, model: str) -> bool:
+        stats = self.snapshot(provider, model)
+        return (
+            stats["error_rate"] <= MAX_HEALTHY_ERROR_RATE
+            and stats["parse_failure_rate"] <= MAX_HEALTHY_ERROR_RATE
+        )
+
+    def expected_latency(self, provider: str, model: str) -> float:
+        """
+        EWMA latency scaled up by the failure rates: a model that fails
+        half its calls needs about two attempts per answer. Models never
+        measured are assumed to take LATENCY_PRIOR_SECONDS.
+        """
+        stats = self.snapshot(provider, model)
+        latency = stats["latency"]
+        if latency is None:
+            latency = LATENCY_PRIOR_SECONDS
+        success = (1 - stats["error_rate"]) * (1 - stats["parse_failure_rate"])
+        return latency / max(success, 0.05)
+
+    def stale(self, provider: str, model: str) -> bool:
+        return self.snapshot(provider, model)["stale"]
+
+    def reset(self):
+        with self._lock:
+            self._rates.clear()
+
+
+model_stats = ModelStats()
+
+
+def rank_by_health(models: List[Tuple[str, str, object]]) -> List[object]:
+    """
+    Order (provider, model name, payload) triples: healthy models by expected
+    latency, then unhealthy ones, keeping tier order among equals. For a
+    PROBE_FRACTION of calls, a random healthy model without a recent latency
+    sample goes first instead, so it gets measured.
+    """
+    scored = [
+        (
+            not model_stats.healthy(provider, name),
+            model_stats.expected_latency(provider, name),
+            index,
+            payload,
+        )
+        for index, (provider, name, payload) in enumerate(models)
+    ]
+    scored.sort(key=lambda item: item[:3])
+    ranked = [payload for *_, payload in scored]
+    if random.random() < PROBE_FRACTION:
+        stale = [
+            index
+            for index, (provider, name, _) in enumerate(models)
+            if model_stats.healthy(provider, name) and model_stats.stale(provider, name)
+        ]
+        if stale:
+            provider, name, probe = models[random.choice(stale)]
+            ranked = [probe] + [payload for payload in ranked if payload is not probe]
+            metrics.increment("llm_auto_probes_total", provider=provider, model=name)
+    return ranked
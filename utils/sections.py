@@ -0,0 +1,127 @@
+"""
+Split resume text into its sections in one pass.
+
+All heading patterns are compiled into a single regex of named alternatives,
+so the text is scanned once however many sections the lexicon knows, and
+each match already says which section it opens.
+"""
+
+import os
+import re
+from typing import Dict, List, NamedTuple
+
+# Canonical section name -> heading pattern, matched against a whole line
+# case-insensitively, with an optional trailing colon. Words that are as
+# often sub-headings inside a role ("Achievements:", "Technologies") are
+# deliberately not here.
+SECTION_HEADINGS = {
+    "summary": r"(?:professional |career )?(?:summary|profile|objective)|about me",
+    "experience": r"(?:work |professional )?experience|employment(?: history)?|work history",
+    "education": r"education|academic background",
+    "skills": r"(?:technical |core )?skills|tech stack",
+    "projects": r"(?:personal |selected )?projects",
+    "certifications": r"certifications?|licen[cs]es",
+    "awards": r"awards?(?: (?:and|&) honou?rs)?|honou?rs(?: (?:and|&) awards)?",
+    "publications": r"publications|papers",
+    "languages": r"languages",
+    "volunteering": r"volunteer(?:ing)?(?: experience| work)?",
+    "interests": r"interests|hobbies(?: (?:and|&) interests)?",
+}
+# Headings that open a section wherever they stand. The others only count
+# when written in capitals or followed by a blank line, since a bare
+# "Awards" or "Languages" line is just as likely part of a job entry.
+TOP_LEVEL_SECTIONS = {
+    "summary",
+    "experience",
+    "education",
+    "skills",
+    "projects",
+    "certifications",
+}
+# Whatever precedes the first heading: name, contact details, often a pitch.
+HEADER = "header"
+
+# Sections the job description comparison prompt leaves out; everything
+# else, including text under headings the lexicon doesn't know, is sent.
+JD_COMPARISON_OMIT_SECTIONS = [
+    name.strip()
+    for name in os.getenv("JD_COMPARISON_OMIT_SECTIONS", "interests").split(",")
+    if name.strip()
+]
+
+# Headings start a line (or a page, after the "\f" separator) and end it.
+_HEADING = re.compile(
+    r"(?:^|(?<=\f))[ \t]*(?:"
+    + "|".join(f"(?P<{name}>{pattern})" for name, pattern in SECTION_HEADINGS.items())
+    + r")[ \t]*:?[ \t]*(?=\n|\f|\Z)",
+    re.IGNORECASE | re.MULTILINE,
+)
+_BLANK_LINE_AFTER = re.compile(r"[ \t]*(?:\n[ \t]*(?:\n|\f|\Z)|\f|\Z)")
+
+
+def _opens_section(text: str, match: re.Match) -> bool:
+    heading = match.group(match.lastgroup)
+    return (
+        match.lastgroup in TOP_LEVEL_SECTIONS
+        or heading.isupper()
+        or _BLANK_LINE_AFTER.match(text, match.end()) is not None
+    )
+
+
+class Section(NamedTuple):
+    name: str  # a SECTION_HEADINGS key, or HEADER
+    heading: str  # as written in the resume; "" for the header
+    start: int  # offset of the heading line
+    body_start: int  # offset just past the heading
+    end: int  # offset of the next heading, or the end of the text
+
+    def body(self, text: str) -> str:
+        return text[self.body_start : self.end].strip()
+
+
+def find_sections(text: str) -> List[Section]:
+    """Sections in document order, with offsets into `text`."""
+    matches = [m for m in _HEADING.finditer(text) if _opens_section(text, m)]
+    sections = []
+    if matches and text[: matches[0].start()].strip():
+        sections.append(Section(HEADER, "", 0, 0, matches[0].start()))
+    for match, following in zip(matches, matches[1:] + [None]):
+        end = following.start() if following else len(text)
+        heading = match.group(match.lastgroup)
+        sections.append(
+            Section(match.lastgroup, heading, match.start(), match.end(), end)
+        )
+    return sections
+
+
+def split_sections(text: str) -> Dict[str, str]:
+    """
+    {section name: text} in document order, without the heading lines.
+    Repeated headings are merged; text without any known heading comes back
+    whole as {"content": text}. Offsets are left to `find_sections`, since
+    this dict is what the prompts and caches take.
+    """
+    sections: Dict[str, str] = {}
+    for section in find_sections(text):
+        body = section.body(text)
+        if not body:
+            continue
+        previous = sections.get(section.name)
+        sections[section.name] = f"{previous}\n\n{body}" if previous else body
+    if not sections or list(sections) == [HEADER]:
+        return {"content": text}
+    return sections
+
+
+def join_sections(sections: Dict[str, str]) -> str:
+    """The resume as one text again, each section under its canonical heading."""
+    return "\n\n".join(
+        value if name in (HEADER, "content") else f"{name.title()}\n{value}"
+        for name, value in sections.items()
+    )
+
+
+def omit_sections(sections: Dict[str, str], names: List[str]) -> Dict[str, str]:
+    """All sections but the named ones; all of them if nothing else would be left."""
+    kept = {name: value for name, value in sections.items() if name not in names}
+    return kept or sections
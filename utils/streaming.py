@@ -0,0 +1,73 @@
+import json
+import re
+from typing import Any, Optional
+
+_CLOSERS = {"{": "}", "[": "]"}
+# A dangling backslash or incomplete \uXXXX escape at the end of a string.
+_PARTIAL_ESCAPE = re.compile(r"\\(u[0-9a-fA-F]{0,3})?$")
+
+
+def parse_partial_json(text: str) -> Optional[Any]:
+    """
+    Best-effort parse of a JSON object that is still being streamed.
+
+    Open strings, arrays and objects are closed so that, for example,
+    '{"content": "# Jane Do' parses as {"content": "# Jane Do"}. If the text
+    stops mid-key or mid-literal, it is cut back to the last complete member.
+    Returns None until there is an object to show.
+    """
+    start = text.find("{")
+    if start == -1:
+        return None
+    text = text[start:]
+
+    stack = []
+    in_string = escape = False
+    # Positions just before each ',' or just after each '{'/'[' outside
+    # strings, with the stack at that point: safe places to cut back to.
+    cut_points = []
+    for i, char in enumerate(text):
+        if in_string:
+            if escape:
+                escape = False
+            elif char == "\\":
+                escape = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in _CLOSERS:
+            stack.append(char)
+            cut_points.append((i + 1, "".join(stack)))
+        elif char in "}]":
+            if stack:
+                stack.pop()
+            if not stack:
+                # The object is complete; anything after it is trailing prose.
+                return _loads(text[: i + 1])
+        elif char == ",":
+            cut_points.append((i, "".join(stack)))
+
+    candidate = text
+    if in_string:
+        candidate = _PARTIAL_ESCAPE.sub("", candidate) + '"'
+    result = _loads(candidate + _close(stack))
+    if result is not None:
+        return result
+
+    for position, open_stack in reversed(cut_points):
+        result = _loads(text[:position] + _close(open_stack))
+        if result is not None:
+            return result
+    return None
+
+
+def _close(stack) -> str:
+    return "".join(_CLOSERS[char] for char in reversed(stack))
+
+
+def _loads(text: str) -> Optional[Any]:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
@@ -0,0 +1,90 @@
+import contextvars
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from . import metrics
+
+logger = logging.getLogger("resume_analyzer.trace")
+
+# Spans are logged as JSON lines when TRACE_SPANS=1; durations are always
+# aggregated into the span_duration_seconds histogram.
+TRACE_SPANS = os.getenv("TRACE_SPANS", "0") == "1"
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar(
+    "current_span", default=None
+)
+
+
+class Span:
+    """A timed unit of work, nested under the span active when it started."""
+
+    def __init__(self, name: str, parent: Optional["Span"], attributes: Dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent else os.urandom(8).hex()
+        self.span_id = os.urandom(4).hex()
+        self.parent_id = parent.span_id if parent else None
+        self.attributes = attributes
+        self.status = "ok"
+        self.duration = 0.0
+
+    def set(self, **attributes):
+        self.attributes.update(attributes)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "duration_ms": round(self.duration * 1000, 3),
+            "status": self.status,
+            **self.attributes,
+        }
+
+
+@contextmanager
+def span(name: str, **attributes) -> Iterator[Span]:
+    """
+    Time the enclosed block as a span; attributes added with `span.set()`
+    are included in the trace. Propagates across threads only when the work
+    is run in a copied context (see `run_stages`).
+    """
+    current = Span(name, _current.get(), attributes)
+    token = _current.set(current)
+    start = time.perf_counter()
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.set(error=type(e).__name__)
+        raise
+    finally:
+        current.duration = time.perf_counter() - start
+        _current.reset(token)
+        metrics.observe(
+            "span_duration_seconds",
+            current.duration,
+            span=name,
+            status=current.status,
+        )
+        if TRACE_SPANS:
+            logger.info(json.dumps(current.to_dict(), default=str))
+
+
+def traced(name: str):
+    """Decorator running each call of the function in a span called `name`."""
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
@@ -1,12 +1,3 @@
-def load_markdown_content(filename):
-    try:
-        with open(filename) as file:
-            content = file.read()
-        return content
-    except Exception:
-        return "### Updated Resume has not been found."
-
-
 def format_ats_score(score_data: dict):
     if not score_data:
         return ""
@@ -130,17 +121,27 @@ def format_detailed_report(report_data: dict):
     return html
 
 
-def format_job_comparison(comparison_data: dict):
+def format_job_comparison(comparison_data):
     if not comparison_data:
         return ""
+    if isinstance(comparison_data, list):
+        return format_job_rankings(comparison_data)
+
+    html = "<h2 style='color: #ffffff; margin-bottom: 10px;'>Analysis Job Description with Resume</h2>"
+    return html + _format_job_comparison_card(comparison_data)
+
 
-    html = "<h2 style='color: #ffffff; margin-bottom: 10px;'>Analysis Job Description with Resume</h2><div style='padding: 20px; background: #2d2d2d; border-radius: 10px; color: #e0e0e0;'>"
+def _format_job_comparison_card(comparison_data: dict):
+    html = "<div style='padding: 20px; background: #2d2d2d; border-radius: 10px; color: #e0e0e0;'>"
 
     # Selection Chance
     selection_chance = comparison_data.get("percentage_of_chances", 0)
+    # "N/A" when no job description was given.
+    if isinstance(selection_chance, (int, float)):
+        selection_chance = f"{selection_chance}%"
     html += f"""
         <div style='text-align: center; padding: 20px; background: #383838; color: #ffffff; border-radius: 8px; margin-bottom: 20px;'>
-            <h2 style='margin: 0; font-size: 2.5em;'>{selection_chance}%</h2>
+            <h2 style='margin: 0; font-size: 2.5em;'>{selection_chance}</h2>
             <p style='margin: 5px 0 0 0;'>Chance of Selection</p>
         </div>
     """
@@ -168,3 +169,40 @@ def format_job_comparison(comparison_data: dict):
     html += "</div></div></div>"
 
     return html
+
+
+def format_job_rankings(rankings: list):
+    if not rankings:
+        return ""
+
+    html = (
+        "<h2 style='color: #ffffff; margin-bottom: 10px;'>Job Description Ranking</h2>"
+    )
+    html += "<div style='padding: 20px; background: #2d2d2d; border-radius: 10px; color: #e0e0e0; margin-bottom: 20px;'>"
+    html += "<table style='width: 100%; border-collapse: collapse;'>"
+    html += """
+        <tr style='text-align: left; border-bottom: 1px solid #404040;'>
+            <th style='padding: 8px;'>#</th>
+            <th style='padding: 8px;'>Job</th>
+            <th style='padding: 8px;'>Chance of Selection</th>
+            <th style='padding: 8px;'>Keyword Similarity</th>
+        </tr>
+    """
+    for item in rankings:
+        similarity = item.get("similarity", 0)
+        if not isinstance(similarity, (int, float)):
+            similarity = 0
+        html += f"""
+            <tr style='border-bottom: 1px solid #383838;'>
+                <td style='padding: 8px;'>{item.get("rank", "")}</td>
+                <td style='padding: 8px;'>{item.get("title", "")}</td>
+                <td style='padding: 8px;'>{item.get("percentage_of_chances", 0)}%</td>
+                <td style='padding: 8px;'>{similarity:.0%}</td>
+            </tr>
+        """
+    html += "</table></div>"
+
+    for item in rankings:
+        html += f"<h3 style='color: #ffffff; margin: 20px 0 10px;'>#{item.get('rank', '')} {item.get('title', '')}</h3>"
+        html += _format_job_comparison_card(item)
+    return html